@@ -0,0 +1,32 @@
+"""add transactions keyset index
+
+Revision ID: 6eac995c6f30
+Revises: 712c2ff58b32
+Create Date: 2026-10-16 14:03:52.660127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6eac995c6f30'
+down_revision: Union[str, Sequence[str], None] = '712c2ff58b32'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_tx_time_id', 'transactions',
+        [sa.text('timestamp DESC'), sa.text('transaction_id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tx_time_id', table_name='transactions')
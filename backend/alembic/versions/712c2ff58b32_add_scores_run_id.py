@@ -0,0 +1,59 @@
+"""add scores.run_id
+
+Revision ID: 712c2ff58b32
+Revises: 735b7b983ce7
+Create Date: 2026-10-16 11:40:07.218904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '712c2ff58b32'
+down_revision: Union[str, Sequence[str], None] = '735b7b983ce7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('scores', sa.Column('run_id', sa.String(), nullable=True))
+    op.create_foreign_key(
+        'fk_scores_run_id_rpa_runs', 'scores', 'rpa_runs',
+        ['run_id'], ['run_id'], ondelete='SET NULL'
+    )
+
+    # Backfill from the old time-window logic: a score belongs to the run whose
+    # [started_at, finished_at] contains its created_at. If runs overlap, the
+    # most recently started one wins.
+    op.execute("""
+        UPDATE scores s
+        SET run_id = m.run_id
+        FROM (
+            SELECT DISTINCT ON (s2.id) s2.id, r.run_id
+            FROM scores s2
+            JOIN rpa_runs r
+                ON s2.created_at >= r.started_at
+                AND s2.created_at <= COALESCE(r.finished_at, 'infinity'::timestamptz)
+            ORDER BY s2.id, r.started_at DESC
+        ) m
+        WHERE s.id = m.id
+    """)
+
+    # created after the backfill so the UPDATE doesn't maintain it row by row
+    op.create_index(
+        'ix_scores_run_tx_created', 'scores',
+        ['run_id', 'transaction_id', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_include=['score'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_scores_run_tx_created', table_name='scores')
+    op.drop_constraint('fk_scores_run_id_rpa_runs', 'scores', type_='foreignkey')
+    op.drop_column('scores', 'run_id')
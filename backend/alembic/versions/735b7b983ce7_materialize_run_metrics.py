@@ -0,0 +1,61 @@
+"""materialize run metrics
+
+Revision ID: 735b7b983ce7
+Revises: 80266c2150f7
+Create Date: 2026-10-16 09:12:41.502318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '735b7b983ce7'
+down_revision: Union[str, Sequence[str], None] = '80266c2150f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METRIC_COLUMNS = ("accuracy", "precision", "recall", "f1")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('metrics', sa.Column('run_id', sa.String(), nullable=True))
+    op.add_column('metrics', sa.Column('avg_score', sa.Numeric(precision=5, scale=2), nullable=True))
+    op.add_column('metrics', sa.Column('confusion_matrix', sa.JSON(), nullable=True))
+    op.create_foreign_key(
+        'fk_metrics_run_id_rpa_runs', 'metrics', 'rpa_runs',
+        ['run_id'], ['run_id'], ondelete='CASCADE'
+    )
+    # one stored row per run; /reports/latest reads it with a single index lookup
+    op.create_index(op.f('ix_metrics_run_id'), 'metrics', ['run_id'], unique=True)
+
+    # metrics are stored as percentages (e.g. 100.00), which Numeric(5,3) can't hold
+    for col in METRIC_COLUMNS:
+        op.alter_column(
+            'metrics', col,
+            type_=sa.Numeric(precision=5, scale=2),
+            existing_type=sa.Numeric(precision=5, scale=3),
+            existing_nullable=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # per-run rows hold percentages that don't fit the old type; they can be
+    # recomputed from scores, so drop them rather than fail the downgrade
+    op.execute("DELETE FROM metrics WHERE run_id IS NOT NULL")
+    for col in METRIC_COLUMNS:
+        op.alter_column(
+            'metrics', col,
+            type_=sa.Numeric(precision=5, scale=3),
+            existing_type=sa.Numeric(precision=5, scale=2),
+            existing_nullable=True,
+        )
+    op.drop_index(op.f('ix_metrics_run_id'), table_name='metrics')
+    op.drop_constraint('fk_metrics_run_id_rpa_runs', 'metrics', type_='foreignkey')
+    op.drop_column('metrics', 'confusion_matrix')
+    op.drop_column('metrics', 'avg_score')
+    op.drop_column('metrics', 'run_id')
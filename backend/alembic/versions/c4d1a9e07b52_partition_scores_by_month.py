@@ -0,0 +1,157 @@
+"""partition scores by month
+
+Revision ID: c4d1a9e07b52
+Revises: 6eac995c6f30
+Create Date: 2026-10-16 15:21:44.508113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d1a9e07b52'
+down_revision: Union[str, Sequence[str], None] = '6eac995c6f30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Creates the monthly partitions of `parent` covering [from_ts, to_ts]
+# (UTC months, named <parent>_yYYYYmMM); returns how many were new.
+# Called here for existing data and by the API (app.db.partitions) for
+# upcoming months.
+ENSURE_MONTHLY_PARTITIONS_SQL = """
+CREATE OR REPLACE FUNCTION ensure_monthly_partitions(parent text, from_ts timestamptz, to_ts timestamptz)
+RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    m timestamp := date_trunc('month', from_ts AT TIME ZONE 'UTC');
+    part text;
+    created integer := 0;
+BEGIN
+    WHILE m <= to_ts AT TIME ZONE 'UTC' LOOP
+        part := format('%s_y%sm%s', parent, to_char(m, 'YYYY'), to_char(m, 'MM'));
+        IF to_regclass(part) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                part, parent, m AT TIME ZONE 'UTC', (m + interval '1 month') AT TIME ZONE 'UTC'
+            );
+            created := created + 1;
+        END IF;
+        m := m + interval '1 month';
+    END LOOP;
+    RETURN created;
+END
+$$
+"""
+
+
+def _create_score_indexes() -> None:
+    op.create_index(op.f('ix_scores_created_at'), 'scores', ['created_at'], unique=False)
+    op.create_index(op.f('ix_scores_transaction_id'), 'scores', ['transaction_id'], unique=False)
+    op.create_index(
+        'ix_scores_run_tx_created', 'scores',
+        ['run_id', 'transaction_id', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_include=['score'],
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(ENSURE_MONTHLY_PARTITIONS_SQL)
+
+    # Postgres can't turn a table into a partitioned one in place: rebuild it.
+    # Old indexes and constraints are dropped first so their names can be reused.
+    op.rename_table('scores', 'scores_unpartitioned')
+    op.drop_index('ix_scores_run_tx_created', table_name='scores_unpartitioned')
+    op.drop_index(op.f('ix_scores_transaction_id'), table_name='scores_unpartitioned')
+    op.drop_index(op.f('ix_scores_created_at'), table_name='scores_unpartitioned')
+    op.execute("ALTER TABLE scores_unpartitioned RENAME CONSTRAINT scores_pkey TO scores_unpartitioned_pkey")
+    op.drop_constraint('scores_transaction_id_fkey', 'scores_unpartitioned', type_='foreignkey')
+    op.drop_constraint('fk_scores_run_id_rpa_runs', 'scores_unpartitioned', type_='foreignkey')
+
+    # The partition key has to be part of the primary key (and NOT NULL)
+    op.create_table('scores',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('transaction_id', sa.String(), nullable=False),
+    sa.Column('run_id', sa.String(), nullable=True),
+    sa.Column('model_version', sa.String(), nullable=False),
+    sa.Column('score', sa.Numeric(precision=5, scale=2), nullable=False),
+    sa.Column('reason', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['transaction_id'], ['transactions.transaction_id'], name='scores_transaction_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['run_id'], ['rpa_runs.run_id'], name='fk_scores_run_id_rpa_runs', ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)',
+    )
+
+    # Partitions for every month that has scores, plus the next 3
+    op.execute("""
+        SELECT ensure_monthly_partitions(
+            'scores',
+            COALESCE((SELECT min(created_at) FROM scores_unpartitioned), now()),
+            GREATEST(COALESCE((SELECT max(created_at) FROM scores_unpartitioned), now()), now())
+                + interval '3 months'
+        )
+    """)
+    op.execute("""
+        INSERT INTO scores (id, transaction_id, run_id, model_version, score, reason, created_at)
+        SELECT id, transaction_id, run_id, model_version, score, reason, COALESCE(created_at, now())
+        FROM scores_unpartitioned
+    """)
+    op.drop_table('scores_unpartitioned')
+
+    # created after the copy (indexes on the parent cascade to every partition)
+    _create_score_indexes()
+
+    # transactions stays a plain table: transaction_id alone must stay unique
+    # (ingest's ON CONFLICT, FKs from scores/cases), which a partitioned table
+    # can only enforce together with the partition key. BRIN gives big
+    # timestamp-range scans (exports, windows) block-range skipping for a few
+    # pages of index on append-ordered data.
+    op.create_index(
+        'ix_tx_timestamp_brin', 'transactions', ['timestamp'],
+        unique=False,
+        postgresql_using='brin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tx_timestamp_brin', table_name='transactions')
+
+    op.rename_table('scores', 'scores_partitioned')
+    op.drop_index('ix_scores_run_tx_created', table_name='scores_partitioned')
+    op.drop_index(op.f('ix_scores_transaction_id'), table_name='scores_partitioned')
+    op.drop_index(op.f('ix_scores_created_at'), table_name='scores_partitioned')
+    op.execute("ALTER TABLE scores_partitioned RENAME CONSTRAINT scores_pkey TO scores_partitioned_pkey")
+    op.drop_constraint('scores_transaction_id_fkey', 'scores_partitioned', type_='foreignkey')
+    op.drop_constraint('fk_scores_run_id_rpa_runs', 'scores_partitioned', type_='foreignkey')
+
+    op.create_table('scores',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('transaction_id', sa.String(), nullable=False),
+    sa.Column('run_id', sa.String(), nullable=True),
+    sa.Column('model_version', sa.String(), nullable=False),
+    sa.Column('score', sa.Numeric(precision=5, scale=2), nullable=False),
+    sa.Column('reason', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['transaction_id'], ['transactions.transaction_id'], name='scores_transaction_id_fkey', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['run_id'], ['rpa_runs.run_id'], name='fk_scores_run_id_rpa_runs', ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    )
+    # detached partitions are not copied back; ids only unique per created_at now
+    op.execute("""
+        INSERT INTO scores (id, transaction_id, run_id, model_version, score, reason, created_at)
+        SELECT DISTINCT ON (id) id, transaction_id, run_id, model_version, score, reason, created_at
+        FROM scores_partitioned
+        ORDER BY id, created_at DESC
+    """)
+    # drops the attached partitions with it
+    op.drop_table('scores_partitioned')
+    _create_score_indexes()
+
+    op.execute("DROP FUNCTION IF EXISTS ensure_monthly_partitions(text, timestamptz, timestamptz)")
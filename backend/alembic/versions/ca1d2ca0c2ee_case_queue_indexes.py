@@ -0,0 +1,49 @@
+"""case queue indexes
+
+Revision ID: ca1d2ca0c2ee
+Revises: c4d1a9e07b52
+Create Date: 2026-10-16 16:02:11.384520
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ca1d2ca0c2ee'
+down_revision: Union[str, Sequence[str], None] = 'c4d1a9e07b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# "Active" cases: still in an analyst queue
+ACTIVE = sa.text("status IN ('open', 'in_review')")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # at most one active case per transaction (auto-open's ON CONFLICT target)
+    op.create_index(
+        'uq_cases_active_transaction', 'cases', ['transaction_id'],
+        unique=True,
+        postgresql_where=ACTIVE,
+    )
+    # queue pages: keyset over (status, created_at, id), only active rows indexed
+    op.create_index(
+        'ix_cases_queue', 'cases', ['status', 'created_at', 'id'],
+        unique=False,
+        postgresql_where=ACTIVE,
+    )
+    op.create_index(
+        'ix_cases_assignee_queue', 'cases', ['assigned_to', 'status', 'created_at', 'id'],
+        unique=False,
+        postgresql_where=ACTIVE,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_cases_assignee_queue', table_name='cases')
+    op.drop_index('ix_cases_queue', table_name='cases')
+    op.drop_index('uq_cases_active_transaction', table_name='cases')
@@ -0,0 +1,161 @@
+# backend/app/api/admin.py
+
+# Operational endpoints (not used by the UI).
+#
+#   GET /admin/index-usage -> which indexes on `transactions` the list and
+#                             report queries use, plus Postgres' scan counters
+#
+# Every transactions index is paid for on each ingested row, so indexes that
+# no query uses are pure ingest cost. This puts both views side by side:
+#   - used_by: the endpoint queries whose current plan (EXPLAIN, not run)
+#     touches the index, using real filter values sampled from the table
+#   - scans: pg_stat_user_indexes.idx_scan since the last stats reset, i.e.
+#     what production traffic (and anything else) actually did
+# An index with no used_by and no scans is a candidate to drop. Plans depend
+# on table size and statistics, so look at this on production-sized data.
+
+import json
+from datetime import timedelta
+from typing import Any, Dict, List, Tuple
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.transactions import DEFAULT_PAGE_SIZE, build_list_query
+from app.db.deps import get_session
+from app.db.models import Score, Transaction
+from app.reports.report_service import RUN_CONFUSION_SQL, fetch_latest_run
+from app.reports.eval_metrics import FRAUD_SCORE_THRESHOLD, SUSPICIOUS_SCORE_THRESHOLD
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+_INDEX_STATS_SQL = text("""
+    SELECT
+        s.indexrelname AS name,
+        pg_get_indexdef(s.indexrelid) AS definition,
+        s.idx_scan AS scans,
+        s.idx_tup_read AS tuples_read,
+        pg_relation_size(s.indexrelid) AS size_bytes,
+        i.indisprimary OR i.indisunique AS is_unique
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.relname = 'transactions'
+    ORDER BY s.idx_scan, s.indexrelname
+""")
+
+
+@router.get("/index-usage")
+async def index_usage(session: AsyncSession = Depends(get_session)):
+    used_by: Dict[str, List[str]] = {}
+    conn = await session.connection()
+    for label, stmt in await _probe_queries(session):
+        plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {stmt}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        for name in dict.fromkeys(_plan_indexes(plan)):
+            used_by.setdefault(name, []).append(label)
+
+    stats_reset = await session.scalar(
+        text("SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()")
+    )
+    indexes = []
+    for row in (await session.execute(_INDEX_STATS_SQL)).mappings():
+        idx = dict(row)
+        idx["used_by"] = used_by.get(idx["name"], [])
+        indexes.append(idx)
+
+    return {
+        "table": "transactions",
+        "stats_since": stats_reset,
+        "indexes": indexes,
+        # unique/PK indexes enforce constraints, so they're never candidates
+        "drop_candidates": [
+            i["name"] for i in indexes
+            if not i["is_unique"] and not i["used_by"] and not i["scans"]
+        ],
+    }
+
+# -------- Helpers --------
+
+async def _probe_queries(session: AsyncSession) -> List[Tuple[str, str]]:
+    """
+    (label, SQL) for the queries behind GET /transactions and the run report,
+    filled with values from the newest transaction / latest run.
+    """
+    dialect = session.bind.dialect
+
+    def sql(stmt) -> str:
+        return str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+    probes: List[Tuple[str, str]] = []
+    page = DEFAULT_PAGE_SIZE + 1
+
+    sample = (
+        await session.execute(
+            select(
+                Transaction.transaction_id, Transaction.timestamp, Transaction.account_id,
+                Transaction.country, Transaction.channel, Transaction.label,
+                Transaction.merchant_category,
+            )
+            .where(Transaction.timestamp.is_not(None))
+            .order_by(Transaction.timestamp.desc())
+            .limit(1)
+        )
+    ).mappings().first()
+
+    probes.append(("GET /transactions", sql(build_list_query().limit(page))))
+    if sample is not None:
+        ts = sample["timestamp"]
+        probes.append((
+            "GET /transactions?cursor=",
+            sql(build_list_query(after=(ts, sample["transaction_id"])).limit(page)),
+        ))
+        for f in ("account_id", "country", "channel", "label", "merchant_category"):
+            if sample[f] is not None:
+                probes.append((f"GET /transactions?{f}=", sql(build_list_query(**{f: sample[f]}).limit(page))))
+        probes.append((
+            "GET /transactions?start=&end= (7 days)",
+            sql(build_list_query(start=ts - timedelta(days=7), end=ts).limit(page)),
+        ))
+        probes.append((
+            "GET /transactions/{transaction_id}",
+            sql(select(Transaction).where(Transaction.transaction_id == sample["transaction_id"])),
+        ))
+
+    run = await fetch_latest_run(session)
+    if run is not None and run["started_at"] is not None:
+        probes.append((
+            "report: avg score",
+            sql(select(func.avg(Score.score)).where(
+                Score.run_id == run["run_id"], Score.created_at >= run["started_at"]
+            )),
+        ))
+        probes.append((
+            "report: confusion matrix",
+            sql(RUN_CONFUSION_SQL.bindparams(
+                run_id=run["run_id"],
+                since=run["started_at"],
+                fraud_threshold=FRAUD_SCORE_THRESHOLD,
+                suspicious_threshold=SUSPICIOUS_SCORE_THRESHOLD,
+            )),
+        ))
+    return probes
+
+
+def _plan_indexes(plan: Any) -> List[str]:
+    """Index names anywhere in an EXPLAIN (FORMAT JSON) plan tree."""
+    found: List[str] = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if "Index Name" in node:
+                found.append(node["Index Name"])
+            for v in node.values():
+                walk(v)
+        elif isinstance(node, list):
+            for v in node:
+                walk(v)
+
+    walk(plan)
+    return found
@@ -1,12 +1,16 @@
 ﻿from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from app.api.json_rows import rows_response
 from app.db.deps import get_session
 from app.db.models import AuditLog
 
+_AUDIT_COLUMNS = [c.name for c in AuditLog.__table__.c]
+
 router = APIRouter(prefix="/audit-logs", tags=["audit-logs"])
 
 @router.get("/")
 async def list_audit_logs(limit: int = 100, session: AsyncSession = Depends(get_session)):
-    res = await session.execute(select(AuditLog).limit(limit))
-    return list(res.scalars().all())
+    # plain columns encoded with orjson (same JSON as returning the ORM objects)
+    res = await session.execute(select(*AuditLog.__table__.c).limit(limit))
+    return rows_response(_AUDIT_COLUMNS, res.all())
@@ -1,12 +1,153 @@
-﻿from fastapi import APIRouter, Depends
+﻿# backend/app/api/cases.py
+
+# Analyst case queue.
+#
+#   GET  /cases/                    -> active cases (open + in_review) oldest first,
+#                                      keyset-paginated over (status, created_at, id);
+#                                      next page cursor in X-Next-Cursor
+#   GET  /cases/counts              -> cases per status (one GROUP BY)
+#   POST /cases/open-from-scores    -> open a case for every transaction whose
+#                                      latest score >= CASE_SCORE_THRESHOLD
+#
+# Cases are opened with one INSERT ... SELECT ... ON CONFLICT DO NOTHING against
+# the partial unique index on active cases, so a transaction never gets two
+# active cases, even with concurrent calls. POST /runs/{run_id}/score runs it
+# for the run's scores when CASE_AUTO_OPEN is on.
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, literal_column, select, text, tuple_
+from app.api.json_rows import rows_response
+from app.core.audit import audit
+from app.core.config import settings
 from app.db.deps import get_session
 from app.db.models import Case, CaseStatus
 
+_CASE_COLUMNS = [c.name for c in Case.__table__.c]
+
+DEFAULT_PAGE_SIZE = 50
+ACTIVE_STATUSES = [CaseStatus.open, CaseStatus.in_review]
+
+# Latest score per transaction (optionally only the run's scores) at or above
+# the threshold, unless a case was already opened after that score: closing a
+# case sticks until the transaction is scored high again.
+_OPEN_CASES_SQL = """
+INSERT INTO cases (id, transaction_id, status, notes, created_at, updated_at)
+SELECT gen_random_uuid()::text, ls.transaction_id, 'open', 'auto: latest score ' || ls.score, now(), now()
+FROM (
+    SELECT DISTINCT ON (s.transaction_id) s.transaction_id, s.score, s.created_at
+    FROM scores s
+    {where}
+    ORDER BY s.transaction_id, s.created_at DESC
+) ls
+WHERE ls.score >= :threshold
+AND NOT EXISTS (
+    SELECT 1 FROM cases c
+    WHERE c.transaction_id = ls.transaction_id
+    AND c.created_at >= ls.created_at
+)
+ON CONFLICT (transaction_id) WHERE status IN ('open', 'in_review') DO NOTHING
+"""
+_OPEN_ALL_SQL = text(_OPEN_CASES_SQL.format(where=""))
+# run_id + run start: index range on ix_scores_run_tx_created, older partitions pruned
+_OPEN_RUN_SQL = text(_OPEN_CASES_SQL.format(where="""WHERE s.run_id = :run_id
+    AND s.created_at >= COALESCE(
+        (SELECT started_at FROM rpa_runs WHERE run_id = :run_id), '-infinity'
+    )"""))
+
 router = APIRouter(prefix="/cases", tags=["cases"])
 
 @router.get("/")
-async def list_cases(limit: int = 50, session: AsyncSession = Depends(get_session)):
-    res = await session.execute(select(Case).limit(limit))
-    return list(res.scalars().all())
+async def list_cases(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1),
+    cursor: Optional[str] = None,
+    status: List[CaseStatus] = Query(ACTIVE_STATUSES),
+    assigned_to: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Case queue page, ordered by (status, created_at, id). Active statuses are
+    served from the partial queue indexes (ix_cases_queue /
+    ix_cases_assignee_queue); ?status=closed reads unindexed history.
+    """
+    # statuses inlined as literals (enum-validated): a bound IN list can't prove
+    # the partial indexes' predicate once asyncpg switches to a generic plan
+    conditions = [Case.status.in_([literal_column(f"'{s.value}'") for s in status])]
+    if assigned_to is not None:
+        conditions.append(Case.assigned_to == assigned_to)
+    if cursor:
+        conditions.append(tuple_(Case.status, Case.created_at, Case.id) > _decode_cursor(cursor))
+
+    page_size = min(limit, settings.LIST_MAX_PAGE_SIZE)
+    # plain columns encoded with orjson (same JSON as returning the ORM objects)
+    stmt = (
+        select(*Case.__table__.c)
+        .where(*conditions)
+        .order_by(Case.status, Case.created_at, Case.id)
+        .limit(page_size + 1)
+    )
+    rows = (await session.execute(stmt)).all()
+    headers = {}
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        headers["X-Next-Cursor"] = _encode_cursor(last.status, last.created_at, last.id)
+    return rows_response(_CASE_COLUMNS, rows, headers=headers)
+
+@router.get("/counts")
+async def case_counts(assigned_to: Optional[str] = None, session: AsyncSession = Depends(get_session)):
+    """Number of cases per status (every status present, 0 if none)."""
+    stmt = select(Case.status, func.count()).group_by(Case.status)
+    if assigned_to is not None:
+        stmt = stmt.where(Case.assigned_to == assigned_to)
+    counts = {s.value: 0 for s in CaseStatus}
+    for status, n in (await session.execute(stmt)).all():
+        counts[status.value] = n
+    return counts
+
+@router.post("/open-from-scores")
+async def open_cases(
+    threshold: Optional[float] = Query(None, description="default CASE_SCORE_THRESHOLD"),
+    run_id: Optional[str] = Query(None, description="only this run's scores"),
+    session: AsyncSession = Depends(get_session),
+):
+    threshold = settings.CASE_SCORE_THRESHOLD if threshold is None else threshold
+    opened = await open_cases_from_scores(session, threshold, run_id)
+    return {"opened": opened, "threshold": threshold, "run_id": run_id}
+
+async def open_cases_from_scores(
+    session: AsyncSession, threshold: float, run_id: Optional[str] = None
+) -> int:
+    """Set-based case creation (see _OPEN_CASES_SQL); commits, returns cases opened."""
+    if run_id is None:
+        res = await session.execute(_OPEN_ALL_SQL, {"threshold": threshold})
+    else:
+        res = await session.execute(_OPEN_RUN_SQL, {"threshold": threshold, "run_id": run_id})
+    await session.commit()
+    opened = res.rowcount
+    if opened:
+        # one summary event per call, not one per case
+        audit.emit("case_batch", str(uuid.uuid4()), "auto_open", {
+            "opened": opened, "threshold": threshold, "run_id": run_id,
+        })
+    return opened
+
+# -------- Helpers --------
+
+def _encode_cursor(status: CaseStatus, created_at: datetime, case_id: str) -> str:
+    """Opaque, URL-safe cursor for the row a page ended on."""
+    raw = json.dumps([status.value, created_at.isoformat(), case_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        status, created_at, case_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return CaseStatus(status), datetime.fromisoformat(created_at), str(case_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,210 @@
+# backend/app/api/exports.py
+
+# Columnar snapshots of transactions + their latest score, for the ML scripts
+# and analysts (no CSV parsing on the reading side).
+#
+#   GET /exports/transactions.parquet   -> Parquet file (one row group per batch)
+#   GET /exports/transactions.arrow     -> Arrow IPC stream
+#
+# Rows come from a server-side cursor EXPORT_BATCH_ROWS at a time, each batch is
+# turned into an Arrow RecordBatch and written straight to the response, so the
+# API never holds more than one batch no matter how big the table is.
+
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Float, cast, select, true
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.models import Transaction, Score
+from app.db.session import SessionLocal
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+# Latest score per transaction: top-1 lookup per row (LEFT JOIN LATERAL), so the
+# export streams in cursor order instead of sorting the whole scores table.
+_latest_score = (
+    select(
+        cast(Score.score, Float).label("score"),
+        Score.model_version.label("model_version"),
+        Score.created_at.label("scored_at"),
+    )
+    .where(Score.transaction_id == Transaction.transaction_id)
+    .order_by(Score.created_at.desc())
+    .limit(1)
+    .lateral("latest_score")
+)
+
+_TS = pa.timestamp("us", tz="UTC")
+
+# name -> (SQL expression, Arrow type), in export order.
+# Numeric money columns are exported as float64 (what pandas/sklearn use anyway).
+EXPORT_COLUMNS = {
+    "transaction_id":    (Transaction.transaction_id, pa.string()),
+    "timestamp":         (Transaction.timestamp, _TS),
+    "account_id":        (Transaction.account_id, pa.string()),
+    "payer_id":          (Transaction.payer_id, pa.string()),
+    "payee_id":          (Transaction.payee_id, pa.string()),
+    "amount":            (cast(Transaction.amount, Float), pa.float64()),
+    "currency":          (Transaction.currency, pa.string()),
+    "merchant_category": (Transaction.merchant_category, pa.string()),
+    "country":           (Transaction.country, pa.string()),
+    "channel":           (Transaction.channel, pa.string()),
+    "device_id":         (Transaction.device_id, pa.string()),
+    "ip_hash":           (Transaction.ip_hash, pa.string()),
+    "balance_before":    (cast(Transaction.balance_before, Float), pa.float64()),
+    "balance_after":     (cast(Transaction.balance_after, Float), pa.float64()),
+    "label":             (Transaction.label, pa.int16()),
+    "notes":             (Transaction.notes, pa.string()),
+    "score":             (_latest_score.c.score, pa.float64()),
+    "model_version":     (_latest_score.c.model_version, pa.string()),
+    "scored_at":         (_latest_score.c.scored_at, _TS),
+}
+
+_SCORE_COLUMNS = {"score", "model_version", "scored_at"}
+
+
+@router.get("/transactions.parquet")
+async def export_parquet(
+    columns: Optional[List[str]] = Query(None, description="Columns to include (repeat or comma-separate)."),
+    start: Optional[datetime] = Query(None, description="timestamp >= start"),
+    end: Optional[datetime] = Query(None, description="timestamp < end"),
+):
+    names = _resolve_columns(columns)
+    return StreamingResponse(
+        _stream_export(names, start, end, _ParquetEncoder),
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": 'attachment; filename="transactions.parquet"'},
+    )
+
+
+@router.get("/transactions.arrow")
+async def export_arrow(
+    columns: Optional[List[str]] = Query(None, description="Columns to include (repeat or comma-separate)."),
+    start: Optional[datetime] = Query(None, description="timestamp >= start"),
+    end: Optional[datetime] = Query(None, description="timestamp < end"),
+):
+    names = _resolve_columns(columns)
+    return StreamingResponse(
+        _stream_export(names, start, end, _IpcEncoder),
+        media_type="application/vnd.apache.arrow.stream",
+        headers={"Content-Disposition": 'attachment; filename="transactions.arrow"'},
+    )
+
+# -------- Helpers --------
+
+def _resolve_columns(columns: Optional[List[str]]) -> List[str]:
+    """Validate ?columns=a,b&columns=c against EXPORT_COLUMNS (default: all)."""
+    if not columns:
+        return list(EXPORT_COLUMNS)
+    names = [c.strip() for item in columns for c in item.split(",") if c.strip()]
+    unknown = [c for c in names if c not in EXPORT_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}")
+    # keep request order, drop repeats
+    return list(dict.fromkeys(names))
+
+
+class _Sink:
+    """Write-only file object that hands back whatever was written since the last drain()."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        b = bytes(data)
+        self._parts.append(b)
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+
+class _ParquetEncoder:
+    def __init__(self, schema: pa.Schema):
+        self.sink = _Sink()
+        self.writer = pq.ParquetWriter(self.sink, schema)
+
+    def write(self, batch: pa.RecordBatch) -> bytes:
+        self.writer.write_batch(batch)
+        return self.sink.drain()
+
+    def close(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
+
+
+class _IpcEncoder:
+    def __init__(self, schema: pa.Schema):
+        self.sink = _Sink()
+        self.writer = pa.ipc.new_stream(self.sink, schema)
+
+    def write(self, batch: pa.RecordBatch) -> bytes:
+        self.writer.write_batch(batch)
+        return self.sink.drain()
+
+    def close(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
+
+
+def _to_batch(rows, names: List[str], schema: pa.Schema) -> pa.RecordBatch:
+    # rows are tuples in `names` order -> one Arrow array per column
+    cols = list(zip(*rows))
+    arrays = [pa.array(cols[i], type=schema.field(i).type) for i in range(len(names))]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+async def _stream_export(names, start, end, encoder_cls) -> AsyncIterator[bytes]:
+    """
+    Stream rows from a server-side cursor and yield encoded bytes per batch.
+    Uses its own session because the response body outlives the request's
+    dependencies. Arrow/Parquet encoding runs in the threadpool so a big
+    batch doesn't block the event loop.
+    """
+    schema = pa.schema([(n, EXPORT_COLUMNS[n][1]) for n in names])
+
+    stmt = select(*[EXPORT_COLUMNS[n][0].label(n) for n in names])
+    if any(n in _SCORE_COLUMNS for n in names):
+        stmt = stmt.select_from(Transaction.__table__.outerjoin(_latest_score, true()))
+    else:
+        # transactions-only projection: skip the per-row score lookup
+        stmt = stmt.select_from(Transaction.__table__)
+    if start is not None:
+        stmt = stmt.where(Transaction.timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(Transaction.timestamp < end)
+
+    encoder = encoder_cls(schema)
+    async with SessionLocal() as session:
+        result = await session.stream(
+            stmt.execution_options(yield_per=settings.EXPORT_BATCH_ROWS)
+        )
+        async for rows in result.partitions():
+            batch = await run_in_threadpool(_to_batch, rows, names, schema)
+            chunk = await run_in_threadpool(encoder.write, batch)
+            if chunk:
+                yield chunk
+
+    tail = encoder.close()
+    if tail:
+        yield tail
@@ -1,6 +1,12 @@
 from fastapi import APIRouter
+from app.db.session import pool_stats
 router = APIRouter()
 
 @router.get("/health")
 def health():
     return {"status": "ok"}
+
+# DB pool metrics: checked-out connections, blocked waiters, checkout wait time
+@router.get("/health/pool")
+def health_pool():
+    return pool_stats()
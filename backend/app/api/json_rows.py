@@ -0,0 +1,42 @@
+# backend/app/api/json_rows.py
+"""
+Fast JSON for the list endpoints (transactions, cases, audit logs).
+
+The endpoints select plain columns (Core rows, no ORM objects / identity map)
+and hand the tuples here; orjson turns them into bytes in one call instead of
+FastAPI validating a Pydantic model (or running jsonable_encoder) per row.
+
+Output matches what the endpoints returned before:
+- utc_z=True: datetimes as "...Z" (how Pydantic, i.e. TransactionOut, writes UTC)
+- utc_z=False: datetimes as "...+00:00" (jsonable_encoder / isoformat)
+- enums as their value; Numeric columns should be cast to Float in the query
+"""
+
+from typing import Dict, Iterable, Optional, Sequence
+
+import orjson
+from fastapi.responses import Response
+
+
+def rows_json(keys: Sequence[str], rows: Iterable[Sequence], utc_z: bool = False) -> bytes:
+    """JSON array of objects, one per row (keys in `keys` order)."""
+    return orjson.dumps(
+        [dict(zip(keys, row)) for row in rows],
+        option=orjson.OPT_UTC_Z if utc_z else 0,
+    )
+
+
+def rows_ndjson(keys: Sequence[str], rows: Iterable[Sequence], utc_z: bool = False) -> bytes:
+    """One JSON object per line (for streaming responses)."""
+    option = orjson.OPT_APPEND_NEWLINE | (orjson.OPT_UTC_Z if utc_z else 0)
+    return b"".join(orjson.dumps(dict(zip(keys, row)), option=option) for row in rows)
+
+
+def rows_response(
+    keys: Sequence[str],
+    rows: Iterable[Sequence],
+    utc_z: bool = False,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """application/json response with the rows already encoded (skips response_model)."""
+    return Response(rows_json(keys, rows, utc_z), media_type="application/json", headers=headers)
@@ -0,0 +1,29 @@
+# backend/app/api/model_scoring.py
+
+# Online scoring with the trained ML model (app/scoring/model.py).
+#
+#   POST /score/model -> fraud probability for one Kaggle-schema transaction
+#
+# The model is loaded once at startup from MODEL_PATH; concurrent requests are
+# coalesced into micro-batches (MODEL_MAX_BATCH / MODEL_BATCH_WINDOW_MS) so
+# predict_proba runs once per batch. 503 when no model is loaded.
+
+from fastapi import APIRouter, HTTPException
+
+from app.core.config import settings
+from app.schemas.model_scoring import ModelScoreIn, ModelScoreOut
+from app.scoring.model import scorer
+
+router = APIRouter(prefix="/score", tags=["score"])
+
+
+@router.post("/model", response_model=ModelScoreOut)
+async def score_with_model(payload: ModelScoreIn):
+    if not scorer.ready:
+        raise HTTPException(status_code=503, detail="No model loaded (set MODEL_PATH)")
+    proba = await scorer.predict(payload.model_dump())
+    return {
+        "fraud_proba": proba,
+        "is_fraud": proba >= settings.MODEL_THRESHOLD,
+        "model_version": scorer.version,
+    }
@@ -0,0 +1,123 @@
+# backend/app/api/runs.py
+
+# Run-level operations. POST /runs/{run_id}/score scores every transaction that
+# has no score yet, inside the backend, in chunks:
+#   SELECT chunk -> pandas -> vectorized rules -> one INSERT ... SELECT unnest(...)
+# No per-row HTTP request, commit or refresh.
+#
+# Afterwards (CASE_AUTO_OPEN) a case is opened for every transaction whose new
+# score is >= CASE_SCORE_THRESHOLD, in one set-based INSERT (app/api/cases.py).
+#
+# POST /runs/{run_id}/metrics materializes the run's evaluation metrics into the
+# metrics table once the run has finished, so /reports/latest is a lookup.
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select, text, Float, cast
+from sqlalchemy.ext.asyncio import AsyncSession
+import pandas as pd
+
+from app.api.cases import open_cases_from_scores
+from app.core.audit import audit
+from app.core.config import settings
+from app.db.deps import get_session
+from app.db.models import Transaction, Score, RpaRun
+from app.reports.report_service import store_run_metrics
+from app.scoring.rules import score_frame, MODEL_VERSION, FLAG_THRESHOLD
+
+router = APIRouter(prefix="/runs", tags=["runs"])
+
+# Arrays in, rows out: ids are generated by Postgres (gen_random_uuid, PG13+)
+_INSERT_SCORES_SQL = text("""
+    INSERT INTO scores (id, transaction_id, run_id, model_version, score, reason)
+    SELECT gen_random_uuid()::text, u.transaction_id, :run_id, :model_version, u.score, u.reason
+    FROM unnest(
+        CAST(:transaction_ids AS text[]),
+        CAST(:scores AS float8[]),
+        CAST(:reasons AS text[])
+    ) AS u(transaction_id, score, reason)
+""")
+
+_SCORE_COLUMNS = ["transaction_id", "amount", "country", "merchant_category"]
+
+
+@router.post("/{run_id}/score")
+async def score_run(run_id: str, session: AsyncSession = Depends(get_session)):
+    """
+    Score all unscored transactions with the rules-v0 engine.
+    Returns how many were scored, how many crossed FLAG_THRESHOLD and how
+    many cases were opened.
+    """
+    exists = await session.scalar(
+        text("SELECT 1 FROM rpa_runs WHERE run_id = :run_id"), {"run_id": run_id}
+    )
+    if not exists:
+        raise HTTPException(status_code=404, detail="Run not found")
+
+    scored = 0
+    flagged = 0
+    last_id = ""
+
+    while True:
+        # keyset over transaction_id so each chunk is an index range scan
+        stmt = (
+            select(
+                Transaction.transaction_id,
+                cast(Transaction.amount, Float),
+                Transaction.country,
+                Transaction.merchant_category,
+            )
+            .outerjoin(Score, Score.transaction_id == Transaction.transaction_id)
+            .where(Score.id.is_(None), Transaction.transaction_id > last_id)
+            .order_by(Transaction.transaction_id)
+            .limit(settings.SCORING_CHUNK_SIZE)
+        )
+        rows = (await session.execute(stmt)).all()
+        if not rows:
+            break
+
+        df = pd.DataFrame.from_records(rows, columns=_SCORE_COLUMNS)
+        scores, reasons = score_frame(df)
+
+        await session.execute(
+            _INSERT_SCORES_SQL,
+            {
+                "run_id": run_id,
+                "model_version": MODEL_VERSION,
+                "transaction_ids": df["transaction_id"].tolist(),
+                "scores": scores.tolist(),
+                "reasons": reasons.tolist(),
+            },
+        )
+        await session.commit()
+
+        scored += len(df)
+        flagged += int((scores >= FLAG_THRESHOLD).sum())
+        last_id = df["transaction_id"].iloc[-1]
+
+    audit.emit("rpa_run", run_id, "score", {
+        "model_version": MODEL_VERSION, "scored": scored, "flagged": flagged,
+    })
+    result = {"run_id": run_id, "scored": scored, "flagged": flagged}
+    if settings.CASE_AUTO_OPEN:
+        result["cases_opened"] = await open_cases_from_scores(session, settings.CASE_SCORE_THRESHOLD, run_id)
+    return result
+
+
+@router.post("/{run_id}/metrics")
+async def materialize_run_metrics(run_id: str, session: AsyncSession = Depends(get_session)):
+    """
+    Compute accuracy/precision/recall/f1 + confusion matrix for a finished run
+    and store them (overwrites any earlier row for the same run).
+    """
+    run = await session.get(RpaRun, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    if run.finished_at is None:
+        raise HTTPException(status_code=409, detail="Run has not finished yet")
+
+    metrics = await store_run_metrics(
+        {"run_id": run.run_id, "started_at": run.started_at, "finished_at": run.finished_at},
+        session,
+    )
+    audit.emit("rpa_run", run_id, "metrics", metrics["eval_metrics"])
+    return {"run_id": run_id, **metrics}
@@ -1,8 +1,10 @@
 ﻿from fastapi import Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, text
+from sqlalchemy.exc import IntegrityError
 
-from app.schemas.scores import ScoreCreate, ScoreOut
+from app.schemas.scores import ScoreCreate, ScoreOut, ScoreBatchCreate, ScoreBatchOut
+from app.core.audit import audit
 from app.db.deps import get_session
 from app.db.models import Score  # you already have this table
 import uuid
@@ -10,6 +12,21 @@ import uuid
 from fastapi import APIRouter
 router = APIRouter(prefix="/scores", tags=["scores"])
 
+# Whole batch as one statement: one array per column, unnest() turns them back
+# into rows (same form as runs._INSERT_SCORES_SQL)
+_INSERT_SCORE_BATCH_SQL = text("""
+    INSERT INTO scores (id, transaction_id, run_id, model_version, score, reason)
+    SELECT u.id, u.transaction_id, u.run_id, u.model_version, u.score, u.reason
+    FROM unnest(
+        CAST(:ids AS text[]),
+        CAST(:transaction_ids AS text[]),
+        CAST(:run_ids AS text[]),
+        CAST(:model_versions AS text[]),
+        CAST(:scores AS float8[]),
+        CAST(:reasons AS text[])
+    ) AS u(id, transaction_id, run_id, model_version, score, reason)
+""")
+
 @router.post("", response_model=ScoreOut)
 @router.post("/", response_model=ScoreOut)
 async def create_score(
@@ -26,6 +43,7 @@ async def create_score(
     obj = Score(
         id=str(uuid.uuid4()),
         transaction_id=payload.transaction_id,
+        run_id=payload.run_id,
         model_version=payload.model_version,
         score=payload.score,
         reason=payload.reason,
@@ -33,4 +51,39 @@ async def create_score(
     session.add(obj)
     await session.commit()
     await session.refresh(obj)
+    audit.emit("score", obj.id, "create", {"transaction_id": obj.transaction_id, "run_id": obj.run_id})
     return obj
+
+@router.post("/batch", response_model=ScoreBatchOut)
+async def create_scores_batch(
+    payload: ScoreBatchCreate,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Insert many scores with one commit.
+    The batch goes out as a single INSERT ... SELECT FROM unnest(arrays)
+    (one round trip, one statement however many rows), with no ORM objects
+    and no per-row refresh.
+    """
+    scores = payload.scores
+    params = {
+        "ids": [str(uuid.uuid4()) for _ in scores],
+        "transaction_ids": [s.transaction_id for s in scores],
+        "run_ids": [s.run_id for s in scores],
+        "model_versions": [s.model_version for s in scores],
+        "scores": [s.score for s in scores],
+        "reasons": [s.reason for s in scores],
+    }
+    try:
+        await session.execute(_INSERT_SCORE_BATCH_SQL, params)
+        await session.commit()
+    except IntegrityError:
+        # all-or-nothing: one unknown transaction_id rejects the batch
+        await session.rollback()
+        raise HTTPException(status_code=409, detail="One or more transaction_ids or run_ids not found")
+    # one summary event for the whole batch
+    audit.emit("score_batch", str(uuid.uuid4()), "create", {
+        "inserted": len(scores),
+        "run_ids": sorted({s.run_id for s in scores if s.run_id}),
+    })
+    return {"inserted": len(scores)}
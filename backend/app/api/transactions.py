@@ -1,33 +1,93 @@
 ﻿# backend/app/api/transactions.py
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Float, cast, select, tuple_
 from sqlalchemy.exc import IntegrityError
+from app.api.json_rows import rows_ndjson, rows_response
+from app.core.audit import audit
+from app.core.config import settings
 from app.db.deps import get_session
 from app.db.models import Transaction
+from app.db.session import SessionLocal
+from app.ingest.csv_parser import parse_csv_chunks
+from app.ingest.producer import iterate_in_thread
+from app.ingest.staging import TX_COLUMNS, merge_transactions_chunk
 from app.schemas.transactions import TransactionCreate, TransactionOut
 
-import csv
-from io import StringIO, TextIOWrapper
+import base64
+import json
+import uuid
+from contextlib import aclosing
 from datetime import datetime
-from typing import Dict, Any
+from typing import AsyncIterator, BinaryIO, Literal, Optional
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
+# Page size when ?limit is not given (json mode)
+DEFAULT_PAGE_SIZE = 50
+
+# Plain columns (no ORM objects) in TransactionOut order; Numeric -> float in
+# SQL so rows go straight to orjson (app.api.json_rows)
+_FLOAT_COLUMNS = {"amount", "balance_before", "balance_after"}
+_LIST_COLUMNS = [
+    cast(Transaction.__table__.c[c], Float).label(c)
+    if c in _FLOAT_COLUMNS else Transaction.__table__.c[c]
+    for c in TX_COLUMNS
+]
+
 # -----------------------------
 # LIST (accept /transactions and /transactions/)
 # -----------------------------
+# Keyset pagination on (timestamp DESC, transaction_id DESC): every page is an
+# index range scan starting right after the previous page's last row, so page
+# 1000 costs the same as page 1 (no OFFSET). The next page's cursor comes back
+# in the X-Next-Cursor header (absent on the last page).
+#
+# format=ndjson streams every matching row (one JSON object per line) from a
+# server-side cursor, LIST_STREAM_BATCH rows at a time, so memory stays flat
+# however large the result is.
+#
+# Both modes select plain columns and encode the tuples with orjson (no ORM
+# objects, no per-row TransactionOut validation); the output is the same as
+# before.
 @router.get("")
 @router.get("/", response_model=list[TransactionOut])
 async def list_transactions(
-    limit: int = 50,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    account_id: Optional[str] = None,
+    country: Optional[str] = None,
+    channel: Optional[str] = None,
+    label: Optional[int] = None,
+    merchant_category: Optional[str] = None,
+    start: Optional[datetime] = Query(None, description="timestamp >= start"),
+    end: Optional[datetime] = Query(None, description="timestamp < end"),
+    format: Literal["json", "ndjson"] = "json",
     session: AsyncSession = Depends(get_session),
 ):
-    res = await session.execute(
-        select(Transaction).order_by(Transaction.timestamp.desc()).limit(limit)
+    after = _decode_cursor(cursor) if cursor else None
+    stmt = build_list_query(
+        account_id=account_id, country=country, channel=channel, label=label,
+        merchant_category=merchant_category, start=start, end=end, after=after,
     )
-    return list(res.scalars().all())
+
+    if format == "ndjson":
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return StreamingResponse(_stream_ndjson(stmt), media_type="application/x-ndjson")
+
+    page_size = min(limit or DEFAULT_PAGE_SIZE, settings.LIST_MAX_PAGE_SIZE)
+    # fetch one extra row to know whether there is a next page
+    res = await session.execute(stmt.limit(page_size + 1))
+    rows = res.all()
+    headers = {}
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        headers["X-Next-Cursor"] = _encode_cursor(last.timestamp, last.transaction_id)
+    return rows_response(TX_COLUMNS, rows, utc_z=True, headers=headers)
 
 # -----------------------------
 # CREATE (accept /transactions and /transactions/)
@@ -47,6 +107,7 @@ async def create_txn(
         await session.rollback()
         raise HTTPException(status_code=409, detail="transaction_id already exists")
     await session.refresh(obj)
+    audit.emit("transaction", obj.transaction_id, "create")
     return obj
 
 # -----------------------------
@@ -63,7 +124,7 @@ async def get_txn(transaction_id: str, session: AsyncSession = Depends(get_sessi
     return obj
 
 # -----------------------------
-# BULK INGEST CSV (robust)
+# BULK INGEST CSV (robust, streaming)
 # -----------------------------
 @router.post("/ingest-csv")
 async def ingest_csv(
@@ -73,133 +134,120 @@ async def ingest_csv(
     """
     Robust CSV loader that handles:
     - UTF-8 BOM in header (utf-8-sig)
-    - Extra values beyond header (DictReader puts them under key None)
+    - Extra values beyond header (dropped)
     - Whitespace in headers/values
     - Trailing commas / Windows line endings
     - Safe type coercion; empty strings -> None
-    """
-    # Use utf-8-sig to auto-strip BOM; newline="" for correct CSV parsing
-    wrapper = TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
-    reader = csv.DictReader(wrapper)
-
-    inserted = 0
-    rows: list[Transaction] = []
 
-    for raw in reader:
-        if not raw:
-            continue
+    Rows are parsed and validated in chunks of INGEST_CHUNK_SIZE on a worker
+    thread by the column-oriented parser in app.ingest.csv_parser; each chunk is COPY'd into a staging table and merged with
+    ON CONFLICT DO NOTHING, so memory stays flat and duplicates never force a
+    row-by-row retry. Each chunk commits on its own.
 
-        cleaned = _normalize_csv_row(raw)
+    Big one-off loads that should skip secondary index maintenance go
+    through the offline CLI instead: python -m app.ingest.bulk load FILE.
 
-        # Require minimum fields
-        if "transaction_id" not in cleaned or "amount" not in cleaned or "timestamp" not in cleaned:
-            # skip invalid rows silently; you can collect & report if you want
-            continue
-
-        try:
-            rows.append(Transaction(**cleaned))
-        except TypeError:
-            # If a non-string key slipped through or unexpected column types
-            # skip this row; optionally collect errors
-            continue
+    Returns counts: inserted (new rows), duplicates (transaction_id already
+    present, in the DB or earlier in the file), rejected (failed validation).
+    """
+    inserted, duplicates, rejected = await ingest_chunks(file.file, session)
 
-    if not rows:
+    if inserted + duplicates == 0:
         raise HTTPException(status_code=400, detail="No valid rows found in CSV")
 
-    # Insert in bulk
-    session.add_all(rows)
-    try:
-        await session.commit()
-        inserted = len(rows)
-    except IntegrityError:
-        await session.rollback()
-        # Mixed dupes/new rows: fall back to row-by-row so we insert the good ones
-        inserted = await _insert_row_by_row(rows, session)
+    # one summary event per upload, not one per row
+    audit.emit("transaction_batch", str(uuid.uuid4()), "ingest_csv", {
+        "filename": file.filename,
+        "inserted": inserted, "duplicates": duplicates, "rejected": rejected,
+    })
+    return {"inserted": inserted, "duplicates": duplicates, "rejected": rejected}
 
-    return {"inserted": inserted}
+async def ingest_chunks(stream: BinaryIO, session: AsyncSession) -> tuple:
+    """
+    Parse + merge a CSV byte stream chunk by chunk; returns (inserted,
+    duplicates, rejected). Also used by the bulk-load CLI (app.ingest.bulk).
+    """
+    inserted = 0
+    duplicates = 0
+    rejected = 0
+
+    # Parsing runs on a worker thread; this loop only awaits parsed chunks and
+    # writes them, so the event loop stays free for other requests. The queue
+    # holds at most INGEST_QUEUE_DEPTH chunks (backpressure on the parser).
+    chunks = iterate_in_thread(
+        lambda: parse_csv_chunks(stream, settings.INGEST_CHUNK_SIZE),
+        maxsize=settings.INGEST_QUEUE_DEPTH,
+    )
+    async with aclosing(chunks):
+        async for records, bad in chunks:
+            rejected += bad
+            if records:
+                n = await merge_transactions_chunk(session, records)
+                inserted += n
+                duplicates += len(records) - n
+    return inserted, duplicates, rejected
 
 # -------- Helpers --------
 
-def _normalize_csv_row(row: Dict[Any, Any]) -> Dict[str, Any]:
+def build_list_query(
+    account_id: Optional[str] = None,
+    country: Optional[str] = None,
+    channel: Optional[str] = None,
+    label: Optional[int] = None,
+    merchant_category: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    after: Optional[tuple] = None,
+):
     """
-    Clean & map incoming CSV -> Transaction columns.
-    - Drop non-string keys (e.g., None from extra columns)
-    - Strip header/value whitespace; strip BOM if present
-    - Coerce numeric and datetime fields
+    SELECT behind GET /transactions (no LIMIT): filters + keyset order.
+    after = (timestamp, transaction_id) of the previous page's last row.
+    Also used by /admin/index-usage to EXPLAIN the list queries.
     """
-    # 1) Drop non-string keys (DictReader puts overflow under key None)
-    for k in list(row.keys()):
-        if not isinstance(k, str):
-            row.pop(k, None)
-
-    # 2) Normalize header names & values (trim; strip BOM on first header just in case)
-    fixed: Dict[str, Any] = {}
-    for k, v in row.items():
-        k2 = k.strip()
-        if k2.startswith("\ufeff"):
-            k2 = k2.lstrip("\ufeff")
-        if isinstance(v, str):
-            v = v.strip()
-            if v == "":
-                v = None
-        fixed[k2] = v
-
-    # 3) Keep only known columns
-    cols = [
-        "transaction_id","timestamp","account_id","payer_id","payee_id",
-        "amount","currency","merchant_category","country","channel",
-        "device_id","ip_hash","balance_before","balance_after","label","notes",
-    ]
-    out: Dict[str, Any] = {c: fixed.get(c) for c in cols if c in fixed}
-
-    # 4) Type coercion (safe)
-    out["amount"] = _to_float(out.get("amount"))
-    if out.get("balance_before") is not None:
-        out["balance_before"] = _to_float(out.get("balance_before"))
-    if out.get("balance_after") is not None:
-        out["balance_after"] = _to_float(out.get("balance_after"))
-    if out.get("label") is not None:
-        out["label"] = _to_int(out.get("label"))
-
-    # timestamps like "2025-09-29T08:12:22Z"
-    ts = out.get("timestamp")
-    if isinstance(ts, str):
-        out["timestamp"] = _to_datetime(ts)
-
-    return out
-
-def _to_float(v):
-    if v is None:
-        return None
-    try:
-        return float(v)
-    except Exception:
-        return None
+    conditions = [Transaction.timestamp.is_not(None)]
+    for col, value in (
+        (Transaction.account_id, account_id),
+        (Transaction.country, country),
+        (Transaction.channel, channel),
+        (Transaction.label, label),
+        (Transaction.merchant_category, merchant_category),
+    ):
+        if value is not None:
+            conditions.append(col == value)
+    if start is not None:
+        conditions.append(Transaction.timestamp >= start)
+    if end is not None:
+        conditions.append(Transaction.timestamp < end)
+    if after is not None:
+        conditions.append(tuple_(Transaction.timestamp, Transaction.transaction_id) < after)
+
+    return (
+        select(*_LIST_COLUMNS)
+        .where(*conditions)
+        .order_by(Transaction.timestamp.desc(), Transaction.transaction_id.desc())
+    )
 
-def _to_int(v):
-    if v is None:
-        return None
-    try:
-        return int(v)
-    except Exception:
-        return None
+def _encode_cursor(ts: datetime, transaction_id: str) -> str:
+    """Opaque, URL-safe cursor for the row a page ended on."""
+    raw = json.dumps([ts.isoformat(), transaction_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
 
-def _to_datetime(s: str):
+def _decode_cursor(cursor: str) -> tuple:
     try:
-        # Convert trailing 'Z' to +00:00
-        return datetime.fromisoformat(s.replace("Z", "+00:00"))
+        ts, transaction_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(ts), str(transaction_id)
     except Exception:
-        return None
-
-async def _insert_row_by_row(rows: list[Transaction], session: AsyncSession) -> int:
-    ok = 0
-    for obj in rows:
-        session.add(obj)
-        try:
-            await session.commit()
-            ok += 1
-        except IntegrityError:
-            await session.rollback()
-            # duplicate transaction_id; skip
-            continue
-    return ok
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def _stream_ndjson(stmt) -> AsyncIterator[bytes]:
+    """
+    Yield NDJSON lines from a server-side cursor.
+    Uses its own session: the request's get_session dependency is closed
+    before a StreamingResponse body is sent.
+    """
+    async with SessionLocal() as session:
+        result = await session.stream(
+            stmt.execution_options(yield_per=settings.LIST_STREAM_BATCH)
+        )
+        async for batch in result.partitions():
+            yield rows_ndjson(TX_COLUMNS, batch)
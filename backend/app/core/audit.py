@@ -0,0 +1,125 @@
+# backend/app/core/audit.py
+"""
+In-process audit log pipeline (writes the audit_logs table).
+
+Handlers call audit.emit(...) after their own commit. emit() only puts the
+event on a bounded in-memory queue (no await, no DB round trip), so auditing
+adds nothing to the request's transaction. A background task started in the
+API lifespan (AuditWriter.run) takes events off the queue and writes them
+with one multi-row INSERT + commit per batch: AUDIT_BATCH_SIZE events, or
+whatever arrived within AUDIT_FLUSH_MS of the first one.
+
+- bounded memory: at most AUDIT_QUEUE_SIZE events wait; when the queue is
+  full (DB down or too slow) new events are dropped and counted, the request
+  is never slowed down
+- shutdown: close() stops accepting events and waits up to
+  AUDIT_DRAIN_SECONDS for the queue to be written
+- /metrics: audit_events_written_total, audit_events_dropped_total{reason},
+  audit_queue_depth
+
+Bulk endpoints emit one summary event per request (counts in meta), not
+one per row.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.metrics import AUDIT_DROPPED, AUDIT_WRITTEN
+from app.db.models import AuditLog
+
+log = logging.getLogger(__name__)
+
+
+class AuditWriter:
+    def __init__(self, maxsize: int, batch_size: int, flush_ms: int):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_ms / 1000
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._closed = False
+
+    def emit(
+        self,
+        entity_type: str,
+        entity_id: str,
+        action: str,
+        meta: Optional[Dict[str, Any]] = None,
+        actor: Optional[str] = "api",
+    ) -> bool:
+        """Queue one audit event (never blocks). Returns False if it was dropped."""
+        if self._closed:
+            AUDIT_DROPPED.inc("shutdown")
+            return False
+        event = {
+            "id": str(uuid.uuid4()),
+            "entity_type": entity_type,
+            "entity_id": str(entity_id),
+            "action": action,
+            "actor": actor,
+            "meta": meta,
+            # the time of the action, not of the (later) batch insert
+            "created_at": datetime.now(timezone.utc),
+        }
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            AUDIT_DROPPED.inc("queue_full")
+            return False
+        return True
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    async def run(self, session_factory) -> None:
+        """Background task: batch events off the queue and insert them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._write(batch, session_factory)
+
+    async def _write(self, batch: List[dict], session_factory) -> None:
+        try:
+            async with session_factory() as session:
+                await session.execute(insert(AuditLog), batch)
+                await session.commit()
+            AUDIT_WRITTEN.inc(amount=len(batch))
+        except Exception as e:
+            # audit must not take the API down; the loss is visible in /metrics
+            log.warning("audit log write of %d event(s) failed: %s", len(batch), e)
+            AUDIT_DROPPED.inc("write_failed", amount=len(batch))
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting events and wait for the queued ones to be written."""
+        self._closed = True
+        timeout = settings.AUDIT_DRAIN_SECONDS if timeout is None else timeout
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            left = self._queue.qsize()
+            log.warning("audit drain timed out, %d event(s) not written", left)
+            AUDIT_DROPPED.inc("shutdown", amount=left)
+
+
+audit = AuditWriter(settings.AUDIT_QUEUE_SIZE, settings.AUDIT_BATCH_SIZE, settings.AUDIT_FLUSH_MS)
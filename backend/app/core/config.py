@@ -13,5 +13,65 @@ class Settings(BaseModel):
     # like postgresql+psycopg://fraud:fraudpw@db:5432/fraud
     SYNC_DATABASE_URL: str = os.getenv("SYNC_DATABASE_URL")
 
+    # Async engine pool (per API process).
+    # pool_size connections stay open; up to max_overflow more are opened under
+    # load; a request waits at most pool_timeout seconds for one before a 500.
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    # Recycle connections older than this (seconds); -1 disables
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    # asyncpg prepared-statement cache per connection (0 disables, e.g. behind pgbouncer)
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+
+    # CSV ingest: rows parsed + COPY'd per chunk (bounds memory for huge uploads)
+    INGEST_CHUNK_SIZE: int = int(os.getenv("INGEST_CHUNK_SIZE", "5000"))
+    # Parsed chunks allowed to wait for the DB writer (backpressure on the parser thread)
+    INGEST_QUEUE_DEPTH: int = int(os.getenv("INGEST_QUEUE_DEPTH", "2"))
+    # Threads parsing uploads (= concurrent uploads parsed at once)
+    INGEST_PARSE_THREADS: int = int(os.getenv("INGEST_PARSE_THREADS", "2"))
+    # python -m app.ingest.bulk load: sort memory for rebuilding the transactions indexes afterwards
+    BULK_MAINTENANCE_WORK_MEM: str = os.getenv("BULK_MAINTENANCE_WORK_MEM", "1GB")
+
+    # Server-side run scoring: transactions scored + inserted per chunk
+    SCORING_CHUNK_SIZE: int = int(os.getenv("SCORING_CHUNK_SIZE", "50000"))
+
+    # GET /transactions: max rows per page (json) / rows per cursor fetch (ndjson)
+    LIST_MAX_PAGE_SIZE: int = int(os.getenv("LIST_MAX_PAGE_SIZE", "10000"))
+    LIST_STREAM_BATCH: int = int(os.getenv("LIST_STREAM_BATCH", "2000"))
+
+    # /exports: rows fetched from the cursor and written per Arrow record batch
+    EXPORT_BATCH_ROWS: int = int(os.getenv("EXPORT_BATCH_ROWS", "50000"))
+
+    # scores is partitioned by month: keep this many future months created,
+    # re-checked every PARTITION_CHECK_SECONDS by the API
+    SCORES_PARTITION_MONTHS_AHEAD: int = int(os.getenv("SCORES_PARTITION_MONTHS_AHEAD", "3"))
+    PARTITION_CHECK_SECONDS: int = int(os.getenv("PARTITION_CHECK_SECONDS", "21600"))
+
+    # /metrics: per-route + per-statement timing (middleware and engine hooks); 0 turns them off
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "1") not in ("0", "false", "False")
+
+    # Cases: opened for transactions whose latest score is >= this (0-100);
+    # CASE_AUTO_OPEN=0 stops POST /runs/{run_id}/score from doing it
+    CASE_SCORE_THRESHOLD: float = float(os.getenv("CASE_SCORE_THRESHOLD", "80"))
+    CASE_AUTO_OPEN: bool = os.getenv("CASE_AUTO_OPEN", "1") not in ("0", "false", "False")
+
+    # POST /score/model: trained pipeline (financial-fraud/train_fraud_model.py) loaded
+    # at startup (empty = endpoint off), proba >= MODEL_THRESHOLD counts as fraud.
+    # Concurrent requests share one predict_proba call: up to MODEL_MAX_BATCH rows,
+    # or whatever arrived within MODEL_BATCH_WINDOW_MS of the first one.
+    MODEL_PATH: str = os.getenv("MODEL_PATH", "")
+    MODEL_THRESHOLD: float = float(os.getenv("MODEL_THRESHOLD", "0.5"))
+    MODEL_MAX_BATCH: int = int(os.getenv("MODEL_MAX_BATCH", "256"))
+    MODEL_BATCH_WINDOW_MS: float = float(os.getenv("MODEL_BATCH_WINDOW_MS", "2"))
+
+    # Audit log writer: events waiting in memory (more are dropped + counted),
+    # rows per INSERT, max wait before a partial batch is written, and how long
+    # shutdown waits for queued events
+    AUDIT_QUEUE_SIZE: int = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+    AUDIT_BATCH_SIZE: int = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+    AUDIT_FLUSH_MS: int = int(os.getenv("AUDIT_FLUSH_MS", "200"))
+    AUDIT_DRAIN_SECONDS: float = float(os.getenv("AUDIT_DRAIN_SECONDS", "10"))
+
 # Singleton-style settings object imported elsewhere (avoid re-parsing env repeatedly)
 settings = Settings()
@@ -0,0 +1,217 @@
+# backend/app/core/metrics.py
+"""
+In-process performance metrics, exposed in Prometheus text format at /metrics.
+
+- MetricsMiddleware (pure ASGI): per-route latency histogram, response size
+  histogram, request counter by status, requests in flight
+- instrument_engine(): SQLAlchemy cursor events time every statement under a
+  normalized label ("SELECT transactions", "INSERT scores", ...)
+- the engine pool (app.db.session.InstrumentedPool) reports checkout waits
+- the audit writer (app.core.audit) counts written and dropped events
+
+Cheap enough to leave on: fixed buckets (one bisect + two adds per
+observation), no locks (everything is updated from the event loop thread),
+labels are route templates / statement labels so the series count stays
+bounded. Set METRICS_ENABLED=0 to skip the middleware and engine hooks.
+"""
+
+import re
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """Fixed-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        s = self._series.get(labelvalues)
+        if s is None:
+            s = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+        s[0][bisect_left(self.buckets, value)] += 1
+        s[1] += value
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for le, c in zip(self.buckets + ("+Inf",), counts):
+                cumulative += c
+                bucket = _labels(self.labelnames, key, 'le="%s"' % le)
+                out.append(f"{self.name}_bucket{bucket} {cumulative}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return out
+
+
+class Counter:
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        for key, v in sorted(self._values.items()):
+            out.append(f"{self.name}{_labels(self.labelnames, key)} {v}")
+        return out
+
+
+class Gauge:
+    def __init__(self, name: str, doc: str):
+        self.name = name
+        self.doc = doc
+        self.value = 0
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} gauge", f"{self.name} {self.value}"]
+
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time from request start to the last response byte.",
+    ("method", "route"),
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size.", ("method", "route"), SIZE_BUCKETS,
+)
+HTTP_REQUESTS = Counter("http_requests_total", "Finished requests.", ("method", "route", "status"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled.")
+
+DB_STATEMENT = Histogram(
+    "db_statement_duration_seconds", "SQL statement execution time (driver round trip).", ("statement",),
+)
+DB_POOL_WAIT = Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection.")
+
+AUDIT_WRITTEN = Counter("audit_events_written_total", "Audit events inserted into audit_logs.")
+AUDIT_DROPPED = Counter(
+    "audit_events_dropped_total", "Audit events lost (queue_full, write_failed, shutdown).", ("reason",),
+)
+
+REGISTRY = [
+    HTTP_LATENCY, HTTP_RESPONSE_SIZE, HTTP_REQUESTS, HTTP_IN_FLIGHT, DB_STATEMENT, DB_POOL_WAIT,
+    AUDIT_WRITTEN, AUDIT_DROPPED,
+]
+
+
+def render_metrics(extra: Sequence[str] = ()) -> str:
+    """Prometheus text exposition of every metric, plus any extra pre-rendered lines."""
+    lines: List[str] = []
+    for m in REGISTRY:
+        lines.extend(m.render())
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
+
+
+# -------- HTTP --------
+
+def _route_label(scope) -> str:
+    """
+    Path template of the matched route as mounted ("/api/health/pool",
+    "/transactions/{transaction_id}"), so /transactions/tx1 and
+    /transactions/tx2 share one series. Unrouted paths share one "unmatched"
+    label.
+    """
+    # newer FastAPI keeps included routers un-flattened: scope["route"] is the
+    # router's own APIRoute (no include_router prefix) and the full template
+    # is on the effective route context; older versions copy each route with
+    # the prefix applied, so scope["route"].path is already complete
+    ctx = (scope.get("fastapi") or {}).get("effective_route_context")
+    path = getattr(ctx, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware task/stream wrapping)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        t0 = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_IN_FLIGHT.value += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.value -= 1
+            route = _route_label(scope)
+            method = scope["method"]
+            HTTP_LATENCY.observe(time.perf_counter() - t0, method, route)
+            HTTP_RESPONSE_SIZE.observe(size, method, route)
+            HTTP_REQUESTS.inc(method, route, str(status))
+
+
+# -------- SQL --------
+
+_VERB = re.compile(r"^\s*(?:/\*.*?\*/\s*)*(\w+)", re.S)
+_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE|JOIN)\s+\"?([\w.]+)", re.I)
+
+
+@lru_cache(maxsize=2048)
+def statement_label(statement: str) -> str:
+    """
+    'SELECT transactions' style label: first keyword + first table named.
+    Cached per statement text (our statements use bind parameters, so the set
+    of distinct texts is small).
+    """
+    m = _VERB.match(statement)
+    verb = m.group(1).upper() if m else "OTHER"
+    t = _TABLE.search(statement)
+    return f"{verb} {t.group(1)}" if t else verb
+
+
+def instrument_engine(sync_engine) -> None:
+    """Time every statement on the engine (pass AsyncEngine.sync_engine)."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_t0 = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        t0 = getattr(context, "_metrics_t0", None)
+        if t0 is not None:
+            DB_STATEMENT.observe(time.perf_counter() - t0, statement_label(statement))
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy import (
     Column, String, Numeric, DateTime, JSON, ForeignKey, SmallInteger,
-    Text, func, Enum, Index
+    Integer, Text, func, Enum, Index, text
 )
 import enum
 
@@ -58,10 +58,22 @@ class Transaction(Base):
 #   "give me recent tx for account X" (ORDER BY timestamp DESC)
 Index("ix_tx_core", Transaction.account_id, Transaction.timestamp.desc())
 
+# Keyset pagination for GET /transactions: ORDER BY timestamp DESC,
+# transaction_id DESC + WHERE (timestamp, transaction_id) < cursor
+Index("ix_tx_time_id", Transaction.timestamp.desc(), Transaction.transaction_id.desc())
+
+# Large timestamp-range scans (exports, report windows): a BRIN index is a few
+# pages and skips whole block ranges when rows arrive roughly in time order
+Index("ix_tx_timestamp_brin", Transaction.timestamp, postgresql_using="brin")
+
 class Score(Base):
     __tablename__ = "scores"
+    # Monthly range partitions on created_at (see app/db/partitions.py): report
+    # queries prune to the months of a run, old months detach instead of DELETE
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
-    # External-friendly ID (string so we can use UUIDs or hashes)
+    # External-friendly ID (string so we can use UUIDs or hashes).
+    # The PK is (id, created_at): a partitioned table's PK must include the key.
     id              = Column(String, primary_key=True)
 
     # Tie score to a transaction; delete tx => cascade delete scores
@@ -72,16 +84,32 @@ class Score(Base):
         nullable=False
     )
 
+    # Run that produced the score; deleting a run keeps its scores (SET NULL)
+    run_id          = Column(
+        String,
+        ForeignKey("rpa_runs.run_id", ondelete="SET NULL"),
+        nullable=True
+    )
+
     model_version   = Column(String, nullable=False)         # e.g., "v1.2.0"
     score           = Column(Numeric(5, 2), nullable=False)  # 0.00–100.00
     reason          = Column(Text)                           # optional explanation
 
-    # Server-side default timestamp (DB fills this in)
-    created_at      = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # Server-side default timestamp (DB fills this in); partition key
+    created_at      = Column(DateTime(timezone=True), server_default=func.now(), index=True, primary_key=True)
 
     # ORM backref
     transaction     = relationship("Transaction", back_populates="scores")
 
+# Per-run report queries ("latest score per tx in run X", "avg score of run X"):
+# leading run_id keeps the scan proportional to the run, created_at DESC serves
+# DISTINCT ON (transaction_id) directly, and INCLUDE (score) makes it index-only.
+Index(
+    "ix_scores_run_tx_created",
+    Score.run_id, Score.transaction_id, Score.created_at.desc(),
+    postgresql_include=["score"],
+)
+
 class Case(Base):
     __tablename__ = "cases"
 
@@ -109,6 +137,19 @@ class Case(Base):
 
     transaction     = relationship("Transaction", back_populates="cases")
 
+# Analyst queue = active cases (open / in_review); closed history isn't indexed
+# for the queue. One active case per transaction (auto-open relies on it as
+# its ON CONFLICT target); keyset pages over (status, created_at, id), with or
+# without an assignee filter.
+_ACTIVE_CASE = text("status IN ('open', 'in_review')")
+Index("uq_cases_active_transaction", Case.transaction_id, unique=True, postgresql_where=_ACTIVE_CASE)
+Index("ix_cases_queue", Case.status, Case.created_at, Case.id, postgresql_where=_ACTIVE_CASE)
+Index(
+    "ix_cases_assignee_queue",
+    Case.assigned_to, Case.status, Case.created_at, Case.id,
+    postgresql_where=_ACTIVE_CASE,
+)
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
@@ -120,13 +161,39 @@ class AuditLog(Base):
     meta        = Column(JSON)                                # arbitrary context (old/new values, etc.)
     created_at  = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
+class RpaRun(Base):
+    # Mirrors the Alembic-created rpa_runs table (orchestrator writes it with raw SQL)
+    __tablename__ = "rpa_runs"
+
+    run_id      = Column(String, primary_key=True)
+    started_at  = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    finished_at = Column(DateTime(timezone=True))
+    status      = Column(String, index=True)                  # "running" | "success" | "failed"
+    inserted    = Column(Integer, server_default="0")
+    scored      = Column(Integer, server_default="0")
+    flagged     = Column(Integer, server_default="0")
+    report_path = Column(Text)
+
 class Metrics(Base):
     __tablename__ = "metrics"
 
     id          = Column(String, primary_key=True)
     model_ver   = Column(String, nullable=False)
-    accuracy    = Column(Numeric(5, 3))
-    precision   = Column(Numeric(5, 3))
-    recall      = Column(Numeric(5, 3))
-    f1          = Column(Numeric(5, 3))
+
+    # Materialized per-run evaluation (one row per run, written when the run finishes)
+    run_id      = Column(
+        String,
+        ForeignKey("rpa_runs.run_id", ondelete="CASCADE"),
+        index=True,
+        unique=True,
+        nullable=True
+    )
+
+    # Percentages (0.00–100.00), same units as the /reports/latest payload
+    accuracy    = Column(Numeric(5, 2))
+    precision   = Column(Numeric(5, 2))
+    recall      = Column(Numeric(5, 2))
+    f1          = Column(Numeric(5, 2))
+    avg_score   = Column(Numeric(5, 2))
+    confusion_matrix = Column(JSON)                           # 3x3 [[actual][predicted]]
     created_at  = Column(DateTime(timezone=True), server_default=func.now(), index=True)
\ No newline at end of file
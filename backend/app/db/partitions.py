@@ -0,0 +1,115 @@
+# backend/app/db/partitions.py
+"""
+Monthly partitions of the scores table (RANGE on created_at).
+
+- ensure_score_partitions(): creates this month + SCORES_PARTITION_MONTHS_AHEAD
+  months (via the ensure_monthly_partitions() SQL function from the
+  migration). The API runs it at startup and every PARTITION_CHECK_SECONDS,
+  so inserts never hit a missing month.
+- detach_score_month(): takes an old month out of `scores` with
+  ALTER TABLE ... DETACH PARTITION (catalog-only, no matter how many rows),
+  optionally dropping it, instead of a huge DELETE.
+
+CLI:
+    python -m app.db.partitions ensure
+    python -m app.db.partitions list
+    python -m app.db.partitions detach 2025-01 [--drop]
+"""
+
+import argparse
+import asyncio
+import logging
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+_MONTH = re.compile(r"^(\d{4})-(\d{2})$")
+
+
+def score_partition_name(month: str) -> str:
+    """'2025-01' -> 'scores_y2025m01' (the naming ensure_monthly_partitions uses)."""
+    m = _MONTH.match(month)
+    if not m or not 1 <= int(m.group(2)) <= 12:
+        raise ValueError(f"month must look like YYYY-MM, got {month!r}")
+    return f"scores_y{m.group(1)}m{m.group(2)}"
+
+
+async def ensure_score_partitions(conn: AsyncConnection, months_ahead: Optional[int] = None) -> int:
+    """Create missing partitions from the current month to months_ahead; returns how many were new."""
+    months = settings.SCORES_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    return await conn.scalar(
+        text("SELECT ensure_monthly_partitions('scores', now(), now() + make_interval(months => :n))"),
+        {"n": months},
+    )
+
+
+async def list_score_partitions(conn: AsyncConnection) -> List[Dict[str, str]]:
+    """Attached partitions with their bounds, oldest first."""
+    rows = await conn.execute(text("""
+        SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bounds
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'scores'::regclass
+        ORDER BY c.relname
+    """))
+    return [dict(r) for r in rows.mappings()]
+
+
+async def detach_score_month(conn: AsyncConnection, month: str, drop: bool = False) -> str:
+    """Detach (and optionally drop) one month of scores. Returns the partition name."""
+    name = score_partition_name(month)
+    await conn.execute(text(f'ALTER TABLE scores DETACH PARTITION "{name}"'))
+    if drop:
+        await conn.execute(text(f'DROP TABLE "{name}"'))
+    return name
+
+
+async def partition_upkeep(engine) -> None:
+    """
+    Background task (API lifespan): ensure upcoming partitions now and every
+    PARTITION_CHECK_SECONDS. Errors are logged, not raised, so a DB hiccup or
+    an unmigrated DB doesn't take the API down.
+    """
+    while True:
+        try:
+            async with engine.begin() as conn:
+                created = await ensure_score_partitions(conn)
+            if created:
+                log.info("created %d scores partition(s)", created)
+        except Exception as e:
+            log.warning("scores partition upkeep failed: %s", e)
+        await asyncio.sleep(settings.PARTITION_CHECK_SECONDS)
+
+
+async def _main(args) -> None:
+    from app.db.session import engine
+
+    try:
+        async with engine.begin() as conn:
+            if args.command == "ensure":
+                print(f"created {await ensure_score_partitions(conn)} partition(s)")
+            elif args.command == "list":
+                for p in await list_score_partitions(conn):
+                    print(f"{p['name']:<20} {p['bounds']}")
+            else:
+                name = await detach_score_month(conn, args.month, drop=args.drop)
+                print(f"{'dropped' if args.drop else 'detached'} {name}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Manage monthly partitions of the scores table.")
+    sub = p.add_subparsers(dest="command", required=True)
+    sub.add_parser("ensure", help="Create partitions for this month and the next SCORES_PARTITION_MONTHS_AHEAD.")
+    sub.add_parser("list", help="List attached partitions.")
+    d = sub.add_parser("detach", help="Detach one month (catalog-only) instead of DELETE.")
+    d.add_argument("month", help="YYYY-MM")
+    d.add_argument("--drop", action="store_true", help="Also drop the detached table.")
+    asyncio.run(_main(p.parse_args()))
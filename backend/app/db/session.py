@@ -1,10 +1,65 @@
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import DB_POOL_WAIT, instrument_engine
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    The default async queue pool plus checkout counters, so we can see when
+    requests queue up for a connection (see pool_stats()).
+    Only touched from the event loop thread, so plain ints are enough.
+    """
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.waiters = 0              # checkouts currently blocked on a full pool
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0             # checkouts that gave up after pool_timeout
+
+    def connect(self):
+        # a checkout blocks only when nothing is idle and overflow is used up
+        blocking = self.checkedin() == 0 and self._max_overflow > -1 and self.overflow() >= self._max_overflow
+        if blocking:
+            self.waiters += 1
+        t0 = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            # only pool exhaustion; connect/auth errors are not timeouts
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - t0
+            if blocking:
+                self.waiters -= 1
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            DB_POOL_WAIT.observe(waited)
 
 # Create a global async engine.
 # pool_pre_ping=True: validates connections; if dead, SQLAlchemy replaces them.
+# Pool sizing/recycle and the asyncpg statement cache come from settings.
 # IMPORTANT: This uses the ASYNC URL (postgresql+asyncpg://...)
-engine = create_async_engine(settings.DATABASE_URL, pool_pre_ping=True)
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    poolclass=InstrumentedPool,
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    connect_args={"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+)
+
+# Per-statement timings for /metrics (SQLAlchemy cursor events on the sync core)
+if settings.METRICS_ENABLED:
+    instrument_engine(engine.sync_engine)
 
 # Factory that creates AsyncSession objects on demand.
 # expire_on_commit=False keeps loaded objects usable after commit (common in APIs).
@@ -14,6 +69,23 @@ SessionLocal = async_sessionmaker(
     expire_on_commit=False
 )
 
+def pool_stats() -> dict:
+    """Snapshot of the engine pool for /api/health/pool and load tests."""
+    pool = engine.pool
+    checkouts = getattr(pool, "checkouts", 0)
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),    # connections opened beyond pool_size
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "waiters": getattr(pool, "waiters", 0),
+        "checkouts": checkouts,
+        "timeouts": getattr(pool, "timeouts", 0),
+        "avg_wait_ms": round(1000.0 * getattr(pool, "wait_seconds_total", 0.0) / checkouts, 3) if checkouts else 0.0,
+        "max_wait_ms": round(1000.0 * getattr(pool, "wait_seconds_max", 0.0), 3),
+    }
+
 # Team tip:
 # - We do NOT open a session here. We only define how to create sessions.
 # - Actual open/close happens in a dependency (see deps.py).
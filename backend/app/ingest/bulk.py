@@ -0,0 +1,169 @@
+# backend/app/ingest/bulk.py
+"""
+Offline bulk load for big one-off CSV imports, with deferred secondary
+index maintenance on `transactions`.
+
+Normal ingest (POST /transactions/ingest-csv) updates every secondary
+index on `transactions` row by row for each merged chunk. This loader
+instead:
+
+1. drops the secondary indexes (DROP INDEX CONCURRENTLY),
+2. loads the file through the normal chunked COPY + ON CONFLICT path,
+   so only the primary key is maintained (ON CONFLICT needs it),
+3. rebuilds every index once (CREATE INDEX CONCURRENTLY). Building an
+   index from scratch is one sort, far cheaper than millions of
+   individual inserts into it.
+
+It is admin-only by construction: a CLI run with database credentials,
+never reachable from the API. Run it in a maintenance window: the API
+keeps working (the concurrent DDL never blocks reads or writes), but
+list and report queries have no secondary indexes until step 3 ends.
+
+- DDL runs on its own autocommit connection; the advisory lock that
+  allows one bulk load at a time is held on another connection and only
+  released once the rebuild has finished.
+- Index definitions come from the ORM metadata (Transaction.__table__),
+  and the rebuild runs even if the load fails. If the process itself
+  dies, `rebuild-indexes` restores them (and replaces any INVALID index
+  left by an interrupted concurrent build).
+
+Usage:
+    python -m app.ingest.bulk load transactions.csv
+    python -m app.ingest.bulk rebuild-indexes
+"""
+
+import asyncio
+import re
+import time
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.schema import CreateIndex
+
+from app.core.config import settings
+from app.db.models import Transaction
+
+# pg_advisory_lock key for "a bulk load is running" (any constant bigint)
+BULK_LOCK_KEY = 7_372_001
+
+_INVALID_INDEXES_SQL = text("""
+    SELECT c.relname
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE i.indrelid = 'transactions'::regclass AND NOT i.indisvalid
+""")
+
+
+class BulkLoadBusy(Exception):
+    """Another bulk load holds the lock."""
+
+
+def secondary_indexes() -> List:
+    """Every index the model declares on transactions (the PK is a constraint, not listed)."""
+    return sorted(Transaction.__table__.indexes, key=lambda ix: ix.name)
+
+
+def _create_concurrently_sql(ix, conn: AsyncConnection) -> str:
+    ddl = str(CreateIndex(ix, if_not_exists=True).compile(dialect=conn.dialect))
+    return re.sub(r"^CREATE (UNIQUE )?INDEX ", r"CREATE \1INDEX CONCURRENTLY ", ddl.strip(), count=1)
+
+
+async def _autocommit(engine: AsyncEngine) -> AsyncConnection:
+    # CONCURRENTLY cannot run inside a transaction block
+    conn = await engine.connect()
+    return await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+
+async def drop_secondary_indexes(engine: AsyncEngine) -> List[str]:
+    conn = await _autocommit(engine)
+    try:
+        quote = conn.dialect.identifier_preparer.quote
+        names = []
+        for ix in secondary_indexes():
+            await conn.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {quote(ix.name)}")
+            names.append(ix.name)
+        return names
+    finally:
+        await conn.close()
+
+
+async def build_secondary_indexes(engine: AsyncEngine) -> float:
+    """CREATE INDEX CONCURRENTLY IF NOT EXISTS for each model index; returns seconds spent."""
+    t0 = time.perf_counter()
+    conn = await _autocommit(engine)
+    try:
+        quote = conn.dialect.identifier_preparer.quote
+        # an interrupted concurrent build leaves an INVALID index that
+        # IF NOT EXISTS would happily skip
+        for name in (await conn.execute(_INVALID_INDEXES_SQL)).scalars().all():
+            await conn.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {quote(name)}")
+        # session-level: more sort memory for the builds
+        await conn.execute(text(f"SET maintenance_work_mem = '{settings.BULK_MAINTENANCE_WORK_MEM}'"))
+        for ix in secondary_indexes():
+            await conn.exec_driver_sql(_create_concurrently_sql(ix, conn))
+    finally:
+        await conn.close()
+    return time.perf_counter() - t0
+
+
+async def bulk_load(engine: AsyncEngine, path: str) -> Dict[str, float]:
+    """
+    Drop the secondary indexes, load `path`, rebuild them. Returns counts and
+    timings. Raises BulkLoadBusy if another bulk load is running.
+    """
+    from app.api.transactions import ingest_chunks
+    from app.db.session import SessionLocal
+
+    stats: Dict[str, float] = {}
+    async with engine.connect() as lock_conn:
+        locked = await lock_conn.scalar(text("SELECT pg_try_advisory_lock(:k)"), {"k": BULK_LOCK_KEY})
+        await lock_conn.commit()
+        if not locked:
+            raise BulkLoadBusy()
+        try:
+            t0 = time.perf_counter()
+            await drop_secondary_indexes(engine)
+            stats["drop_seconds"] = round(time.perf_counter() - t0, 3)
+            try:
+                t0 = time.perf_counter()
+                with open(path, "rb") as f:
+                    async with SessionLocal() as session:
+                        inserted, duplicates, rejected = await ingest_chunks(f, session)
+                stats.update(inserted=inserted, duplicates=duplicates, rejected=rejected)
+                stats["load_seconds"] = round(time.perf_counter() - t0, 3)
+            finally:
+                stats["index_rebuild_seconds"] = round(await build_secondary_indexes(engine), 3)
+        finally:
+            # only now: the lock covers the rebuild too
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": BULK_LOCK_KEY})
+            await lock_conn.commit()
+    return stats
+
+
+async def _main(args) -> None:
+    from app.db.session import engine
+
+    try:
+        if args.command == "load":
+            try:
+                stats = await bulk_load(engine, args.path)
+            except BulkLoadBusy:
+                raise SystemExit("ERROR: another bulk load is running")
+            print(stats)
+        else:
+            secs = await build_secondary_indexes(engine)
+            print(f"secondary indexes on transactions present ({secs:.1f}s)")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    p = argparse.ArgumentParser(description="Offline bulk load for the transactions table.")
+    sub = p.add_subparsers(dest="command", required=True)
+    load = sub.add_parser("load", help="Load a CSV with secondary index maintenance deferred.")
+    load.add_argument("path", help="CSV file (same format as POST /transactions/ingest-csv).")
+    sub.add_parser("rebuild-indexes", help="Recreate any missing or invalid secondary index.")
+    asyncio.run(_main(p.parse_args()))
@@ -0,0 +1,314 @@
+# backend/app/ingest/csv_parser.py
+"""
+Column-oriented CSV parser for transaction uploads.
+
+The header is resolved once per file into "which CSV column feeds which
+Transaction column" (strip, BOM, unknown headers dropped, last duplicate
+wins). The body is split into columns by pyarrow's CSV reader, a block at a
+time; each Transaction column is trimmed (and the string length checks done)
+in Arrow, converted to a Python list once, coerced with a single
+comprehension, and the COPY tuples are zipped back together. No per-row dict, header scan or try/except.
+
+Behaves like the old DictReader + _normalize_csv_row + _to_record path:
+- UTF-8 BOM (file or header) is ignored, blank lines are skipped
+- extra values past the header are dropped, missing ones count as blank
+  (pyarrow rejects such rows; we re-parse them with csv.reader and put them
+  back in file order)
+- values are stripped, "" -> None
+- amount/balances -> Decimal, label -> int, timestamp -> datetime
+  (unparseable -> None), then rows that would violate a column constraint
+  are rejected
+"""
+
+import bisect
+import csv
+import operator
+from datetime import datetime
+from decimal import Decimal
+from io import StringIO, TextIOWrapper
+from itertools import compress, repeat
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+from app.ingest.staging import TX_COLUMNS
+
+# Numeric(14, 2) holds at most 12 integer digits
+MAX_NUMERIC_14_2 = Decimal("1e12")
+
+# Bytes of CSV pyarrow parses per block (one Arrow batch)
+_BLOCK_BYTES = 1 << 22
+
+_DECIMAL_COLUMNS = ("amount", "balance_before", "balance_after")
+
+# positions inside a COPY tuple
+_POS = {c: i for i, c in enumerate(TX_COLUMNS)}
+
+
+def compile_header(header: Sequence[str]) -> Dict[str, int]:
+    """Map Transaction column -> index in the CSV row (resolved once per file)."""
+    plan: Dict[str, int] = {}
+    for i, name in enumerate(header):
+        name = name.strip()
+        if name.startswith("\ufeff"):
+            name = name.lstrip("\ufeff")
+        if name in _POS:
+            plan[name] = i  # duplicate header: last one wins (like DictReader)
+    return plan
+
+
+def _coerce(col: list, fn) -> list:
+    """
+    Apply a converter to a whole column. Fast path is map() with no per-value
+    try/except; only a batch containing a bad value is redone value by value
+    (bad -> None).
+    """
+    try:
+        if None not in col:
+            return list(map(fn, col))
+        return [None if v is None else fn(v) for v in col]
+    except Exception:
+        out = []
+        for v in col:
+            try:
+                out.append(None if v is None else fn(v))
+            except Exception:
+                out.append(None)
+        return out
+
+
+def _has_none(col: list) -> bool:
+    # identity scan in C; `None in col` would call Decimal.__eq__ (an ABC check) per value
+    return any(map(operator.is_, col, repeat(None)))
+
+
+def _z_offset(v: Optional[str]) -> Optional[str]:
+    # timestamps like "2025-09-29T08:12:22Z": convert trailing 'Z' to +00:00
+    return v.replace("Z", "+00:00") if v is not None else None
+
+
+def _all_in_range(col: list, lo, hi) -> bool:
+    """
+    Whole-column check: every non-null value v has lo < v < hi (and, for
+    Decimals, is finite: NaN makes min()/max() raise, Infinity fails the range).
+    Zeros are skipped by filter() but are always in range.
+    """
+    vals = list(filter(None, col))
+    if not vals:
+        return True
+    try:
+        return lo < min(vals) and max(vals) < hi
+    except Exception:
+        return False
+
+
+def _trim(arr: pa.Array, z_offset: bool = False) -> pa.Array:
+    """Strip whitespace in Arrow; z_offset: also 'Z' -> '+00:00' (timestamp column, see _z_offset)."""
+    arr = pc.utf8_trim_whitespace(arr)
+    if z_offset:
+        arr = pc.replace_substring(arr, "Z", "+00:00")
+    return arr
+
+
+def _to_list(arr: pa.Array) -> list:
+    """
+    Trimmed Arrow string column -> Python list, blanks -> None.
+    Empty cells are already null (read with null_values=[""]); only values
+    that were all whitespace need a Python pass.
+    """
+    col = arr.to_pylist()
+    if len(arr) and pc.min(pc.binary_length(arr)).as_py() == 0:
+        col = [v or None for v in col]
+    return col
+
+
+def _string_checks(arrays: Dict[str, pa.Array], n: int) -> list:
+    """
+    Required strings + VARCHAR lengths for a whole batch, computed in Arrow
+    (transaction_id non-blank, currency 1-3 chars, country <= 2 chars).
+    Returns one bool per row.
+    """
+    tx, cur, ctry = arrays.get("transaction_id"), arrays.get("currency"), arrays.get("country")
+    if tx is None or cur is None:
+        return [False] * n
+    cur_len = pc.utf8_length(cur)
+    mask = pc.and_(
+        pc.greater(pc.utf8_length(tx), 0),
+        pc.and_(pc.greater(cur_len, 0), pc.less_equal(cur_len, 3)),
+    )
+    if ctry is not None:
+        mask = pc.and_(mask, pc.fill_null(pc.less_equal(pc.utf8_length(ctry), 2), True))
+    return pc.fill_null(mask, False).to_pylist()
+
+
+def _row_string_checks(values: List[Optional[str]], plan: Dict[str, int]) -> bool:
+    # _string_checks for one re-parsed row
+    tx, cur, ctry = (
+        values[plan[c]] if c in plan else None
+        for c in ("transaction_id", "currency", "country")
+    )
+    return bool(tx) and bool(cur) and len(cur) <= 3 and (ctry is None or len(ctry) <= 2)
+
+
+def parse_columns(cols: Dict[str, list], ok: list) -> Tuple[List[tuple], int]:
+    """
+    Coerce + validate cleaned columns (TX column -> list of str/None, all the
+    same length; timestamps already have 'Z' -> '+00:00'). `ok` holds the
+    string checks per row (see _string_checks). Returns (COPY tuples in
+    TX_COLUMNS order, rejected count). Same checks as the old per-row _to_record.
+    """
+    n = len(cols["transaction_id"])
+    for c in _DECIMAL_COLUMNS:
+        cols[c] = _coerce(cols[c], Decimal)
+    cols["label"] = _coerce(cols["label"], int)
+    cols["timestamp"] = _coerce(cols["timestamp"], datetime.fromisoformat)
+
+    # required after coercion (missing or unparseable -> None)
+    for c in ("timestamp", "amount"):
+        if _has_none(cols[c]):
+            ok = [o and v is not None for o, v in zip(ok, cols[c])]
+
+    # Numeric(14, 2) columns (NaN/Infinity and 13+ integer digits don't fit).
+    # Checked per column first; per row only when the column has a bad value.
+    hi, lo = MAX_NUMERIC_14_2, -MAX_NUMERIC_14_2
+    for c in _DECIMAL_COLUMNS:
+        if not _all_in_range(cols[c], lo, hi):
+            ok = [
+                o and (v is None or (v.is_finite() and lo < v < hi))
+                for o, v in zip(ok, cols[c])
+            ]
+    # SmallInteger column
+    if not _all_in_range(cols["label"], -32769, 32768):
+        ok = [o and (v is None or -32768 <= v <= 32767) for o, v in zip(ok, cols["label"])]
+
+    # full tuples are zipped and filtered in C
+    records = list(compress(zip(*(cols[c] for c in TX_COLUMNS)), ok))
+    return records, n - len(records)
+
+
+def _irregular_row(text: str, width: int, ts_idx: Optional[int]) -> List[Optional[str]]:
+    """Re-parse a row pyarrow rejected (wrong column count); pad/truncate like DictReader."""
+    row = next(csv.reader(StringIO(text)), [])
+    row = (row + [None] * width)[:width]
+    row = [(v.strip() or None) if v is not None else None for v in row]
+    if ts_idx is not None:
+        row[ts_idx] = _z_offset(row[ts_idx])
+    return row
+
+
+def _merge(col: list, extra: List[Tuple[int, object]], span: int) -> list:
+    # put the re-parsed rows' values back at their file positions
+    slots = dict(extra)
+    it = iter(col)
+    return [slots[pos] if pos in slots else next(it) for pos in range(span)]
+
+
+def _read_header(binary) -> Tuple[Optional[List[str]], bool]:
+    """(header, whether anything follows it)."""
+    # leading blank lines aren't the header (DictReader would take the first
+    # one as an empty header and reject every row; deliberately lenient here)
+    wrapper = TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+    reader = csv.reader(wrapper)
+    header = next(reader, None)
+    while header == []:
+        header = next(reader, None)
+    has_more = header is not None and wrapper.read(1) != ""
+    wrapper.detach()
+    return header, has_more
+
+
+def parse_csv_chunks(binary, chunk_size: int) -> Iterator[Tuple[List[tuple], int]]:
+    """
+    Blocking CSV parser (runs on the ingest thread). `binary` must be seekable.
+    Yields (records, rejected) per chunk of up to chunk_size data rows.
+    """
+    header, has_more = _read_header(binary)
+    # a lone header (no trailing newline) makes pyarrow raise "Empty CSV file"
+    if header is None or not has_more:
+        return
+    binary.seek(0)
+    plan = compile_header(header)
+    width = len(header)
+
+    # pyarrow hands rows whose column count != header to this callback
+    # (row.number = 1-based record number incl. header, blank lines not counted)
+    pending: List[Tuple[int, str]] = []
+
+    def on_invalid(row) -> str:
+        bisect.insort(pending, (row.number, row.text))
+        return "skip"
+
+    reader = pa_csv.open_csv(
+        binary,
+        read_options=pa_csv.ReadOptions(
+            use_threads=False, block_size=_BLOCK_BYTES, autogenerate_column_names=True,
+        ),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True, invalid_row_handler=on_invalid),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={f"f{i}": pa.string() for i in range(width)},
+            # only empty cells become null (not "NA", "null", ...)
+            null_values=[""],
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=True,
+        ),
+    )
+
+    next_no = 1      # record number of the first row in the next span
+    first = True     # row 0 of the first batch is the header itself
+    while True:
+        try:
+            batch = reader.read_next_batch()
+        except StopIteration:
+            batch = None
+        m = batch.num_rows if batch is not None else 0
+
+        # irregular rows that fall inside this batch's span of record numbers
+        k = 0
+        while k < len(pending) and (batch is None or pending[k][0] < next_no + m + k):
+            k += 1
+        if batch is None and k == 0:
+            break
+        extra = [
+            (number - next_no, _irregular_row(text, width, plan.get("timestamp")))
+            for number, text in pending[:k]
+        ]
+        del pending[:k]
+        span = m + k
+        next_no += span
+
+        arrays = {
+            c: _trim(batch.column(idx), z_offset=(c == "timestamp"))
+            for c, idx in plan.items()
+        } if batch is not None else {}
+        ok = _string_checks(arrays, m) if batch is not None else []
+
+        cols = {}
+        for c in TX_COLUMNS:
+            idx = plan.get(c)
+            if idx is None:
+                cols[c] = [None] * span
+                continue
+            col = _to_list(arrays[c]) if batch is not None else []
+            if extra:
+                col = _merge(col, [(pos, values[idx]) for pos, values in extra], span)
+            cols[c] = col
+        if extra:
+            ok = _merge(ok, [(pos, _row_string_checks(values, plan)) for pos, values in extra], span)
+
+        if first:
+            cols = {c: v[1:] for c, v in cols.items()}
+            ok = ok[1:]
+            first = False
+
+        if cols["transaction_id"]:
+            records, rejected = parse_columns(cols, ok)
+            if not records:
+                yield [], rejected
+            for start in range(0, len(records), chunk_size):
+                yield records[start:start + chunk_size], rejected
+                rejected = 0
+
+        if batch is None:
+            break
@@ -0,0 +1,82 @@
+# backend/app/ingest/producer.py
+"""
+Run a blocking producer (e.g. CSV parsing) on a worker thread and consume
+its items from async code.
+
+The thread hands items to the event loop through a bounded asyncio.Queue:
+when the async consumer (the DB writer) falls behind, the queue fills and the
+thread blocks on put, so at most `maxsize` parsed chunks are ever in memory.
+The event loop only does cheap queue hand-offs, so other requests keep being
+served while a big file is parsed.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import AsyncIterator, Callable, Iterable, Optional, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Shared, bounded pool for ingest parsing (one thread per in-flight upload)
+_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=settings.INGEST_PARSE_THREADS,
+    thread_name_prefix="ingest-parse",
+)
+
+_DONE = object()
+
+# How often a blocked producer re-checks whether the consumer went away
+_PUT_POLL_SECONDS = 0.25
+
+
+async def iterate_in_thread(
+    make_iter: Callable[[], Iterable[T]],
+    maxsize: int = 2,
+    executor: Optional[concurrent.futures.Executor] = None,
+) -> AsyncIterator[T]:
+    """
+    Yield the items of `make_iter()` (which runs entirely on a worker thread).
+    Exceptions raised by the producer are re-raised here. If the consumer stops
+    early, the producer is told to stop at its next put.
+    Use with contextlib.aclosing() so cleanup runs as soon as the loop exits.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # blocks this thread (not the loop) while the queue is full
+        fut = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while True:
+            try:
+                fut.result(timeout=_PUT_POLL_SECONDS)
+                return True
+            except concurrent.futures.TimeoutError:
+                if stop.is_set():
+                    fut.cancel()
+                    return False
+
+    def produce() -> None:
+        try:
+            for item in make_iter():
+                if stop.is_set() or not put((item, None)):
+                    return
+        except BaseException as e:
+            put((_DONE, e))
+            return
+        put((_DONE, None))
+
+    task = loop.run_in_executor(executor or _executor, produce)
+    try:
+        while True:
+            item, err = await queue.get()
+            if item is _DONE:
+                if err is not None:
+                    raise err
+                break
+            yield item
+    finally:
+        stop.set()
+        await task
@@ -0,0 +1,78 @@
+# backend/app/ingest/staging.py
+"""
+COPY-based bulk writer for transactions.
+
+Each chunk of parsed rows is streamed into a session-local temp table with
+asyncpg's binary COPY, then merged into `transactions` with a single
+INSERT ... SELECT ... ON CONFLICT (transaction_id) DO NOTHING.
+
+Why not ORM add_all():
+- one Python object + one identity-map entry per row
+- a single duplicate aborts the whole batch
+COPY + ON CONFLICT keeps memory per chunk and skips duplicates in the DB.
+"""
+
+from typing import Iterable, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Column order used for COPY records (must match the tuples we build)
+TX_COLUMNS = (
+    "transaction_id", "timestamp", "account_id", "payer_id", "payee_id",
+    "amount", "currency", "merchant_category", "country", "channel",
+    "device_id", "ip_hash", "balance_before", "balance_after", "label", "notes",
+)
+
+STAGE_TABLE = "transactions_stage"
+
+_COLS_SQL = ", ".join(f'"{c}"' for c in TX_COLUMNS)
+
+# Temp table lives per DB connection; ON COMMIT DELETE ROWS empties it after
+# every chunk so it never grows. IF NOT EXISTS because pooled connections
+# may already have it from an earlier request.
+_CREATE_STAGE_SQL = text(f"""
+    CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE}
+    (LIKE transactions INCLUDING DEFAULTS)
+    ON COMMIT DELETE ROWS
+""")
+
+_MERGE_SQL = text(f"""
+    INSERT INTO transactions ({_COLS_SQL})
+    SELECT {_COLS_SQL} FROM {STAGE_TABLE}
+    ON CONFLICT (transaction_id) DO NOTHING
+""")
+
+
+async def copy_records(
+    session: AsyncSession,
+    table: str,
+    records: Iterable[tuple],
+    columns: Sequence[str],
+) -> None:
+    """
+    Stream tuples into `table` using asyncpg's COPY protocol on the session's
+    current connection (so it shares the session's transaction).
+    """
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    # driver_connection is the underlying asyncpg.Connection
+    await raw.driver_connection.copy_records_to_table(
+        table, records=records, columns=list(columns)
+    )
+
+
+async def merge_transactions_chunk(session: AsyncSession, records: list[tuple]) -> int:
+    """
+    COPY one chunk into the staging table and merge it into `transactions`.
+    Commits the chunk and returns how many rows were actually inserted
+    (len(records) - inserted == duplicates).
+    """
+    if not records:
+        return 0
+
+    await session.execute(_CREATE_STAGE_SQL)
+    await copy_records(session, STAGE_TABLE, records, TX_COLUMNS)
+    res = await session.execute(_MERGE_SQL)
+    await session.commit()
+    return res.rowcount or 0
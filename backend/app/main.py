@@ -1,13 +1,53 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from app.core.audit import audit
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.db.partitions import partition_upkeep
+from app.db.session import SessionLocal, engine, pool_stats
+from app.scoring.model import scorer
 from app.api.health import router as health_router
 from app.api import transactions, scores, cases, audit_logs
 from app.api import scores
 from app.api import reports
+from app.api import runs
+from app.api import exports
+from app.api import admin
+from app.api import model_scoring
 # The modules above should each define `router = APIRouter(...)`
 
+# Startup/shutdown: keep upcoming monthly scores partitions created while the
+# API runs (see app/db/partitions.py), and run the batched audit log writer
+# (app/core/audit.py), draining its queue before the engine goes away. The ML
+# model (MODEL_PATH) is loaded once here and served by the micro-batching
+# scorer task (app/scoring/model.py).
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    upkeep = asyncio.create_task(partition_upkeep(engine))
+    audit_writer = asyncio.create_task(audit.run(SessionLocal))
+    tasks = [upkeep, audit_writer]
+    if settings.MODEL_PATH:
+        try:
+            await asyncio.to_thread(scorer.load, settings.MODEL_PATH)
+            tasks.append(asyncio.create_task(scorer.run()))
+        except Exception as e:
+            logging.getLogger(__name__).warning("model %s not loaded: %s", settings.MODEL_PATH, e)
+    try:
+        yield
+    finally:
+        await audit.close()
+        for task in tasks:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
 # Create the FastAPI application instance (this is what Uvicorn runs).
-app = FastAPI(title="Fraud RPA Backend")
+app = FastAPI(title="Fraud RPA Backend", lifespan=lifespan)
 
 # --- CORS configuration ---
 # Allow the React app (localhost:3000 during development) and our Netlify site
@@ -28,11 +68,28 @@ app.add_middleware(
 )
 # --- end CORS configuration ---
 
+# Per-route latency / size / in-flight metrics (pure ASGI, outermost so it
+# also times CORS handling). Exposed at /metrics.
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Simple liveness endpoint for containers/monitors (K8s/Compose/health checks).
 @app.get("/healthz")
 async def health():
     return {"status": "ok"}
 
+# Prometheus scrape endpoint: HTTP + SQL histograms, current pool gauges and
+# the audit queue depth.
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    pool = pool_stats()
+    extra = []
+    for key in ("checked_out", "idle", "overflow", "waiters"):
+        extra += [f"# TYPE db_pool_{key} gauge", f"db_pool_{key} {pool[key]}"]
+    extra += ["# TYPE db_pool_timeouts_total counter", f"db_pool_timeouts_total {pool['timeouts']}"]
+    extra += ["# TYPE audit_queue_depth gauge", f"audit_queue_depth {audit.depth()}"]
+    return PlainTextResponse(render_metrics(extra), media_type="text/plain; version=0.0.4")
+
 # Wire in the feature routers so their routes become part of the app.
 # If any of these modules don’t exist or don’t define `router`, import will fail.
 app.include_router(health_router, prefix="/api")
@@ -42,4 +99,8 @@ app.include_router(scores.router)
 app.include_router(cases.router)
 app.include_router(audit_logs.router)
 app.include_router(reports.router)
+app.include_router(runs.router)
+app.include_router(exports.router)
+app.include_router(admin.router)
+app.include_router(model_scoring.router)
 
@@ -14,18 +14,23 @@ We compute:
 No scikit-learn dependency required.
 """
 
-from typing import List, Tuple, Dict, Optional
+from typing import Iterable, List, Tuple, Dict, Optional
 
 CLASSES = [0, 1, 2]
 
+# Score thresholds for the predicted class (also used by the SQL aggregation
+# in report_service, so both paths bucket scores the same way)
+FRAUD_SCORE_THRESHOLD = 80.0
+SUSPICIOUS_SCORE_THRESHOLD = 50.0
+
 def predicted_label_from_score(score: float) -> int:
     """
     Convert numeric score (0-100) -> class label.
     These thresholds should match how your pipeline interprets "flagged".
     """
-    if score >= 80.0:
+    if score >= FRAUD_SCORE_THRESHOLD:
         return 2  # Fraud
-    if score >= 50.0:
+    if score >= SUSPICIOUS_SCORE_THRESHOLD:
         return 1  # Suspicious
     return 0      # No Fraud
 
@@ -42,6 +47,17 @@ def build_confusion_matrix(y_true: List[int], y_pred: List[int]) -> List[List[in
             cm[t][p] += 1
     return cm
 
+def confusion_matrix_from_counts(rows: Iterable[Tuple[int, int, int]]) -> List[List[int]]:
+    """
+    Build the 3x3 matrix from pre-aggregated (actual, predicted, count) rows,
+    e.g. the output of a SQL GROUP BY over label + predicted bucket.
+    """
+    cm = empty_confusion_matrix()
+    for t, p, n in rows:
+        if t in CLASSES and p in CLASSES:
+            cm[t][p] += int(n)
+    return cm
+
 def compute_metrics_from_cm(cm: List[List[int]]) -> Dict[str, Optional[float]]:
     """
     Compute:
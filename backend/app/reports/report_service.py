@@ -1,26 +1,61 @@
 # backend/app/reports/report_service.py
 
-from typing import Dict, Any, Optional
 from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+from uuid import uuid4
 
 from sqlalchemy import select, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Score  # already have this ORM model
 
-from app.db.models import Transaction
+from app.db.models import Transaction, Metrics
 from app.reports.eval_metrics import (
-    predicted_label_from_score,
-    build_confusion_matrix,
+    FRAUD_SCORE_THRESHOLD,
+    SUSPICIOUS_SCORE_THRESHOLD,
+    confusion_matrix_from_counts,
     compute_metrics_from_cm,
     empty_confusion_matrix,
 )
+from app.scoring.rules import MODEL_VERSION
+
+# lower bound for runs without started_at (no partition pruning then)
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Run confusion matrix, aggregated in SQL (label x predicted bucket), so at
+# most 9 rows come back instead of one row per scored transaction.
+# Params: run_id, since (run start, prunes scores partitions), thresholds.
+RUN_CONFUSION_SQL = text("""
+WITH latest_scores AS (
+    SELECT DISTINCT ON (s.transaction_id)
+        s.transaction_id,
+        s.score
+    FROM scores s
+    WHERE s.run_id = :run_id
+    AND s.created_at >= :since
+    ORDER BY s.transaction_id, s.created_at DESC
+)
+SELECT
+    t.label AS actual_label,
+    CASE
+        WHEN ls.score >= :fraud_threshold THEN 2
+        WHEN ls.score >= :suspicious_threshold THEN 1
+        ELSE 0
+    END AS predicted_label,
+    COUNT(*) AS n
+FROM latest_scores ls
+JOIN transactions t
+    ON t.transaction_id = ls.transaction_id
+WHERE t.label IS NOT NULL
+GROUP BY 1, 2
+""")
 
 # get the newest row from rpa_runs
 async def fetch_latest_run(session: AsyncSession) -> Optional[Dict[str, Any]]:
     """
     Fetch the most recent row from rpa_runs.
-    We use raw SQL because rpa_runs is created via Alembic and doesn't have an ORM model.
+    Raw SQL keeps the row a plain dict (the RpaRun ORM model only mirrors the table).
     """
     sql = text("""
         SELECT
@@ -49,75 +84,49 @@ async def compute_run_metrics(run: Dict[str, Any], session: AsyncSession) -> Dic
     - avg_score (existing)
     - evaluation metrics (accuracy/precision/recall/f1 + confusion matrix)
       using Transaction.label as ground truth and Score.score -> predicted class.
+    Scores are matched to the run by scores.run_id (not by a created_at window,
+    which scanned the whole table and mixed up overlapping runs).
     """
-    started_at = run.get("started_at")
-    finished_at = run.get("finished_at")
+    run_id = run["run_id"]
+    # A run's scores are never older than the run: bounding created_at lets
+    # Postgres prune the monthly scores partitions before the run started.
+    since = run.get("started_at") or _EPOCH
 
-    # If finished_at isn't set yet (run still "running"), treat "now" as end.
-    if finished_at is None:
-        finished_at = datetime.now(timezone.utc)
+    # Both queries below filter on scores.run_id, so they're range scans of
+    # ix_scores_run_tx_created (cost ~ run size, not scores table size).
 
     # -------------------------
     # Avg score (existing logic)
     # -------------------------
-    stmt_avg = select(func.avg(Score.score))
-    if started_at is not None:
-        stmt_avg = stmt_avg.where(Score.created_at >= started_at)
-    if finished_at is not None:
-        stmt_avg = stmt_avg.where(Score.created_at <= finished_at)
+    stmt_avg = select(func.avg(Score.score)).where(Score.run_id == run_id, Score.created_at >= since)
 
     avg_score = await session.scalar(stmt_avg)
     avg_score = float(avg_score or 0.0)
 
     # -------------------------------------------------------
-    # Evaluation metrics: join latest score per tx in window
+    # Evaluation metrics: join latest score per tx in the run
     # -------------------------------------------------------
-    # Use raw SQL for a clean "latest score per transaction" query.
-    sql = text("""
-        WITH latest_scores AS (
-            SELECT
-                s.transaction_id,
-                MAX(s.created_at) AS max_created_at
-            FROM scores s
-            WHERE
-                s.created_at >= COALESCE(CAST(:started_at AS timestamptz), '-infinity'::timestamptz)
-                AND s.created_at <= CAST(:finished_at AS timestamptz)
-            GROUP BY s.transaction_id
-        )
-        SELECT
-            t.label AS actual_label,
-            s.score AS score_value
-        FROM latest_scores ls
-        JOIN scores s
-            ON s.transaction_id = ls.transaction_id
-            AND s.created_at = ls.max_created_at
-        JOIN transactions t
-            ON t.transaction_id = s.transaction_id
-        WHERE t.label IS NOT NULL
-    """)
+    sql = RUN_CONFUSION_SQL
 
     result = await session.execute(
         sql,
-        {"started_at": started_at, "finished_at": finished_at}
+        {
+            "run_id": run_id,
+            "since": since,
+            "fraud_threshold": FRAUD_SCORE_THRESHOLD,
+            "suspicious_threshold": SUSPICIOUS_SCORE_THRESHOLD,
+        }
     )
-    rows = result.mappings().all()
-
-    y_true = []
-    y_pred = []
+    counts = [
+        (int(r["actual_label"]), int(r["predicted_label"]), int(r["n"]))
+        for r in result.mappings().all()
+    ]
 
-    for r in rows:
-        actual = int(r["actual_label"])
-        score_value = float(r["score_value"])
-        pred = predicted_label_from_score(score_value)
-
-        y_true.append(actual)
-        y_pred.append(pred)
-
-    if len(y_true) == 0:
+    if not counts:
         cm = empty_confusion_matrix()
         eval_metrics = {"accuracy": None, "precision": None, "recall": None, "f1-score": None}
     else:
-        cm = build_confusion_matrix(y_true, y_pred)
+        cm = confusion_matrix_from_counts(counts)
         eval_metrics = compute_metrics_from_cm(cm)
 
     return {
@@ -126,6 +135,59 @@ async def compute_run_metrics(run: Dict[str, Any], session: AsyncSession) -> Dic
         "confusion_matrix": cm,
     }
 
+def _as_float(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+# read the materialized metrics row for a run (unique index on metrics.run_id)
+async def fetch_stored_metrics(run_id: str, session: AsyncSession) -> Optional[Dict[str, Any]]:
+    """
+    Return stored metrics for a run in the same shape as compute_run_metrics(),
+    or None if the run hasn't been materialized yet.
+    """
+    row = (
+        await session.execute(select(Metrics).where(Metrics.run_id == run_id))
+    ).scalar_one_or_none()
+    if row is None:
+        return None
+
+    return {
+        "avg_score": _as_float(row.avg_score) or 0.0,
+        "eval_metrics": {
+            "accuracy": _as_float(row.accuracy),
+            "precision": _as_float(row.precision),
+            "recall": _as_float(row.recall),
+            "f1-score": _as_float(row.f1),
+        },
+        "confusion_matrix": row.confusion_matrix or empty_confusion_matrix(),
+    }
+
+# compute once and upsert into metrics (called when a run finishes)
+async def store_run_metrics(run: Dict[str, Any], session: AsyncSession) -> Dict[str, Any]:
+    """
+    Compute metrics for a run and store them in the metrics table.
+    Re-running for the same run overwrites the previous row.
+    """
+    metrics = await compute_run_metrics(run, session)
+    ev = metrics["eval_metrics"]
+
+    values = {
+        "model_ver": MODEL_VERSION,
+        "accuracy": ev["accuracy"],
+        "precision": ev["precision"],
+        "recall": ev["recall"],
+        "f1": ev["f1-score"],
+        "avg_score": metrics["avg_score"],
+        "confusion_matrix": metrics["confusion_matrix"],
+    }
+    stmt = pg_insert(Metrics).values(id=str(uuid4()), run_id=run["run_id"], **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Metrics.run_id],
+        set_={k: stmt.excluded[k] for k in values} | {"created_at": func.now()},
+    )
+    await session.execute(stmt)
+    await session.commit()
+    return metrics
+
 # combine rpa_runs numbers and computed metrics into JSON that matches the schema
 async def build_latest_run_payload(session: AsyncSession) -> Optional[Dict[str, Any]]:
     """
@@ -135,7 +197,12 @@ async def build_latest_run_payload(session: AsyncSession) -> Optional[Dict[str,
     if not run:
         return None
 
-    metrics = await compute_run_metrics(run, session)
+    # Normal path: metrics were stored when the run finished.
+    # Runs without stored metrics are computed on the fly (read-only; storing
+    # them is POST /runs/{run_id}/metrics' job).
+    metrics = await fetch_stored_metrics(run["run_id"], session)
+    if metrics is None:
+        metrics = await compute_run_metrics(run, session)
 
     scored = run.get("scored") or 0
     flagged = run.get("flagged") or 0
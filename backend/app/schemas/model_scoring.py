@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+class ModelScoreIn(BaseModel):
+    # one transaction in the Kaggle schema the model was trained on
+    step: int
+    type: str                    # PAYMENT | TRANSFER | CASH_OUT | DEBIT | CASH_IN
+    amount: float
+    oldbalanceOrg: float
+    newbalanceOrig: float
+    oldbalanceDest: float
+    newbalanceDest: float
+
+class ModelScoreOut(BaseModel):
+    fraud_proba: float
+    is_fraud: bool               # fraud_proba >= MODEL_THRESHOLD
+    model_version: str
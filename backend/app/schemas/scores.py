@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 from datetime import datetime
 
@@ -7,8 +7,17 @@ class ScoreCreate(BaseModel):
     model_version: str = "rules-v0"
     score: float
     reason: Optional[str] = None
+    # rpa_runs.run_id that produced this score (used by per-run reports)
+    run_id: Optional[str] = None
 
 class ScoreOut(ScoreCreate):
     id: str
     created_at: datetime
     model_config = ConfigDict(from_attributes=True)
+
+class ScoreBatchCreate(BaseModel):
+    # thousands of scores per request -> one multi-row INSERT
+    scores: list[ScoreCreate] = Field(..., min_length=1)
+
+class ScoreBatchOut(BaseModel):
+    inserted: int
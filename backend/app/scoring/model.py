@@ -0,0 +1,119 @@
+# backend/app/scoring/model.py
+"""
+Online scoring with the trained fraud model (financial-fraud/train_fraud_model.py
+-> fraud_model.joblib, an sklearn Pipeline over the Kaggle columns).
+
+The model is loaded once at API startup (MODEL_PATH). Requests don't call
+predict_proba themselves: ModelScorer.predict() puts the row on a queue and
+awaits a future. One background task takes rows off the queue in
+micro-batches -- up to MODEL_MAX_BATCH rows, or whatever arrived within
+MODEL_BATCH_WINDOW_MS of the first one -- and runs predict_proba once per
+batch on a worker thread. While a batch is being scored the next one
+collects, so batches grow with load: one client pays at most the window,
+hundreds of concurrent clients share a handful of predict_proba calls.
+
+A RandomForest predict_proba costs about the same for 1 row as for a few
+hundred (per-call overhead: input validation, ColumnTransformer, one pass
+over every tree), which is what makes batching pay off.
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+# raw columns the pipeline was trained on (train_fraud_model.py usecols minus isFraud)
+MODEL_FEATURES = [
+    "step", "type", "amount",
+    "oldbalanceOrg", "newbalanceOrig",
+    "oldbalanceDest", "newbalanceDest",
+]
+
+
+def load_model(path: str) -> Any:
+    """joblib.load the pipeline, set up for small online batches."""
+    import joblib
+
+    model = joblib.load(path)
+    # n_jobs=-1 (how it was trained) starts a joblib thread pool on every
+    # predict call, which costs more than the trees for a batch of a few rows
+    est = model.steps[-1][1] if hasattr(model, "steps") else model
+    if hasattr(est, "n_jobs"):
+        est.n_jobs = 1
+    return model
+
+
+def fraud_proba(model: Any, X: pd.DataFrame) -> np.ndarray:
+    """P(fraud) per row (last predict_proba column, as in kaggle_scoring.py)."""
+    return model.predict_proba(X)[:, -1]
+
+
+class ModelScorer:
+    def __init__(self, max_batch: int, window_ms: float):
+        self.max_batch = max_batch
+        self.window_seconds = window_ms / 1000
+        self.model: Any = None
+        self.version: Optional[str] = None
+        self._queue: asyncio.Queue = asyncio.Queue()
+        # one thread: one batch in flight, the next one collects meanwhile
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-scorer")
+
+    @property
+    def ready(self) -> bool:
+        return self.model is not None
+
+    def load(self, path: str, version: Optional[str] = None) -> None:
+        self.model = load_model(path)
+        self.version = version or os.path.splitext(os.path.basename(path))[0]
+
+    async def predict(self, row: Dict[str, Any]) -> float:
+        """P(fraud) for one row (dict with MODEL_FEATURES), scored in the next batch."""
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, fut))
+        return await fut
+
+    async def run(self) -> None:
+        """Background task: collect micro-batches and score them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window_seconds
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._score(batch, loop)
+
+    async def _score(self, batch: List[tuple], loop) -> None:
+        X = pd.DataFrame([row for row, _ in batch], columns=MODEL_FEATURES)
+        try:
+            proba = await loop.run_in_executor(self._executor, fraud_proba, self.model, X)
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), p in zip(batch, proba.tolist()):
+            # the request may have gone away (client disconnect) meanwhile
+            if not fut.done():
+                fut.set_result(p)
+
+
+scorer = ModelScorer(settings.MODEL_MAX_BATCH, settings.MODEL_BATCH_WINDOW_MS)
@@ -0,0 +1,72 @@
+# backend/app/scoring/rules.py
+"""
+Vectorized version of the orchestrator's rule scorer (rules-v0).
+
+Same rules as the old per-transaction `rule_score(tx)`:
+- base score 20
+- +50 high_amount      (amount >= 10000)
+- +15 foreign_country  (country not US/CA, missing counts as foreign)
+- +15 risky_mcc        (merchant_category crypto/gambling, case-insensitive)
+- capped at 100; reason is the comma-joined rule names or "baseline"
+
+Every rule is evaluated over a whole column at once, so scoring a chunk of
+transactions is a few NumPy operations instead of a Python loop.
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+MODEL_VERSION = "rules-v0"
+
+BASE_SCORE = 20.0
+MAX_SCORE = 100.0
+HIGH_AMOUNT = 10000.0
+HOME_COUNTRIES = ["US", "CA"]
+RISKY_MCC = ["crypto", "gambling"]
+
+# score >= this counts as "flagged" in run summaries
+FLAG_THRESHOLD = 80.0
+
+# (rule name, weight) in the order reasons are listed
+RULES = [
+    ("high_amount", 50.0),
+    ("foreign_country", 15.0),
+    ("risky_mcc", 15.0),
+]
+
+# Reason string for every combination of fired rules, indexed by bitmask
+# (bit i set => RULES[i] fired). Lets us build reasons with one take().
+_REASON_BY_MASK = np.array(
+    [
+        ", ".join(name for i, (name, _) in enumerate(RULES) if mask & (1 << i)) or "baseline"
+        for mask in range(1 << len(RULES))
+    ],
+    dtype=object,
+)
+
+
+def score_frame(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score a DataFrame with columns amount, country, merchant_category.
+    Returns (scores float64 array, reasons object array), aligned with df rows.
+    """
+    amount = pd.to_numeric(df["amount"], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+    country = df["country"]
+    mcc = df["merchant_category"].fillna("").astype(str).str.lower()
+
+    fired = [
+        amount >= HIGH_AMOUNT,
+        ~country.isin(HOME_COUNTRIES).to_numpy(),
+        mcc.isin(RISKY_MCC).to_numpy(),
+    ]
+
+    scores = np.full(len(df), BASE_SCORE, dtype=np.float64)
+    mask = np.zeros(len(df), dtype=np.int64)
+    for i, ((_, weight), hit) in enumerate(zip(RULES, fired)):
+        scores += np.where(hit, weight, 0.0)
+        mask |= hit.astype(np.int64) << i
+
+    np.minimum(scores, MAX_SCORE, out=scores)
+    return scores, _REASON_BY_MASK[mask]
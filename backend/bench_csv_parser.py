@@ -0,0 +1,250 @@
+"""
+Parity check + throughput benchmark for the ingest CSV parser.
+
+- parity: runs the column-oriented parser (app.ingest.csv_parser) and a copy
+  of the old DictReader + _normalize_csv_row + _to_record path over an
+  edge-case file (BOM, extra trailing values, blanks, whitespace, bad values)
+  and a synthetic file, and fails if any record or reject count differs
+- benchmark: parse-only rows/sec for both on N rows cloned from
+  financial-fraud/transactions_1000.csv (no DB, no HTTP)
+
+Usage:
+    python bench_csv_parser.py                    # 1M rows
+    python bench_csv_parser.py --rows 10000000 --repeat 1
+"""
+import argparse, csv, io, os, sys, tempfile, time
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from app.ingest import csv_parser
+from app.ingest.csv_parser import parse_csv_chunks, MAX_NUMERIC_14_2
+from app.ingest.staging import TX_COLUMNS
+from bench_ingest import build_csv
+
+CHUNK = 5000
+
+EDGE_CSV = (
+    "\ufefftransaction_id , timestamp,account_id,payer_id,payee_id,amount,currency,"
+    "merchant_category,country,channel,device_id,ip_hash,balance_before,balance_after,label,notes,junk\r\n"
+    "tx1,2025-09-29T08:12:22Z,a1,p1,m1,12.50,USD,grocery,US,web,d1,h1,100,87.5,0,ok,x\r\n"
+    "\r\n"
+    " tx2 , 2025-09-29T08:13:00+02:00 ,a1,p1,m1, 99 ,usd,,FR,app,d1,h1,,,1,,x,extra1,extra2\r\n"
+    "tx3,not-a-date,a1,p1,m1,1,USD,,US,web,d1,h1,1,0,0,,\r\n"
+    "tx4,2025-09-29T08:14:00Z,a1,p1,m1,abc,USD,,US,web,d1,h1,1,0,0,,\r\n"
+    "tx5,2025-09-29T08:15:00Z,a1,p1,m1,1e13,USD,,US,web,d1,h1,1,0,0,,\r\n"
+    "tx6,2025-09-29T08:16:00Z,a1,p1,m1,NaN,USD,,US,web,d1,h1,1,0,0,,\r\n"
+    "tx7,2025-09-29T08:17:00Z,a1,p1,m1,5,USDX,,US,web,d1,h1,1,0,0,,\r\n"
+    "tx8,2025-09-29T08:18:00Z,a1,p1,m1,5,EUR,,USA,web,d1,h1,1,0,0,,\r\n"
+    "tx9,2025-09-29T08:19:00Z,a1,p1,m1,5,EUR,,DE,web,d1,h1,1,0,40000,,\r\n"
+    "tx10,2025-09-29T08:20:00Z,a1,p1,m1,5,EUR,,DE,web,d1,h1,1,0,two,,\r\n"
+    ",2025-09-29T08:21:00Z,a1,p1,m1,5,EUR,,DE,web,d1,h1,1,0,0,,\r\n"
+    "tx12,2025-09-29T08:22:00Z,a1\r\n"
+    "   \r\n"
+    ",,,,,,,,,,,,,,,,\r\n"
+    '"tx13","2025-09-29T08:23:00Z","a,1",p1,m1,"1,5",EUR,,DE,web,d1,h1,1,0,2,"quoted, note"\r\n'
+    "tx14,2025-09-29T08:24:00Z,a1,p1,m1,-0.01,EUR,,DE,web,d1,h1,-5,-5.01,2,trailing\r\n"
+    'tx15,2025-09-29T08:25:00Z,a1,p1,m1,3,EUR,,DE,web,d1,h1,1,0,1,"multi\nline, note",x,"extra\nquoted"\r\n'
+    "tx16,2025-09-29T08:26:00Z,a1,p1,m1,Infinity,EUR,,DE,web,d1,h1,1,0,1,,\r\n"
+    "tx17,2025-09-29T08:27:00Z,a1,p1,m1,7,EUR,,DE,web,d1,h1,sNaN,0,1,,\r\n"
+    "tx1,2025-09-29T08:28:00Z,a1,p1,m1,8,EUR,,DE,web,d1,h1,1,0,-40000,dup id,\r\n"
+)
+
+
+def messy(data: bytes, every=37) -> bytes:
+    """Sprinkle irregular rows (extra / missing values), blank lines and quoted newlines."""
+    lines = data.decode("utf-8").split("\r\n")
+    out = [lines[0]]
+    for i, line in enumerate(lines[1:], 1):
+        if not line:
+            continue
+        if i % every == 0:
+            line += ",extra,more"
+        elif i % every == 7:
+            line = ",".join(line.split(",")[:5])
+        elif i % every == 11:
+            out.append("")
+        elif i % every == 13:
+            line = line.rsplit(",", 1)[0] + ',"note with\nnewline"'
+        out.append(line)
+    return "\r\n".join(out).encode("utf-8")
+
+
+# -------- reference: the old per-row path (copied from app/api/transactions.py) --------
+
+def _normalize_csv_row(row: Dict[Any, Any]) -> Dict[str, Any]:
+    for k in list(row.keys()):
+        if not isinstance(k, str):
+            row.pop(k, None)
+    fixed: Dict[str, Any] = {}
+    for k, v in row.items():
+        k2 = k.strip()
+        if k2.startswith("\ufeff"):
+            k2 = k2.lstrip("\ufeff")
+        if isinstance(v, str):
+            v = v.strip()
+            if v == "":
+                v = None
+        fixed[k2] = v
+    cols = [
+        "transaction_id","timestamp","account_id","payer_id","payee_id",
+        "amount","currency","merchant_category","country","channel",
+        "device_id","ip_hash","balance_before","balance_after","label","notes",
+    ]
+    out: Dict[str, Any] = {c: fixed.get(c) for c in cols if c in fixed}
+    out["amount"] = _to_decimal(out.get("amount"))
+    if out.get("balance_before") is not None:
+        out["balance_before"] = _to_decimal(out.get("balance_before"))
+    if out.get("balance_after") is not None:
+        out["balance_after"] = _to_decimal(out.get("balance_after"))
+    if out.get("label") is not None:
+        out["label"] = _to_int(out.get("label"))
+    ts = out.get("timestamp")
+    if isinstance(ts, str):
+        out["timestamp"] = _to_datetime(ts)
+    return out
+
+def _to_decimal(v):
+    if v is None:
+        return None
+    try:
+        return Decimal(v)
+    except Exception:
+        return None
+
+def _to_int(v):
+    if v is None:
+        return None
+    try:
+        return int(v)
+    except Exception:
+        return None
+
+def _to_datetime(s: str):
+    try:
+        return datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except Exception:
+        return None
+
+def _to_record(row: Dict[str, Any]) -> Optional[tuple]:
+    if not row.get("transaction_id") or not row.get("currency"):
+        return None
+    if row.get("timestamp") is None or row.get("amount") is None:
+        return None
+    if len(row["currency"]) > 3 or len(row.get("country") or "") > 2:
+        return None
+    for k in ("amount", "balance_before", "balance_after"):
+        v = row.get(k)
+        if v is not None and not (v.is_finite() and abs(v) < MAX_NUMERIC_14_2):
+            return None
+    label = row.get("label")
+    if label is not None and not (-32768 <= label <= 32767):
+        return None
+    return tuple(row.get(c) for c in TX_COLUMNS)
+
+def reference_parse(binary):
+    reader = csv.DictReader(io.TextIOWrapper(binary, encoding="utf-8-sig", newline=""))
+    records, rejected = [], 0
+    for raw in reader:
+        if not raw:
+            continue
+        rec = _to_record(_normalize_csv_row(raw))
+        if rec is None:
+            rejected += 1
+        else:
+            records.append(rec)
+    return records, rejected
+
+
+# -------- harness --------
+
+def new_parse(binary):
+    records, rejected = [], 0
+    for chunk, bad in parse_csv_chunks(binary, CHUNK):
+        records.extend(chunk)
+        rejected += bad
+    return records, rejected
+
+
+def check_parity(label, data: bytes):
+    got = new_parse(io.BytesIO(data))
+    want = reference_parse(io.BytesIO(data))
+    if got != want:
+        print(f"PARITY FAIL {label}: new {len(got[0])} ok / {got[1]} rejected, old {len(want[0])} ok / {want[1]} rejected")
+        for i, (g, w) in enumerate(zip(got[0], want[0])):
+            if g != w:
+                print(f"  first diff at record {i}:\n    new {g}\n    old {w}")
+                break
+        return False
+    print(f"parity ok  {label}: {len(got[0])} records, {got[1]} rejected")
+    return True
+
+
+def timed_stream(path):
+    # the ingest path never holds more than a chunk; time it that way
+    n = 0
+    with open(path, "rb") as f:
+        t0 = time.perf_counter()
+        for chunk, bad in parse_csv_chunks(f, CHUNK):
+            n += len(chunk) + bad
+        return time.perf_counter() - t0, n
+
+
+def timed_reference_stream(path):
+    n = 0
+    with open(path, "rb") as f:
+        reader = csv.DictReader(io.TextIOWrapper(f, encoding="utf-8-sig", newline=""))
+        t0 = time.perf_counter()
+        for raw in reader:
+            if raw:
+                _to_record(_normalize_csv_row(raw))
+                n += 1
+        return time.perf_counter() - t0, n
+
+
+def main():
+    p = argparse.ArgumentParser(description="Parity + benchmark for the ingest CSV parser.")
+    p.add_argument("--rows", type=int, default=1_000_000, help="Synthetic rows to benchmark.")
+    p.add_argument("--repeat", type=int, default=3, help="Timed runs per parser (best is reported).")
+    args = p.parse_args()
+
+    ok = check_parity("edge cases", EDGE_CSV.encode("utf-8"))
+    # header only: with / without trailing newline
+    header = EDGE_CSV.split("\r\n", 1)[0]
+    for name, text in (
+        ("header only", header),
+        ("header only + newline", header + "\r\n"),
+        ("header + blank lines", header + "\r\n\r\n"),
+    ):
+        ok = check_parity(name, text.encode("utf-8")) and ok
+    with tempfile.TemporaryDirectory() as tmp:
+        small = os.path.join(tmp, "parity.csv")
+        build_csv(small, 20_000)
+        with open(small, "rb") as f:
+            data = f.read()
+        ok = check_parity("synthetic 20k", data) and ok
+        ok = check_parity("synthetic 20k, irregular rows", messy(data)) and ok
+
+        # same again with tiny Arrow blocks so irregular rows land on batch edges
+        block = csv_parser._BLOCK_BYTES
+        csv_parser._BLOCK_BYTES = 4096
+        try:
+            ok = check_parity("edge cases, 4 KB blocks", EDGE_CSV.encode("utf-8")) and ok
+            ok = check_parity("irregular rows, 4 KB blocks", messy(data, every=5)) and ok
+        finally:
+            csv_parser._BLOCK_BYTES = block
+        if not ok:
+            sys.exit(1)
+
+        path = os.path.join(tmp, "bench.csv")
+        build_csv(path, args.rows)
+        print(f"{args.rows} rows, {os.path.getsize(path) / 1e6:.1f} MB")
+
+        old_secs, n_old = min(timed_reference_stream(path) for _ in range(args.repeat))
+        new_secs, n_new = min(timed_stream(path) for _ in range(args.repeat))
+        print(f"old DictReader path  {old_secs:8.2f}s  {n_old / old_secs:10.0f} rows/sec")
+        print(f"column parser        {new_secs:8.2f}s  {n_new / new_secs:10.0f} rows/sec  speedup {old_secs / new_secs:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Ingest throughput benchmark for POST /transactions/ingest-csv.
+
+- Builds a synthetic CSV with N unique rows (cloned from a sample file)
+- Uploads it to the API and reports rows/sec + the returned counts
+- Optionally re-uploads the same file to time the all-duplicates path
+- --probe: while the upload runs, hits GET /transactions?limit=50 from a few
+  clients and compares p50/p99 to an idle baseline (the parse must not stall
+  the event loop)
+
+Run it once against a build of the old ORM/add_all path and once against the
+COPY path (same DB, fresh tables) to compare.
+
+Usage:
+    python bench_ingest.py --rows 1000000
+    python bench_ingest.py --rows 200000 --api http://localhost:8000 --repeat
+    python bench_ingest.py --rows 2500000 --probe      # ~500 MB file
+    python bench_ingest.py --rows 5000000 --bulk       # offline CLI, deferred index builds (needs DATABASE_URL)
+"""
+import argparse, csv, os, subprocess, sys, tempfile, threading, time
+from pathlib import Path
+
+import requests
+
+from load_test import percentile
+
+API = os.environ.get("ORCH_API_BASE", "http://localhost:8000")
+SAMPLE = Path(__file__).resolve().parent.parent / "financial-fraud" / "transactions_1000.csv"
+
+
+def build_csv(path, n_rows, sample=SAMPLE):
+    """Write n_rows rows cycling through the sample file with unique ids."""
+    with open(sample, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        template = list(reader)
+
+    run_tag = f"{int(time.time())}"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=fieldnames)
+        w.writeheader()
+        for i in range(n_rows):
+            row = dict(template[i % len(template)])
+            row["transaction_id"] = f"bench_{run_tag}_{i:09d}"
+            w.writerow(row)
+    return path
+
+
+def upload(api, path):
+    with open(path, "rb") as f:
+        files = {"file": (Path(path).name, f, "text/csv")}
+        t0 = time.perf_counter()
+        r = requests.post(f"{api}/transactions/ingest-csv", files=files, timeout=None)
+        elapsed = time.perf_counter() - t0
+    r.raise_for_status()
+    return r.json(), elapsed
+
+
+def bulk_load(path):
+    """Same file through `python -m app.ingest.bulk load` (talks to DATABASE_URL directly)."""
+    t0 = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-m", "app.ingest.bulk", "load", str(path)],
+        check=True, capture_output=True, text=True,
+    )
+    return out.stdout.strip(), time.perf_counter() - t0
+
+
+def report(label, n_rows, body, elapsed):
+    rate = n_rows / elapsed if elapsed > 0 else float("inf")
+    print(f"{label:<12} rows={n_rows:<10} secs={elapsed:8.2f} rows/sec={rate:12.0f} response={body}")
+
+
+class Prober:
+    """Background clients timing a cheap read endpoint until stopped."""
+
+    def __init__(self, api, clients=4, path="/transactions?limit=50"):
+        self.url = f"{api}{path}"
+        self.clients = clients
+        self.latencies = []
+        self.errors = 0
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _run(self):
+        s = requests.Session()
+        while not self._stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                ok = s.get(self.url, timeout=60).ok
+            except requests.RequestException:
+                ok = False
+            self.latencies.append((time.perf_counter() - t0) * 1000.0)
+            if not ok:
+                self.errors += 1
+            time.sleep(0.02)
+
+    def __enter__(self):
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(self.clients)]
+        for t in self._threads:
+            t.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        for t in self._threads:
+            t.join()
+
+    def summary(self):
+        lat = sorted(self.latencies)
+        if not lat:
+            return "no samples"
+        return (f"n={len(lat)} errors={self.errors} p50={percentile(lat, 50):.1f}ms "
+                f"p99={percentile(lat, 99):.1f}ms max={lat[-1]:.1f}ms")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark CSV ingest throughput.")
+    p.add_argument("--rows", type=int, default=100_000, help="Number of synthetic rows to upload.")
+    p.add_argument("--api", default=API, help="API base URL.")
+    p.add_argument("--repeat", action="store_true", help="Upload the same file again (all duplicates).")
+    p.add_argument("--probe", action="store_true", help="Measure GET /transactions latency during the upload.")
+    p.add_argument("--bulk", action="store_true",
+                   help="Load with the offline bulk CLI (deferred index builds) instead of the upload.")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / f"bench_{args.rows}.csv"
+        print(f"Building {args.rows} rows -> {path}")
+        build_csv(path, args.rows)
+        print(f"File size: {path.stat().st_size / 1e6:.1f} MB")
+
+        if args.probe:
+            with Prober(args.api) as idle:
+                time.sleep(5)
+            print(f"probe idle        {idle.summary()}")
+            with Prober(args.api) as busy:
+                body, elapsed = bulk_load(path) if args.bulk else upload(args.api, path)
+            print(f"probe during load {busy.summary()}")
+        else:
+            body, elapsed = bulk_load(path) if args.bulk else upload(args.api, path)
+        report("bulk" if args.bulk else "fresh", args.rows, body, elapsed)
+
+        if args.repeat:
+            body, elapsed = upload(args.api, path)
+            report("duplicates", args.rows, body, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Before/after benchmark for the list endpoints' JSON serialization
+(GET /transactions, /cases, /audit-logs with 10k rows).
+
+- offline (default, no DB): a throwaway FastAPI app serves the same rows two
+  ways over ASGI:
+    before: mapped ORM objects returned from the handler (response_model
+            TransactionOut for transactions, jsonable_encoder for cases and
+            audit logs) -- what the endpoints did before
+    after:  Core tuples encoded by app.api.json_rows (what they do now)
+  Rows are built from financial-fraud/transactions_1000.csv; "before" builds
+  its ORM objects inside the request (stands in for ORM loading). The script
+  checks both responses decode to the same JSON, then prints the median
+  latency of each.
+- --api: times the real endpoints of a running server (run once per build)
+
+Usage:
+    python bench_list_json.py                 # 10k rows, offline
+    python bench_list_json.py --rows 10000 --repeat 20
+    python bench_list_json.py --api http://localhost:8000
+"""
+import argparse, asyncio, json, os, statistics, time, uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import requests
+from fastapi import FastAPI
+
+from app.api.json_rows import rows_response
+from app.db.models import AuditLog, Case, CaseStatus, Transaction
+from app.ingest.csv_parser import parse_csv_chunks
+from app.ingest.staging import TX_COLUMNS
+from app.schemas.transactions import TransactionOut
+from bench_ingest import SAMPLE
+
+API = os.environ.get("ORCH_API_BASE", "http://localhost:8000")
+
+_FLOAT_COLUMNS = {"amount", "balance_before", "balance_after"}
+_CASE_COLUMNS = [c.name for c in Case.__table__.c]
+_AUDIT_COLUMNS = [c.name for c in AuditLog.__table__.c]
+
+
+def fixture_rows(n):
+    """(transactions, cases, audit_logs) row tuples, as the DB driver returns them."""
+    with open(SAMPLE, "rb") as f:
+        template = [r for chunk, _ in parse_csv_chunks(f, 5000) for r in chunk]
+    now = datetime(2025, 10, 1, tzinfo=timezone.utc)
+    tx = []
+    for i in range(n):
+        row = list(template[i % len(template)])
+        row[0] = f"tx{i:07d}"
+        tx.append(tuple(row))
+    cases = [
+        (str(uuid.UUID(int=i)), f"tx{i:07d}", CaseStatus.open, "analyst1", "amount > p99",
+         now + timedelta(seconds=i), now + timedelta(seconds=i, microseconds=500))
+        for i in range(n)
+    ]
+    audits = [
+        (str(uuid.UUID(int=i)), "case", str(uuid.UUID(int=i)), "create", "rpa-bot",
+         {"score": 91.5, "reasons": ["amount_spike", "new_device"]}, now + timedelta(seconds=i))
+        for i in range(n)
+    ]
+    return tx, cases, audits
+
+
+def build_app(tx, cases, audits):
+    # Numeric columns come back as float when the query casts them (new path)
+    tx_float = [
+        tuple(float(v) if c in _FLOAT_COLUMNS and v is not None else v for c, v in zip(TX_COLUMNS, r))
+        for r in tx
+    ]
+    app = FastAPI()
+
+    @app.get("/before/transactions", response_model=list[TransactionOut])
+    async def before_tx():
+        return [Transaction(**dict(zip(TX_COLUMNS, r))) for r in tx]
+
+    @app.get("/after/transactions")
+    async def after_tx():
+        return rows_response(TX_COLUMNS, tx_float, utc_z=True)
+
+    @app.get("/before/cases")
+    async def before_cases():
+        return [Case(**dict(zip(_CASE_COLUMNS, r))) for r in cases]
+
+    @app.get("/after/cases")
+    async def after_cases():
+        return rows_response(_CASE_COLUMNS, cases)
+
+    @app.get("/before/audit-logs")
+    async def before_audit():
+        return [AuditLog(**dict(zip(_AUDIT_COLUMNS, r))) for r in audits]
+
+    @app.get("/after/audit-logs")
+    async def after_audit():
+        return rows_response(_AUDIT_COLUMNS, audits)
+
+    return app
+
+
+async def offline(n, repeat):
+    app = build_app(*fixture_rows(n))
+    transport = httpx.ASGITransport(app=app)
+    ok = True
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name in ("transactions", "cases", "audit-logs"):
+            before = (await client.get(f"/before/{name}")).json()
+            after = (await client.get(f"/after/{name}")).json()
+            same = before == after
+            ok = ok and same
+            times = {}
+            for mode in ("before", "after"):
+                samples = []
+                for _ in range(repeat):
+                    t0 = time.perf_counter()
+                    r = await client.get(f"/{mode}/{name}")
+                    r.raise_for_status()
+                    samples.append(time.perf_counter() - t0)
+                times[mode] = statistics.median(samples) * 1000.0
+            print(
+                f"{name:<13} {n} rows  before={times['before']:8.1f}ms  after={times['after']:7.1f}ms  "
+                f"speedup={times['before'] / times['after']:5.1f}x  same_json={same}"
+            )
+    return ok
+
+
+def live(api, n, repeat):
+    s = requests.Session()
+    for path in (f"/transactions?limit={n}", f"/cases/?limit={n}", f"/audit-logs/?limit={n}"):
+        samples, size = [], 0
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            r = s.get(f"{api}{path}", timeout=120)
+            r.raise_for_status()
+            samples.append(time.perf_counter() - t0)
+            size = len(json.loads(r.content))
+        print(f"GET {path:<28} rows={size:<6} median={statistics.median(samples) * 1000.0:8.1f}ms")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Before/after JSON serialization benchmark for list endpoints.")
+    p.add_argument("--rows", type=int, default=10_000, help="Rows per response.")
+    p.add_argument("--repeat", type=int, default=10, help="Requests per endpoint (median is reported).")
+    p.add_argument("--api", default=None, help=f"Time a running server instead (e.g. {API}).")
+    args = p.parse_args()
+
+    if args.api:
+        live(args.api, args.rows, args.repeat)
+        return
+    if not asyncio.run(offline(args.rows, args.repeat)):
+        raise SystemExit("JSON differs between before and after")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Throughput / latency benchmark for POST /score/model (micro-batched ML scoring).
+
+- offline (default, no DB): a throwaway FastAPI app serves the model two ways
+  over ASGI:
+    before:  each request calls predict_proba on its own one-row frame in the
+             threadpool (the obvious per-request endpoint)
+    after:   the real /score/model route -> app.scoring.model.scorer
+             (one predict_proba per micro-batch)
+  For each concurrency level, N requests are sent by C clients in closed
+  loops; prints req/s, p50 and p99 latency and the mean batch size.
+  Without --model a pipeline shaped like train_fraud_model.py's
+  (OneHotEncoder(type) + 300-tree RandomForest) is trained on synthetic
+  Kaggle-style rows first.
+- --api: the same client loop against a running server's /score/model
+
+Usage:
+    python bench_model_scoring.py
+    python bench_model_scoring.py --model ../financial-fraud/fraud_model.joblib --requests 5000
+    python bench_model_scoring.py --clients 1 50 500 --window-ms 2 --max-batch 256
+    python bench_model_scoring.py --api http://localhost:8000
+"""
+import argparse, asyncio, os, statistics, tempfile, time
+
+import httpx
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+
+import app.scoring.model as model_mod
+from app.api import model_scoring
+from app.scoring.model import MODEL_FEATURES, fraud_proba, scorer
+
+API = os.environ.get("ORCH_API_BASE", "http://localhost:8000")
+
+TX_TYPES = ["PAYMENT", "TRANSFER", "CASH_OUT", "DEBIT", "CASH_IN"]
+
+
+def synthetic_rows(n, seed=0):
+    """Kaggle-schema frame (MODEL_FEATURES + isFraud), fraud in TRANSFER/CASH_OUT draining the origin."""
+    rng = np.random.default_rng(seed)
+    tx_type = rng.choice(TX_TYPES, n, p=[0.5, 0.2, 0.18, 0.07, 0.05])
+    amount = np.round(rng.lognormal(8, 1.5, n), 2)
+    old_org = np.round(rng.lognormal(9, 2, n), 2)
+    fraud = (np.isin(tx_type, ["TRANSFER", "CASH_OUT"]) & (rng.random(n) < 0.05)).astype(np.int8)
+    amount = np.where(fraud == 1, old_org, amount)
+    old_dest = np.round(rng.lognormal(9, 2, n), 2)
+    return pd.DataFrame({
+        "step": rng.integers(1, 744, n),
+        "type": tx_type,
+        "amount": amount,
+        "oldbalanceOrg": old_org,
+        "newbalanceOrig": np.maximum(old_org - amount, 0),
+        "oldbalanceDest": old_dest,
+        "newbalanceDest": old_dest + np.where(fraud == 1, 0, amount),
+        "isFraud": fraud,
+    })
+
+
+def train_model(path, trees):
+    """Same pipeline shape as financial-fraud/train_fraud_model.py."""
+    import joblib
+    from sklearn.compose import ColumnTransformer
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
+
+    df = synthetic_rows(20_000)
+    X, y = df[MODEL_FEATURES], df["isFraud"]
+    pipe = Pipeline([
+        ("preprocess", ColumnTransformer([
+            ("cat", OneHotEncoder(handle_unknown="ignore"), ["type"]),
+            ("num", "passthrough", [c for c in MODEL_FEATURES if c != "type"]),
+        ])),
+        ("model", RandomForestClassifier(
+            n_estimators=trees, class_weight="balanced_subsample", random_state=42, n_jobs=-1,
+        )),
+    ])
+    pipe.fit(X, y)
+    joblib.dump(pipe, path)
+
+
+def build_app():
+    app = FastAPI()
+    app.include_router(model_scoring.router)
+
+    @app.post("/before/score/model")
+    async def before(payload: model_scoring.ModelScoreIn):
+        X = pd.DataFrame([payload.model_dump()], columns=MODEL_FEATURES)
+        proba = await run_in_threadpool(fraud_proba, scorer.model, X)
+        return {"fraud_proba": float(proba[0])}
+
+    return app
+
+
+async def run_level(client, path, payloads, clients):
+    """payloads split over `clients` closed-loop clients; returns (req/s, latencies)."""
+    latencies = []
+    it = iter(payloads)
+
+    async def worker():
+        for body in it:
+            t0 = time.perf_counter()
+            r = await client.post(path, json=body)
+            r.raise_for_status()
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return len(payloads) / (time.perf_counter() - t0), latencies
+
+
+def report(label, clients, rps, latencies, batches=None):
+    q = statistics.quantiles(latencies, n=100)
+    line = f"{label:<7} clients={clients:<4} {rps:8.0f} req/s  p50={q[49] * 1000:7.1f}ms  p99={q[98] * 1000:7.1f}ms"
+    if batches:
+        line += f"  mean batch={sum(batches) / len(batches):6.1f}"
+    print(line)
+
+
+async def offline(args, payloads):
+    # count batch sizes by wrapping the function the scorer calls per batch
+    batches = []
+
+    def counting_proba(model, X):
+        batches.append(len(X))
+        return fraud_proba(model, X)
+
+    model_mod.fraud_proba = counting_proba
+    scorer.max_batch = args.max_batch
+    scorer.window_seconds = args.window_ms / 1000
+    task = asyncio.create_task(scorer.run())
+
+    limits = httpx.Limits(max_connections=None)
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits) as client:
+        for clients in args.clients:
+            for label, path in (("before", "/before/score/model"), ("after", "/score/model")):
+                batches.clear()
+                rps, lat = await run_level(client, path, payloads, clients)
+                report(label, clients, rps, lat, batches if label == "after" else None)
+    task.cancel()
+
+
+async def live(api, args, payloads):
+    limits = httpx.Limits(max_connections=None)
+    async with httpx.AsyncClient(base_url=api, limits=limits, timeout=60) as client:
+        for clients in args.clients:
+            rps, lat = await run_level(client, "/score/model", payloads, clients)
+            report("api", clients, rps, lat)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Micro-batched model scoring benchmark (POST /score/model).")
+    p.add_argument("--model", default=None, help="fraud_model.joblib (default: train a synthetic one).")
+    p.add_argument("--trees", type=int, default=300, help="Trees in the synthetic model.")
+    p.add_argument("--requests", type=int, default=2000, help="Requests per concurrency level and mode.")
+    p.add_argument("--clients", type=int, nargs="+", default=[1, 50, 500], help="Concurrency levels.")
+    p.add_argument("--window-ms", type=float, default=2.0, help="MODEL_BATCH_WINDOW_MS for the offline run.")
+    p.add_argument("--max-batch", type=int, default=256, help="MODEL_MAX_BATCH for the offline run.")
+    p.add_argument("--api", default=None, help=f"Benchmark a running server instead (e.g. {API}).")
+    args = p.parse_args()
+
+    rows = synthetic_rows(args.requests, seed=1)[MODEL_FEATURES]
+    payloads = [
+        {k: (v.item() if hasattr(v, "item") else v) for k, v in r.items()}
+        for r in rows.to_dict(orient="records")
+    ]
+    if args.api:
+        asyncio.run(live(args.api, args, payloads))
+        return
+
+    path = args.model
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "fraud_model.joblib")
+        t0 = time.perf_counter()
+        train_model(path, args.trees)
+        print(f"trained synthetic {args.trees}-tree model in {time.perf_counter() - t0:.1f}s")
+    scorer.load(path)
+    asyncio.run(offline(args, payloads))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Concurrent load test for the API + DB pool.
+
+- Fires N requests at an endpoint from C concurrent clients (threads, each
+  with its own keep-alive session)
+- Prints p50/p95/p99/max latency, errors, and /api/health/pool before/after
+  (checked-out, waiters, checkout wait)
+
+Run it against different DB_POOL_SIZE / DB_MAX_OVERFLOW settings to size the pool.
+
+Usage:
+    python load_test.py --concurrency 200 --requests 5000
+    python load_test.py --path "/transactions?limit=50" --concurrency 200
+    python load_test.py --path /reports/latest --api http://localhost:8000
+"""
+import argparse, os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+API = os.environ.get("ORCH_API_BASE", "http://localhost:8000")
+
+_local = threading.local()
+
+
+def _session():
+    # requests.Session isn't thread-safe; one per worker thread
+    s = getattr(_local, "session", None)
+    if s is None:
+        s = _local.session = requests.Session()
+    return s
+
+
+def one_request(url):
+    t0 = time.perf_counter()
+    try:
+        ok = _session().get(url, timeout=60).ok
+    except requests.RequestException:
+        ok = False
+    return time.perf_counter() - t0, ok
+
+
+def percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    i = min(len(sorted_vals) - 1, int(round(q / 100.0 * (len(sorted_vals) - 1))))
+    return sorted_vals[i]
+
+
+def pool_stats(api):
+    try:
+        return requests.get(f"{api}/api/health/pool", timeout=5).json()
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def main():
+    p = argparse.ArgumentParser(description="Concurrent latency test against the API.")
+    p.add_argument("--api", default=API, help="API base URL.")
+    p.add_argument("--path", default="/transactions?limit=50", help="Endpoint to hit.")
+    p.add_argument("--concurrency", type=int, default=200, help="Concurrent clients.")
+    p.add_argument("--requests", type=int, default=5000, help="Total requests.")
+    args = p.parse_args()
+
+    url = f"{args.api}{args.path}"
+    print(f"{args.requests} x GET {url} with {args.concurrency} concurrent clients")
+    print(f"pool before: {pool_stats(args.api)}")
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as ex:
+        results = list(ex.map(one_request, [url] * args.requests))
+    elapsed = time.perf_counter() - t0
+
+    lat = sorted(r[0] * 1000.0 for r in results)
+    errors = sum(1 for r in results if not r[1])
+    print(f"pool after:  {pool_stats(args.api)}")
+    print(
+        f"secs={elapsed:.2f} req/sec={len(results) / elapsed:.0f} errors={errors}  "
+        f"p50={percentile(lat, 50):.1f}ms p95={percentile(lat, 95):.1f}ms "
+        f"p99={percentile(lat, 99):.1f}ms max={lat[-1]:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,15 @@
 End-to-end runner:
 - Creates an rpa_runs row
 - Ingests CSV via API
-- Scores transactions via simple rules and POST /scores
+- Scores transactions server-side via POST /runs/{run_id}/score (rules-v0)
 - Writes a Markdown report and updates rpa_runs
+- Stores the run's evaluation metrics via POST /runs/{run_id}/metrics
 """
-import os, time, uuid, requests, csv
+import os, time, uuid, requests
 from datetime import datetime, timezone
 from pathlib import Path
-import psycopg  # sync driver for convenience (uses SYNC_DATABASE_URL)
+from psycopg_pool import ConnectionPool
+from requests.adapters import HTTPAdapter
 from app.reports.render import render_html
 
 API = os.environ.get("ORCH_API_BASE", "http://localhost:8000")
@@ -16,10 +18,31 @@ SYNC_DB = os.environ.get("SYNC_DATABASE_URL")  # from backend/.env
 ART_DIR = Path("run-artifacts")
 ART_DIR.mkdir(exist_ok=True)
 
+# One keep-alive HTTP session for every API call (no new TCP connect per request)
+http = requests.Session()
+http.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# Shared sync DB pool, opened lazily on first db_exec (instead of a
+# psycopg.connect() per statement)
+_db_pool = None
+
+def db_pool():
+    global _db_pool
+    if _db_pool is None:
+        _db_pool = ConnectionPool(
+            SYNC_DB,
+            min_size=int(os.environ.get("ORCH_DB_POOL_MIN", "1")),
+            max_size=int(os.environ.get("ORCH_DB_POOL_MAX", "4")),
+            max_lifetime=float(os.environ.get("ORCH_DB_POOL_RECYCLE", "1800")),
+            open=True,
+        )
+    return _db_pool
+
 def wait_api():
     for _ in range(60):
         try:
-            r = requests.get(f"{API}/healthz", timeout=2)
+            r = http.get(f"{API}/healthz", timeout=2)
             if r.ok:
                 return
         except Exception:
@@ -28,12 +51,12 @@ def wait_api():
     raise RuntimeError("API did not become healthy")
 
 def db_exec(sql, params=None, fetch=False):
-    with psycopg.connect(SYNC_DB) as conn:
+    # pool.connection() commits on clean exit and returns the connection
+    with db_pool().connection() as conn:
         with conn.cursor() as cur:
             cur.execute(sql, params or ())
             if fetch:
                 return cur.fetchall()
-            conn.commit()
 
 def start_run():
     run_id = str(uuid.uuid4())
@@ -51,39 +74,20 @@ def finish_run(run_id, **fields):
 def ingest_csv(csv_path):
     with open(csv_path, "rb") as f:
         files = {"file": (Path(csv_path).name, f, "text/csv")}
-        r = requests.post(f"{API}/transactions/ingest-csv", files=files, timeout=60)
+        r = http.post(f"{API}/transactions/ingest-csv", files=files, timeout=60)
         r.raise_for_status()
         return r.json()["inserted"]
 
-def fetch_transactions(limit=1000):
-    r = requests.get(f"{API}/transactions?limit={limit}", timeout=30)
+def score_run(run_id):
+    """Ask the backend to score every unscored transaction for this run."""
+    r = http.post(f"{API}/runs/{run_id}/score", timeout=None)
     r.raise_for_status()
-    return r.json()
+    body = r.json()
+    return body["scored"], body["flagged"]
 
-def rule_score(tx):
-    """Very simple placeholder logic for demo purposes."""
-    amt = float(tx.get("amount", 0))
-    reason = []
-    score = 20.0
-
-    if amt >= 10000: 
-        score += 50; reason.append("high_amount")
-    if tx.get("country") not in ("US", "CA"):
-        score += 15; reason.append("foreign_country")
-    if (tx.get("merchant_category") or "").lower() in ("crypto","gambling"):
-        score += 15; reason.append("risky_mcc")
-
-    score = min(score, 100.0)
-    return score, ", ".join(reason) or "baseline"
-
-def post_score(tx_id, score, reason):
-    payload = {
-        "transaction_id": tx_id,
-        "model_version": "rules-v0",
-        "score": score,
-        "reason": reason
-    }
-    r = requests.post(f"{API}/scores", json=payload, timeout=30)
+def store_metrics(run_id):
+    """Materialize evaluation metrics so /reports/latest doesn't recompute them."""
+    r = http.post(f"{API}/runs/{run_id}/metrics", timeout=None)
     r.raise_for_status()
     return r.json()
 
@@ -103,15 +107,8 @@ def main(csv_path):
     run_id = start_run()
     try:
         inserted = ingest_csv(csv_path)
-        txs = fetch_transactions(limit=inserted)
-        flagged = 0
-        scored = 0
-        for tx in txs:
-            s, reason = rule_score(tx)
-            post_score(tx["transaction_id"], s, reason)
-            scored += 1
-            if s >= 80:
-                flagged += 1
+        # rules run inside the backend over whole columns (no per-tx HTTP call)
+        scored, flagged = score_run(run_id)
 
         # 1) Keep existing Markdown report generation
         md_path = build_report(run_id, inserted, scored, flagged)
@@ -153,18 +150,31 @@ def main(csv_path):
             flagged=flagged,
             report_path=html_path,
         )
-
-        print(f"OK — run_id={run_id}")
-        print(f"Markdown report: {md_path}")
-        print(f"HTML report: {html_path}")
     except Exception as e:
         finish_run(run_id, finished_at=datetime.now(timezone.utc), status="failed")
         raise
 
+    # 6) Compute metrics once now that the run window is closed. The run
+    # already succeeded: a failure here must not mark it failed
+    # (POST /runs/{run_id}/metrics can be retried later).
+    try:
+        store_metrics(run_id)
+    except requests.RequestException as e:
+        print(f"WARNING: storing metrics for run {run_id} failed: {e}")
+
+    print(f"OK — run_id={run_id}")
+    print(f"Markdown report: {md_path}")
+    print(f"HTML report: {html_path}")
+
 
 if __name__ == "__main__":
     import sys
     if len(sys.argv) != 2:
         print("Usage: python orchestrate_workflow.py <path/to/transactions.csv>")
         sys.exit(1)
-    main(sys.argv[1])
+    try:
+        main(sys.argv[1])
+    finally:
+        if _db_pool is not None:
+            _db_pool.close()
+        http.close()
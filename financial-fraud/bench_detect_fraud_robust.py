@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+bench_detect_fraud_robust.py
+
+benchmark + parity check for the windowed state in detect_fraud_robust.py.
+
+- parity: scores a synthetic prefix (and any CSVs passed with --csv) with both
+  the windowed engine and a copy of the old full-history rescan, and fails
+  loudly if a single (pred, score, reasons) differs
+- benchmark: streams N synthetic rows over a few hot accounts through
+  score_and_update and prints rows/sec (default N = 1M and 10M)
+- --workers: times main_parallel at several worker counts against the
+  single-process stream mode on a many-account file and checks the output
+  files are identical
+
+rows are generated in batches (untimed) so 10M rows doesn't need 10M dicts
+in memory and the numbers only cover scoring.
+
+usage:
+    python bench_detect_fraud_robust.py
+    python bench_detect_fraud_robust.py --rows 1000000 --accounts 4 --parity-rows 20000
+    python bench_detect_fraud_robust.py --csv transactions_1000.csv --rows 0
+    python bench_detect_fraud_robust.py --rows 0 --parity-rows 0 --workers 2 4 8 16
+"""
+
+import argparse
+import contextlib
+import csv
+import filecmp
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from itertools import islice
+from math import isclose
+
+import detect_fraud_robust as dfr
+
+
+def synthetic_rows(n, accounts=4, seed=7, late_fraction=0.05):
+    """
+    hot-account stream: few accounts, small payee/device/ip pools, repeated
+    amounts (so duplicates + small repeats fire), and a few late rows.
+    """
+    rnd = random.Random(seed)
+    base = datetime(2025, 10, 1)
+    clock = [0] * accounts
+    amounts = [1.0, 4.99, 12.5, 19.99, 45.0, 120.0, 120.01, 980.0, 6200.0]
+    gaps = [3, 15, 40, 90, 300, 1800]
+    max_late = int(dfr.MAX_LATENESS_SECONDS) or 1
+    for i in range(n):
+        a = rnd.randrange(accounts)
+        clock[a] += rnd.choice(gaps)
+        t = clock[a]
+        if rnd.random() < late_fraction:
+            t = max(0, t - rnd.randrange(min(max_late, 6 * 3600)))
+        amt = rnd.choice(amounts)
+        before = rnd.choice([5000.0, 800.0, amt])
+        yield {
+            "transaction_id": f"bench{i:09d}",
+            "timestamp": (base + timedelta(seconds=t)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "account_id": f"acct_hot{a}",
+            "payee_id": f"merc_{rnd.randrange(20)}",
+            "amount": f"{amt:.2f}",
+            "country": rnd.choice(["US", "US", "US", "FR", "NG"]),
+            "balance_before": f"{before:.2f}",
+            "balance_after": f"{before - amt:.2f}",
+            "device_id": f"dev_{rnd.randrange(4)}",
+            "ip_hash": f"ip_{rnd.randrange(6)}",
+            "notes": "",
+        }
+
+
+# reference: the old O(history) rescan, kept here only to check parity
+def reference_scores(rows):
+    history = defaultdict(list)
+    by_device = defaultdict(list)
+    last_tx, last_small = {}, {}
+    payees = defaultdict(Counter)
+    devices, ips = defaultdict(set), defaultdict(set)
+    recent = defaultdict(list)
+    amount_time = defaultdict(list)
+    hist_total, hist_count = defaultdict(float), defaultdict(int)
+    S = dfr.SCORES
+    out = []
+    for row in rows:
+        amt = float(row.get("amount", 0.0))
+        country = row.get("country", "").upper()
+        bal_after = float(row.get("balance_after", 0.0))
+        bal_before = float(row.get("balance_before", 0.0))
+        ts = dfr.parse_time(row["timestamp"])
+        acct = row["account_id"]
+        device, ip, payee = row.get("device_id", ""), row.get("ip_hash", ""), row.get("payee_id", "")
+
+        score, reasons = 0, []
+        def hit(name):
+            nonlocal score
+            score += S[name]; reasons.append(name)
+
+        if amt >= dfr.HIGH_AMOUNT: hit("high_amount")
+        if country in dfr.HIGH_RISK_COUNTRIES and amt > 1000: hit("high_risk_country")
+        if bal_after < 0: hit("negative_balance")
+        if not isclose((bal_before - amt), bal_after, abs_tol=0.01): hit("impossible_balance")
+        if amt <= dfr.MICRO_THRESHOLD:
+            prevs = by_device[(acct, device)]
+            if prevs and (ts - prevs[-1]).total_seconds() <= dfr.MICRO_REPEAT_WINDOW: hit("micro_repeat")
+        if amt <= dfr.SMALL_AMOUNT_THRESHOLD:
+            ls = last_small.get(acct)
+            if ls and (ts - ls).total_seconds() <= dfr.MICRO_REPEAT_WINDOW: hit("small_repeat")
+        la = last_tx.get(acct)
+        if la and amt <= dfr.SMALL_AMOUNT_THRESHOLD and (ts - la).total_seconds() <= 60: hit("rapid_back_to_back")
+        if len([t for t in history[acct] if (ts - t).total_seconds() <= dfr.VELOCITY_WINDOW]) >= dfr.VELOCITY_COUNT - 1:
+            hit("high_velocity")
+        if bal_after <= dfr.NEAR_ZERO_BALANCE and amt > dfr.MICRO_THRESHOLD: hit("near_zero_balance")
+        pc = payees[acct][payee]
+        if pc == 0: hit("new_payee")
+        elif pc >= 5: hit("payee_freq")
+        if device and device not in devices[acct] and devices[acct]: hit("device_change")
+        if ip and ip not in ips[acct] and ips[acct]: hit("ip_change")
+        for (a_prev, p_prev, t_prev) in recent[acct]:
+            if p_prev == payee and isclose(a_prev, amt, rel_tol=1e-6, abs_tol=0.01) and (ts - t_prev).total_seconds() <= dfr.DUPLICATE_WINDOW:
+                hit("duplicate_tx"); break
+        cutoff = ts - timedelta(hours=dfr.AGG_WINDOW_HOURS)
+        agg = sum(a for (a, t) in amount_time[acct] if t >= cutoff)
+        avg = (hist_total[acct] / hist_count[acct]) if hist_count[acct] > 0 else 0.0
+        if avg > 0 and agg > dfr.AGG_MULTIPLIER * avg: hit("agg_24h_spike")
+
+        pred = 2 if score >= dfr.FRAUD_SCORE else (1 if score >= dfr.SUSPICIOUS_SCORE else 0)
+        out.append((pred, score, reasons))
+
+        history[acct].append(ts); by_device[(acct, device)].append(ts); last_tx[acct] = ts
+        if amt <= dfr.SMALL_AMOUNT_THRESHOLD: last_small[acct] = ts
+        payees[acct][payee] += 1
+        if device: devices[acct].add(device)
+        if ip: ips[acct].add(ip)
+        recent[acct].append((amt, payee, ts)); amount_time[acct].append((amt, ts))
+        hist_total[acct] += amt; hist_count[acct] += 1
+    return out
+
+
+def check_parity(label, rows):
+    state = dfr.new_state()
+    got = [dfr.score_and_update(r, state) for r in rows]
+    t0 = time.perf_counter()
+    want = reference_scores(rows)
+    ref_secs = time.perf_counter() - t0
+    bad = [i for i, (g, w) in enumerate(zip(got, want)) if g != w]
+    if bad:
+        i = bad[0]
+        print(f"PARITY FAIL {label}: {len(bad)} rows differ; first row {i}: got {got[i]} want {want[i]}")
+        return False
+    print(f"parity ok  {label}: {len(rows)} rows (old rescan took {ref_secs:.2f}s)")
+    return True
+
+
+def bench(n, accounts, batch=100_000):
+    state = dfr.new_state()
+    rows = synthetic_rows(n, accounts=accounts)
+    secs = 0.0
+    while True:
+        # generate a batch untimed so only scoring is measured
+        chunk = list(islice(rows, batch))
+        if not chunk:
+            break
+        t0 = time.perf_counter()
+        for row in chunk:
+            dfr.score_and_update(row, state)
+        secs += time.perf_counter() - t0
+    window = sum(len(s.velocity_times) + len(s.agg_times) + len(s.dup_order) for s in state.values())
+    print(f"bench      {n:>10} rows  {accounts} accounts  {secs:8.2f}s  {n / secs:10.0f} rows/sec  retained window entries={window}")
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+
+
+def bench_workers(n, accounts, worker_counts):
+    """time main_stream (1 process) vs main_parallel, and check outputs match"""
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "in.csv")
+        write_csv(src, synthetic_rows(n, accounts=accounts))
+
+        def run(label, fn, out):
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                fn(src, out)
+            return time.perf_counter() - t0
+
+        base_out = os.path.join(tmp, "out_1.csv")
+        base = run("1", dfr.main_stream, base_out)
+        print(f"workers  1  {base:8.2f}s  {n / base:10.0f} rows/sec  speedup  1.00x")
+        for w in worker_counts:
+            if w <= 1:
+                continue
+            out = os.path.join(tmp, f"out_{w}.csv")
+            secs = run(str(w), lambda i, o: dfr.main_parallel(i, o, workers=w), out)
+            same = filecmp.cmp(base_out, out, shallow=False)
+            print(f"workers {w:>2}  {secs:8.2f}s  {n / secs:10.0f} rows/sec  speedup {base / secs:5.2f}x  output {'matches' if same else 'DIFFERS'}")
+            if not same:
+                sys.exit(1)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark + parity check for detect_fraud_robust windowed state.")
+    p.add_argument("--rows", type=int, nargs="*", default=[1_000_000, 10_000_000], help="Benchmark sizes (0 to skip).")
+    p.add_argument("--accounts", type=int, default=4, help="Number of hot accounts.")
+    p.add_argument("--parity-rows", type=int, default=20_000, help="Synthetic rows to check against the old rescan.")
+    p.add_argument("--csv", nargs="*", default=[], help="Extra CSV files to parity-check.")
+    p.add_argument("--workers", type=int, nargs="*", default=[],
+                   help="Also run a --workers scaling benchmark for these counts, e.g. 2 4 8 16.")
+    p.add_argument("--worker-rows", type=int, default=1_000_000, help="Rows for the scaling benchmark.")
+    p.add_argument("--worker-accounts", type=int, default=512, help="Accounts for the scaling benchmark.")
+    args = p.parse_args()
+
+    ok = check_parity("synthetic", list(synthetic_rows(args.parity_rows, accounts=args.accounts)))
+    for path in args.csv:
+        with open(path, newline="", encoding="utf-8") as f:
+            ok = check_parity(path, list(csv.DictReader(f))) and ok
+    if not ok:
+        sys.exit(1)
+
+    for n in args.rows:
+        if n > 0:
+            bench(n, args.accounts)
+
+    if args.workers:
+        bench_workers(args.worker_rows, args.worker_accounts, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+bench_flat_forest.py
+
+parity check + benchmark for flat_forest.py against the sklearn pipeline.
+
+- parity: scores the holdout rows with both and fails loudly if any
+  probability differs by more than --tol
+- latency: per-row time at batch sizes 1, 100 and 10k (median of repeats),
+  sklearn with n_jobs=1 (n_jobs=-1 only adds thread pool startup per call)
+- load: joblib.load of the pickle vs FlatForest.load (mmap), plus on-disk size
+
+without --model it trains the same pipeline as train_fraud_model.py
+(OneHotEncoder(type) + 300-tree balanced RF) on kaggle_generator.py rows.
+
+usage:
+    python bench_flat_forest.py
+    python bench_flat_forest.py --rows 100000 --trees 300
+    python bench_flat_forest.py --model fraud_model.joblib --csv kaggle_sandbox_transactions.csv
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from flat_forest import FlatForest, export
+
+FEATURES = [
+    "step", "type", "amount",
+    "oldbalanceOrg", "newbalanceOrig",
+    "oldbalanceDest", "newbalanceDest",
+]
+
+
+def train(df, trees):
+    """same pipeline as train_fraud_model.py."""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
+
+    pipe = Pipeline([
+        ("preprocess", ColumnTransformer([
+            ("cat", OneHotEncoder(handle_unknown="ignore"), ["type"]),
+            ("num", "passthrough", [c for c in FEATURES if c != "type"]),
+        ])),
+        ("model", RandomForestClassifier(
+            n_estimators=trees, class_weight="balanced_subsample", random_state=42, n_jobs=-1,
+        )),
+    ])
+    return pipe.fit(df[FEATURES], df["isFraud"])
+
+
+def per_row_us(fn, X, batch, repeat):
+    """median microseconds per row scoring X[:batch]."""
+    part = X.iloc[:batch]
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(part)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) / len(part) * 1e6
+
+
+def timed_load(fn, repeat=3):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return min(samples)
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def main():
+    p = argparse.ArgumentParser(description="Parity + latency benchmark: flat_forest vs sklearn.")
+    p.add_argument("--model", default=None, help="Pipeline from train_fraud_model.py (default: train one).")
+    p.add_argument("--csv", default=None, help="Kaggle-style CSV (default: generate with kaggle_generator.py).")
+    p.add_argument("--rows", type=int, default=50_000, help="Rows to generate when no --csv.")
+    p.add_argument("--trees", type=int, default=300, help="Trees when training.")
+    p.add_argument("--tol", type=float, default=1e-9, help="Max allowed |proba difference|.")
+    p.add_argument("--repeat", type=int, default=20, help="Timing repeats (median).")
+    args = p.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    csv_path = args.csv
+    if csv_path is None:
+        csv_path = os.path.join(tmp, "kaggle.csv")
+        subprocess.run(
+            [sys.executable, "kaggle_generator.py", "-n", str(args.rows), "--seed", "7", "-o", csv_path],
+            check=True, stdout=subprocess.DEVNULL,
+        )
+    df = pd.read_csv(csv_path)
+    split = int(len(df) * 0.8)
+
+    model_path = args.model
+    if model_path is None:
+        model_path = os.path.join(tmp, "fraud_model.joblib")
+        t0 = time.perf_counter()
+        joblib.dump(train(df.iloc[:split], args.trees), model_path)
+        print(f"trained {args.trees}-tree model on {split} rows in {time.perf_counter() - t0:.1f}s")
+        holdout = df.iloc[split:]
+    else:
+        holdout = df
+
+    pipe = joblib.load(model_path)
+    pipe.steps[-1][1].n_jobs = 1
+    flat_dir = os.path.join(tmp, "fraud_model.flat")
+    export(pipe, flat_dir)
+    forest = FlatForest.load(flat_dir)
+
+    X = holdout[FEATURES].reset_index(drop=True)
+    expected = pipe.predict_proba(X)[:, -1]
+    got = forest.predict_proba(X)
+    diff = float(np.abs(expected - got).max())
+    print(f"parity: {len(X)} rows, {forest.meta['n_trees']} trees, {forest.meta['n_nodes']} nodes, max |diff| = {diff:.3g}")
+    if diff > args.tol:
+        raise SystemExit(f"PARITY FAILED: max difference {diff} > {args.tol}")
+
+    sk = lambda part: pipe.predict_proba(part)[:, -1]
+    print(f"{'batch':>6} {'sklearn us/row':>15} {'flat us/row':>12} {'speedup':>8}")
+    for batch in (1, 100, 10_000):
+        if batch > len(X):
+            continue
+        repeat = args.repeat if batch < 10_000 else max(3, args.repeat // 5)
+        a = per_row_us(sk, X, batch, repeat)
+        b = per_row_us(forest.predict_proba, X, batch, repeat)
+        print(f"{batch:>6} {a:>15.1f} {b:>12.1f} {a / b:>7.1f}x")
+
+    t_joblib = timed_load(lambda: joblib.load(model_path))
+    t_flat = timed_load(lambda: FlatForest.load(flat_dir))
+    print(f"load: joblib {t_joblib * 1000:.1f}ms ({os.path.getsize(model_path) / 1e6:.1f} MB)  "
+          f"flat mmap {t_flat * 1000:.2f}ms ({dir_size(flat_dir) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
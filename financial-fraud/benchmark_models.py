@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+benchmark_models.py
+
+quality vs inference cost for candidate fraud models, so the model we ship
+fits the scoring latency budget (train_fraud_model.py only reports quality
+of one hard-coded 300-tree RF).
+
+every candidate trains on the same split: train_fraud_model.prepare_features
+(sample + split + fitted ColumnTransformer, from the feature cache when it's
+warm). per candidate:
+- quality on the holdout: PR-AUC (average precision), recall at a fixed
+  precision (--precision, best threshold that reaches it), train time
+- latency: one row at a time (median over --single-rows rows) and one
+  10k-row batch (median of 3), predict_proba on the preprocessed matrix with
+  n_jobs=1 (preprocessing costs the same for every candidate)
+- the saved pipeline (fitted preprocess + model) on disk: size, load time
+
+rf-flat is the 300-tree RF exported with flat_forest.py (same predictions,
+numpy engine, memory-mapped load).
+
+output: a table on stdout and the same rows as json (or csv) in --out.
+
+usage:
+    python benchmark_models.py --csv PS_2017...log.csv
+    python benchmark_models.py --csv kaggle_sandbox_transactions.csv --samples 200000 --out bench.csv
+    python benchmark_models.py --csv data.csv --models rf50 hgb logreg
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import average_precision_score, precision_recall_curve
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+import train_fraud_model as tfm
+from feature_cache import FeatureCache
+from flat_forest import FlatForest, export
+
+
+def _rf(n):
+    return RandomForestClassifier(
+        n_estimators=n, class_weight="balanced_subsample", random_state=tfm.RANDOM_STATE, n_jobs=-1,
+    )
+
+
+# name -> factory for an unfitted model (trained on the preprocessed matrix)
+CANDIDATES = {
+    "rf50": lambda: _rf(50),
+    "rf100": lambda: _rf(100),
+    "rf300": lambda: _rf(300),
+    "hgb": lambda: HistGradientBoostingClassifier(class_weight="balanced", random_state=tfm.RANDOM_STATE),
+    # raw balances span orders of magnitude: scale them for the linear model
+    "logreg": lambda: Pipeline([
+        ("scale", StandardScaler()),
+        ("lr", LogisticRegression(class_weight="balanced", max_iter=1000)),
+    ]),
+}
+
+
+def recall_at_precision(y, proba, precision):
+    p, r, _ = precision_recall_curve(y, proba)
+    ok = p >= precision
+    return float(r[ok].max()) if ok.any() else 0.0
+
+
+def single_row_us(predict, X, n):
+    """median microseconds for one-row calls over the first n rows."""
+    samples = []
+    for i in range(min(n, len(X))):
+        row = X[i:i + 1]
+        t0 = time.perf_counter()
+        predict(row)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1e6
+
+
+def batch_ms(predict, X, rows=10_000, repeat=3):
+    part = np.ascontiguousarray(X[:rows])
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        predict(part)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000, len(part)
+
+
+def min_time(fn, repeat=3):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return min(samples)
+
+
+def _size(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def _set_single_thread(model):
+    # n_jobs=-1 spins up a thread pool per predict call; not what we want to time
+    for est in (model.steps if hasattr(model, "steps") else [(None, model)]):
+        if hasattr(est[1], "n_jobs"):
+            est[1].n_jobs = 1
+
+
+def evaluate(name, predict, y_test, X_test, args, path, load, train_s):
+    proba = predict(X_test)
+    batch, rows = batch_ms(predict, X_test)
+    return {
+        "model": name,
+        "pr_auc": round(float(average_precision_score(y_test, proba)), 4),
+        f"recall_at_p{args.precision:g}": round(recall_at_precision(y_test, proba, args.precision), 4),
+        "train_s": round(train_s, 2),
+        "single_row_us": round(single_row_us(predict, X_test, args.single_rows), 1),
+        "batch_10k_ms": round(batch, 2),
+        "batch_rows": rows,
+        "size_kb": round(_size(path) / 1024, 1),
+        "load_ms": round(min_time(load) * 1000, 2),
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark candidate fraud models: quality vs inference cost.")
+    p.add_argument("--csv", default=tfm.CSV_FILE, help="Kaggle payments csv.")
+    p.add_argument("--samples", type=int, default=tfm.N_SAMPLES, help="Rows sampled (same as training).")
+    p.add_argument("--models", nargs="+", default=list(CANDIDATES) + ["rf-flat"],
+                   choices=list(CANDIDATES) + ["rf-flat"], help="Candidates to run.")
+    p.add_argument("--precision", type=float, default=0.9, help="Precision for the recall@precision column.")
+    p.add_argument("--single-rows", type=int, default=200, help="One-row calls timed per model.")
+    p.add_argument("--cache-dir", default=tfm.DEFAULT_CACHE_DIR, help="Feature-matrix cache directory.")
+    p.add_argument("--out", default="model_benchmark.json", help="Results file (.json or .csv).")
+    args = p.parse_args()
+
+    t0 = time.perf_counter()
+    data = tfm.prepare_features(args.csv, args.samples, cache=FeatureCache(args.cache_dir))
+    X_train, X_test = np.asarray(data["X_train"]), np.asarray(data["X_test"])
+    y_train, y_test = np.asarray(data["y_train"]), np.asarray(data["y_test"])
+    print(f"split ready in {time.perf_counter() - t0:.2f}s ({'cache hit' if data['cached'] else 'built'}): "
+          f"{len(y_train)} train / {len(y_test)} test rows, fraud rate {y_test.mean():.4f}")
+
+    tmp = tempfile.mkdtemp()
+    results = []
+    fitted = {}
+    try:
+        for name in args.models:
+            if name == "rf-flat":
+                continue
+            model = CANDIDATES[name]()
+            t = time.perf_counter()
+            model.fit(X_train, y_train)
+            train_s = time.perf_counter() - t
+            _set_single_thread(model)
+            fitted[name] = (model, train_s)
+
+            path = os.path.join(tmp, f"{name}.joblib")
+            joblib.dump(Pipeline([("preprocess", data["preprocess"]), ("model", model)]), path)
+            predict = lambda X, m=model: m.predict_proba(X)[:, -1]
+            results.append(evaluate(name, predict, y_test, X_test, args, path, lambda: joblib.load(path), train_s))
+            print(f"  {name} done")
+
+        if "rf-flat" in args.models:
+            model, train_s = fitted.get("rf300") or (None, 0.0)
+            if model is None:
+                t = time.perf_counter()
+                model = CANDIDATES["rf300"]().fit(X_train, y_train)
+                train_s = time.perf_counter() - t
+            path = os.path.join(tmp, "rf300.flat")
+            export(Pipeline([("preprocess", data["preprocess"]), ("model", model)]), path)
+            forest = FlatForest.load(path)
+            results.append(evaluate(
+                "rf-flat", forest.predict_design, y_test, X_test, args, path,
+                lambda: FlatForest.load(path), train_s,
+            ))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    cols = list(results[0])
+    widths = [max(len(c), *(len(str(r[c])) for r in results)) for c in cols]
+    print("  ".join(c.rjust(w) for c, w in zip(cols, widths)))
+    for r in results:
+        print("  ".join(str(r[c]).rjust(w) for c, w in zip(cols, widths)))
+
+    if args.out.endswith(".csv"):
+        with open(args.out, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=cols)
+            w.writeheader()
+            w.writerows(results)
+    else:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    print("Saved ->", args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
 import csv
 import sys
+import zlib
 import argparse
-from collections import defaultdict, Counter
-from datetime import datetime, timedelta
+from bisect import bisect_left, insort
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
 from math import isclose
+from typing import Optional
 
 # Tuneable thresholds (CHANGE THESE)
 # immediate strong indicator
@@ -24,6 +29,10 @@ AGG_WINDOW_HOURS = 24
 # flag if sum in window > multiplier * avg (avg approximated from history)
 AGG_MULTIPLIER = 5.0
 NEAR_ZERO_BALANCE = 1.0
+# how far (hours) a row may lag behind its account's newest row and still be
+# scored exactly like a full history rescan; older window entries are dropped.
+# covers the generators' 30-day spread; use 0 for strictly time-ordered feeds
+MAX_LATENESS_HOURS = 31 * 24
 
 # scoring weights (TUNE THESE)
 SCORES = {
@@ -51,30 +60,184 @@ FRAUD_SCORE = 6
 SUSPICIOUS_SCORE = 2
 
 # helper funcs
+EPOCH = datetime(1970, 1, 1)
+
 def parse_time(s):
+    # fast path for our exact export format ("2025-10-01T08:02:00Z");
+    # strptime is ~10x slower and still handles anything else
+    if len(s) == 20 and s[10] == 'T' and s[19] == 'Z':
+        try:
+            return datetime.fromisoformat(s[:19])
+        except ValueError:
+            pass
     return datetime.strptime(s, "%Y-%m-%dT%H:%M:%SZ")
 
 def within_seconds(t1, t2, s):
     return abs((t1 - t2).total_seconds()) <= s
 
-# main scoring function
-def score_row(row, state):
+def to_seconds(ts):
+    # datetime -> float seconds; all window math below works on these
+    return (ts - EPOCH).total_seconds()
+
+AGG_WINDOW_SECONDS = AGG_WINDOW_HOURS * 3600
+MAX_LATENESS_SECONDS = MAX_LATENESS_HOURS * 3600
+
+# don't compact a window list until this many entries have expired
+# (del lst[:k] is a memmove, so do it in batches)
+_PRUNE_BATCH = 256
+
+# windowed per-account state
+# The old code rescanned every past row of the account for velocity,
+# duplicates and the 24h sum. Here each window is a time-sorted list, queried
+# with bisect and trimmed once entries can no longer matter. An entry can be
+# dropped once it is older than (newest ts seen) - window - MAX_LATENESS, so
+# any row arriving at most MAX_LATENESS behind the account's newest row is
+# scored exactly like the full rescan (including its "later rows count too"
+# behaviour on unsorted exports).
+@dataclass(slots=True)
+class AccountState:
+    # newest timestamp seen for this account
+    watermark: float = float("-inf")
+    # sorted timestamps (velocity)
+    velocity_times: list = field(default_factory=list)
+    # device -> last tx time on that device (micro repeat)
+    last_time_by_device: dict = field(default_factory=dict)
+    last_tx_time: Optional[float] = None
+    last_small_time: Optional[float] = None
+    # payee -> count (new payee / payee frequency)
+    payee_counter: Counter = field(default_factory=Counter)
+    devices: set = field(default_factory=set)
+    ips: set = field(default_factory=set)
+    # duplicates: (payee, amount in cents) -> sorted [(ts, amount)], plus a
+    # sorted [(ts, key)] index used to expire bucket entries oldest-first
+    dup_buckets: dict = field(default_factory=dict)
+    dup_order: list = field(default_factory=list)
+    # 24h aggregate: sorted [(ts, amount)]; agg_sum is the running sum of
+    # agg_times[agg_lo:], i.e. everything at or after agg_cutoff
+    agg_times: list = field(default_factory=list)
+    agg_lo: int = 0
+    agg_cutoff: float = float("-inf")
+    agg_sum: float = 0.0
+    # (amount, ts) in arrival order, only for exact re-sums near the threshold
+    agg_log: deque = field(default_factory=deque)
+    # running totals for avg calc
+    hist_total: float = 0.0
+    hist_count: int = 0
+
+# shared, never mutated: stands in for accounts with no history yet
+_EMPTY_ACCOUNT = AccountState()
+
+def new_state():
+    # acct -> AccountState
+    return {}
+
+def _parse_row(row):
+    return (
+        float(row.get('amount', 0.0)),
+        row.get('country', '').upper(),
+        float(row.get('balance_after', 0.0)),
+        float(row.get('balance_before', 0.0)),
+        to_seconds(parse_time(row['timestamp'])),
+        row['account_id'],
+        row.get('device_id', ''),
+        row.get('ip_hash', ''),
+        row.get('payee_id', ''),
+    )
+
+def _expire(st):
+    """Drop entries no row within MAX_LATENESS can still see (batched)."""
+    horizon = st.watermark - MAX_LATENESS_SECONDS
+
+    vel = st.velocity_times
+    if vel and vel[0] < horizon - VELOCITY_WINDOW:
+        k = bisect_left(vel, horizon - VELOCITY_WINDOW)
+        if k >= _PRUNE_BATCH or k == len(vel):
+            del vel[:k]
+
+    order = st.dup_order
+    if order and order[0][0] < horizon - DUPLICATE_WINDOW:
+        k = bisect_left(order, (horizon - DUPLICATE_WINDOW,))
+        if k >= _PRUNE_BATCH or k == len(order):
+            buckets = st.dup_buckets
+            for _, key in order[:k]:
+                bucket = buckets[key]
+                # globally oldest entries are also the oldest in their bucket
+                del bucket[0]
+                if not bucket:
+                    del buckets[key]
+            del order[:k]
+
+    agg = st.agg_times
+    if agg and agg[0][0] < horizon - AGG_WINDOW_SECONDS:
+        # never past agg_lo: those entries are still in the running sum
+        k = min(bisect_left(agg, (horizon - AGG_WINDOW_SECONDS,)), st.agg_lo)
+        if k >= _PRUNE_BATCH or k == len(agg):
+            del agg[:k]
+            st.agg_lo -= k
+        log = st.agg_log
+        while log and log[0][1] < horizon - AGG_WINDOW_SECONDS:
+            log.popleft()
+
+def _velocity_count(st, ts):
+    # previous txs with t >= ts - window (later ones included, like before)
+    vel = st.velocity_times
+    return len(vel) - bisect_left(vel, ts - VELOCITY_WINDOW)
+
+def _has_duplicate(st, payee, amt, ts):
     """
-    row: dict of CSV fields
-    state: dict of histories and indices to compute contextual checks
-    returns: (pred_label, risk_score, reasons_list)
+    Same payee + amount within isclose(rel_tol=1e-6, abs_tol=0.01) and
+    t >= ts - DUPLICATE_WINDOW. Only buckets whose cents could be within
+    tolerance are probed.
     """
-    # parse basic fields
-    amt = float(row.get('amount', 0.0))
-    country = row.get('country', '').upper()
-    bal_after = float(row.get('balance_after', 0.0))
-    bal_before = float(row.get('balance_before', 0.0))
-    ts = parse_time(row['timestamp'])
-    acct = row['account_id']
-    device = row.get('device_id', '')
-    ip = row.get('ip_hash', '')
-    payee = row.get('payee_id', '')
-    notes = row.get('notes', '')
+    cents = round(amt * 100)
+    # |round(x) - round(y)| <= floor(|x - y|) + 1, tolerance padded for float error
+    span = int(max(abs(amt) * 1e-6 * (1 + 1e-5), 0.01) * 100 + 1e-6) + 1
+    cutoff = (ts - DUPLICATE_WINDOW,)
+    buckets = st.dup_buckets
+    for c in range(cents - span, cents + span + 1):
+        bucket = buckets.get((payee, c))
+        if bucket:
+            for j in range(bisect_left(bucket, cutoff), len(bucket)):
+                if isclose(bucket[j][1], amt, rel_tol=1e-6, abs_tol=0.01):
+                    return True
+    return False
+
+def _agg_window_sum(st, ts):
+    """Sum of amounts with t >= ts - 24h (approximate running value)."""
+    cutoff = ts - AGG_WINDOW_SECONDS
+    agg = st.agg_times
+    if cutoff >= st.agg_cutoff:
+        # in-order row: slide the window start forward
+        lo = st.agg_lo
+        total = st.agg_sum
+        while lo < len(agg) and agg[lo][0] < cutoff:
+            total -= agg[lo][1]
+            lo += 1
+        if lo == len(agg):
+            # reset so float drift can't build up across quiet periods
+            total = 0.0
+        st.agg_lo, st.agg_sum, st.agg_cutoff = lo, total, cutoff
+        return total
+    # late row: window starts before the pointer, add the gap on top
+    lo = bisect_left(agg, (cutoff,))
+    return st.agg_sum + sum(a for (_, a) in agg[lo:st.agg_lo])
+
+def _agg_spike(st, ts):
+    hist_count = st.hist_count
+    avg = (st.hist_total / hist_count) if hist_count > 0 else 0.0
+    if avg <= 0:
+        return False
+    threshold = AGG_MULTIPLIER * avg
+    agg_sum = _agg_window_sum(st, ts)
+    # the running sum can differ from a fresh left-to-right sum in the last
+    # bits; near the threshold re-add in arrival order so ties resolve exactly
+    if abs(agg_sum - threshold) <= 1e-9 * max(abs(threshold), 1.0):
+        cutoff = ts - AGG_WINDOW_SECONDS
+        agg_sum = sum(a for (a, t) in st.agg_log if t >= cutoff)
+    return agg_sum > threshold
+
+def _score(fields, st):
+    amt, country, bal_after, bal_before, ts, acct, device, ip, payee = fields
 
     score = 0
     reasons = []
@@ -90,26 +253,31 @@ def score_row(row, state):
     if not isclose((bal_before - amt), bal_after, abs_tol=0.01):
         score += SCORES["impossible_balance"]; reasons.append("impossible_balance")
 
+    if st is None:
+        # first time we see this account: score against empty history
+        st = _EMPTY_ACCOUNT
+    else:
+        _expire(st)
+
     # micro/small repeats on same device
     if amt <= MICRO_THRESHOLD:
-        prevs = state['by_account_device'][(acct, device)]
-        if prevs and (ts - prevs[-1]).total_seconds() <= MICRO_REPEAT_WINDOW:
+        prev = st.last_time_by_device.get(device)
+        if prev is not None and ts - prev <= MICRO_REPEAT_WINDOW:
             score += SCORES["micro_repeat"]; reasons.append("micro_repeat")
 
     # small purchase repeat across devices for same account
     if amt <= SMALL_AMOUNT_THRESHOLD:
-        last_small = state['last_small_time'].get(acct)
-        if last_small and (ts - last_small).total_seconds() <= MICRO_REPEAT_WINDOW:
+        last_small = st.last_small_time
+        if last_small is not None and ts - last_small <= MICRO_REPEAT_WINDOW:
             score += SCORES["small_repeat"]; reasons.append("small_repeat")
 
     # rapid back to back small charges
-    last_any = state['last_tx_time'].get(acct)
-    if last_any and amt <= SMALL_AMOUNT_THRESHOLD and (ts - last_any).total_seconds() <= 60:
+    last_any = st.last_tx_time
+    if last_any is not None and amt <= SMALL_AMOUNT_THRESHOLD and ts - last_any <= 60:
         score += SCORES["rapid_back_to_back"]; reasons.append("rapid_back_to_back")
 
     # velocity: count previous txs in window
-    recent = [t for t in state['history_by_account'][acct] if (ts - t).total_seconds() <= VELOCITY_WINDOW]
-    if len(recent) >= VELOCITY_COUNT - 1:
+    if _velocity_count(st, ts) >= VELOCITY_COUNT - 1:
         score += SCORES["high_velocity"]; reasons.append("high_velocity")
 
     # near-zero balance after non-micro spend
@@ -117,7 +285,7 @@ def score_row(row, state):
         score += SCORES["near_zero_balance"]; reasons.append("near_zero_balance")
 
     #new payee: never seen this payee for this account before
-    payee_count = state['payee_counter'][acct][payee]
+    payee_count = st.payee_counter[payee]
     if payee_count == 0:
         score += SCORES["new_payee"]; reasons.append("new_payee")
     else:
@@ -126,29 +294,20 @@ def score_row(row, state):
             score += SCORES["payee_freq"]; reasons.append("payee_freq")
 
     # device/IP change for this account (has it been seen or not)
-    if device and device not in state['devices_by_account'][acct]:
+    if device and device not in st.devices:
         # if account had prior devices, a new device is suspicious
-        if state['devices_by_account'][acct]:
+        if st.devices:
             score += SCORES["device_change"]; reasons.append("device_change")
-    if ip and ip not in state['ips_by_account'][acct]:
-        if state['ips_by_account'][acct]:
+    if ip and ip not in st.ips:
+        if st.ips:
             score += SCORES["ip_change"]; reasons.append("ip_change")
 
     # duplicate transaction detection: same payee + same amount within specified window
-    duplicates = state['recent_by_account'][acct]
-    for (amt_prev, payee_prev, ts_prev) in duplicates:
-        if payee_prev == payee and isclose(float(amt_prev), float(amt), rel_tol=1e-6, abs_tol=0.01) and (ts - ts_prev).total_seconds() <= DUPLICATE_WINDOW:
-            score += SCORES["duplicate_tx"]; reasons.append("duplicate_tx")
-            break
-
-    # aggregate 24h spike: sum amounts in 24hr agg
-    cutoff = ts - timedelta(hours=AGG_WINDOW_HOURS)
-    agg_sum = sum(a for (a,t) in state['amount_time_by_account'][acct] if t >= cutoff)
-    # approximate average: use historical total/count (minus current) and avoid division by 0
-    hist_total = state['hist_total_by_account'][acct]
-    hist_count = state['hist_count_by_account'][acct]
-    avg = (hist_total / hist_count) if hist_count > 0 else 0.0
-    if avg > 0 and agg_sum > (AGG_MULTIPLIER * avg):
+    if _has_duplicate(st, payee, amt, ts):
+        score += SCORES["duplicate_tx"]; reasons.append("duplicate_tx")
+
+    # aggregate 24h spike: window sum vs historical average
+    if _agg_spike(st, ts):
         score += SCORES["agg_24h_spike"]; reasons.append("agg_24h_spike")
 
     # determine predicted label from score
@@ -161,6 +320,66 @@ def score_row(row, state):
 
     return pred, score, reasons
 
+def _update(fields, st):
+    amt, _, _, _, ts, _, device, ip, payee = fields
+
+    if ts > st.watermark:
+        st.watermark = ts
+    insort(st.velocity_times, ts)
+    st.last_time_by_device[device] = ts
+    st.last_tx_time = ts
+    if amt <= SMALL_AMOUNT_THRESHOLD:
+        st.last_small_time = ts
+    st.payee_counter[payee] += 1
+    if device: st.devices.add(device)
+    if ip: st.ips.add(ip)
+    # store for duplicates
+    key = (payee, round(amt * 100))
+    bucket = st.dup_buckets.get(key)
+    if bucket is None:
+        bucket = st.dup_buckets[key] = []
+    insort(bucket, (ts, amt))
+    insort(st.dup_order, (ts, key))
+    # store for 24h aggregation; entries before agg_cutoff sit left of agg_lo
+    insort(st.agg_times, (ts, amt))
+    if ts >= st.agg_cutoff:
+        st.agg_sum += amt
+    else:
+        st.agg_lo += 1
+    st.agg_log.append((amt, ts))
+    st.hist_total += amt
+    st.hist_count += 1
+
+# main scoring function
+def score_row(row, state):
+    """
+    row: dict of CSV fields
+    state: acct -> AccountState (see new_state); only entries that fell out
+           of their windows are dropped here
+    returns: (pred_label, risk_score, reasons_list)
+    """
+    fields = _parse_row(row)
+    return _score(fields, state.get(fields[5]))
+
+def update_state(row, state):
+    """Fold a scored row into its account's windows (call after score_row)."""
+    fields = _parse_row(row)
+    st = state.get(fields[5])
+    if st is None:
+        st = state[fields[5]] = AccountState()
+    _update(fields, st)
+
+def score_and_update(row, state):
+    """score_row + update_state with a single parse of the row."""
+    fields = _parse_row(row)
+    acct = fields[5]
+    st = state.get(acct)
+    result = _score(fields, st)
+    if st is None:
+        st = state[acct] = AccountState()
+    _update(fields, st)
+    return result
+
 # main
 def main(input_csv, output_csv=None):
     # read input rows
@@ -168,28 +387,8 @@ def main(input_csv, output_csv=None):
         reader = csv.DictReader(f)
         rows = list(reader)
 
-    # state for historical/context checks
-    state = {
-        # acct -> list of datetimes
-        'history_by_account': defaultdict(list),
-        # (acct,device) -> list of datetimes
-        'by_account_device': defaultdict(list),
-        # acct -> last datetime
-        'last_tx_time': {},
-        # acct -> last small tx datetime
-        'last_small_time': {},
-        # acct -> Counter(payee -> count)
-        'payee_counter': defaultdict(Counter),
-        'devices_by_account': defaultdict(set),
-        'ips_by_account': defaultdict(set),
-        # acct -> list of tuples (amount,payee,ts) for duplicate detection
-        'recent_by_account': defaultdict(list),
-        # acct -> list of tuples (amount,ts) used for 24h aggregation
-        'amount_time_by_account': defaultdict(list),
-        # running totals for avg calc
-        'hist_total_by_account': defaultdict(float),
-        'hist_count_by_account': defaultdict(int),
-    }
+    # state for historical/context checks (acct -> AccountState)
+    state = new_state()
 
     # prepare output writer (failsafe)
     out_f = None
@@ -206,9 +405,8 @@ def main(input_csv, output_csv=None):
     # iterate and score
     for r in rows:
         acct = r['account_id']
-        ts = parse_time(r['timestamp'])
-        # compute score & predicted label
-        pred, score, reasons = score_row(r, state)
+        # compute score & predicted label, then update state after scoring
+        pred, score, reasons = score_and_update(r, state)
 
         primary_rule = reasons[0] if reasons else "clean"
         print(f"{r['transaction_id']},{pred},{primary_rule},{r.get('amount','')},{acct},{r.get('timestamp','')},{r.get('notes','')}")
@@ -222,27 +420,6 @@ def main(input_csv, output_csv=None):
             out_row['reasons'] = ";".join(reasons)
             out_writer.writerow(out_row)
 
-        # FIXED - update state after scoring
-        amt = float(r.get('amount', 0.0))
-        device = r.get('device_id','')
-        ip = r.get('ip_hash','')
-        payee = r.get('payee_id','')
-
-        state['history_by_account'][acct].append(ts)
-        state['by_account_device'][(acct, device)].append(ts)
-        state['last_tx_time'][acct] = ts
-        if amt <= SMALL_AMOUNT_THRESHOLD:
-            state['last_small_time'][acct] = ts
-        state['payee_counter'][acct][payee] += 1
-        if device: state['devices_by_account'][acct].add(device)
-        if ip: state['ips_by_account'][acct].add(ip)
-        # store for duplicates
-        state['recent_by_account'][acct].append((amt, payee, ts))
-        # store for 24h aggregation
-        state['amount_time_by_account'][acct].append((amt, ts))
-        state['hist_total_by_account'][acct] += amt
-        state['hist_count_by_account'][acct] += 1
-
     if out_f:
         out_f.close()
 
@@ -252,11 +429,201 @@ def main(input_csv, output_csv=None):
         print(f"Wrote output -> {output_csv}")
     return
 
+# streaming mode
+# rows per writerows() call in --stream mode
+WRITE_BATCH = 10_000
+# output file buffer size for --stream mode
+WRITE_BUFFER_BYTES = 1 << 20
+
+def main_stream(input_csv, output_csv=None, verbose=False, state_limit=None):
+    """
+    Constant-memory variant of main() for multi-GB exports:
+    - rows are read lazily (never list(reader))
+    - per-row terminal output only with verbose=True
+    - output rows are written in batches through a large buffer
+    - state_limit caps how many accounts keep state; the least recently
+      active account is evicted first (its next row scores as a new account)
+    """
+    # OrderedDict gives O(1) "move to most recent" / "drop least recent"
+    state = OrderedDict() if state_limit else new_state()
+    evicted = 0
+    n = 0
+
+    with open(input_csv, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        in_fields = reader.fieldnames or []
+
+        out_f = None
+        out_writer = None
+        batch = []
+        if output_csv:
+            out_f = open(output_csv, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER_BYTES)
+            out_writer = csv.writer(out_f)
+            out_writer.writerow(list(in_fields) + ['predicted_label','risk_score','reasons'])
+
+        if verbose:
+            print("id,pred_label,rule,amount,account_id,timestamp,notes")
+
+        try:
+            for r in reader:
+                acct = r['account_id']
+                pred, score, reasons = score_and_update(r, state)
+                n += 1
+
+                if state_limit:
+                    state.move_to_end(acct)
+                    while len(state) > state_limit:
+                        state.popitem(last=False)
+                        evicted += 1
+
+                if verbose:
+                    primary_rule = reasons[0] if reasons else "clean"
+                    print(f"{r['transaction_id']},{pred},{primary_rule},{r.get('amount','')},{acct},{r.get('timestamp','')},{r.get('notes','')}")
+
+                if out_writer:
+                    batch.append([r.get(k) for k in in_fields] + [pred, score, ";".join(reasons)])
+                    if len(batch) >= WRITE_BATCH:
+                        out_writer.writerows(batch)
+                        batch.clear()
+        finally:
+            if out_writer and batch:
+                out_writer.writerows(batch)
+            if out_f:
+                out_f.close()
+
+    print(f"\nSummary: scored {n} rows, {len(state)} accounts in state, {evicted} evicted.")
+    if output_csv:
+        print(f"Wrote output -> {output_csv}")
+    return
+
+# parallel mode
+# All state is per account, so rows can be split by account and scored in
+# separate processes: as long as every account's rows stay in file order in
+# one worker, each row sees exactly the history it sees single-process.
+def _partition_of(acct, workers):
+    # stable across processes (unlike hash(), which is salted per process)
+    return zlib.crc32(acct.encode('utf-8')) % workers
+
+def _as_dict(header, values):
+    # same dict csv.DictReader would build (short rows -> None, extras -> key None)
+    row = dict(zip(header, values))
+    if len(values) < len(header):
+        for k in header[len(values):]:
+            row[k] = None
+    elif len(values) > len(header):
+        row[None] = values[len(header):]
+    return row
+
+def _score_partition(input_csv, part, workers):
+    """
+    Worker: read the file, keep only this partition's accounts, score them.
+    Returns (row indexes, results) in file order. Rows are re-read here rather
+    than pickled over from the parent; skipping foreign rows is cheap.
+    """
+    state = new_state()
+    owner = {}
+    idx, results = [], []
+    with open(input_csv, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        acct_i = header.index('account_id')
+        i = -1
+        for values in reader:
+            if not values:
+                # DictReader skips blank lines too
+                continue
+            i += 1
+            acct = values[acct_i] if acct_i < len(values) else None
+            p = owner.get(acct)
+            if p is None:
+                p = owner[acct] = _partition_of(acct or '', workers)
+            if p != part:
+                continue
+            idx.append(i)
+            results.append(score_and_update(_as_dict(header, values), state))
+    return idx, results
+
+def main_parallel(input_csv, output_csv=None, workers=2, verbose=False):
+    """
+    Hash-partition rows by account_id, score partitions in a process pool,
+    then write results back in the original row order. Output matches main()
+    / main_stream() exactly. Results are held in memory until the write pass.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_score_partition, input_csv, k, workers) for k in range(workers)]
+        parts = [fut.result() for fut in futures]
+
+    n = sum(len(idx) for idx, _ in parts)
+    merged = [None] * n
+    for idx, results in parts:
+        for i, res in zip(idx, results):
+            merged[i] = res
+
+    out_f = None
+    out_writer = None
+    if output_csv:
+        out_f = open(output_csv, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER_BYTES)
+        out_writer = csv.writer(out_f)
+
+    if verbose:
+        print("id,pred_label,rule,amount,account_id,timestamp,notes")
+
+    try:
+        with open(input_csv, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            width = len(header)
+            if out_writer:
+                out_writer.writerow(header + ['predicted_label','risk_score','reasons'])
+            batch = []
+            i = -1
+            for values in reader:
+                if not values:
+                    continue
+                i += 1
+                pred, score, reasons = merged[i]
+                if verbose:
+                    r = _as_dict(header, values)
+                    primary_rule = reasons[0] if reasons else "clean"
+                    print(f"{r['transaction_id']},{pred},{primary_rule},{r.get('amount','')},{r['account_id']},{r.get('timestamp','')},{r.get('notes','')}")
+                if out_writer:
+                    # pad/trim to the header like DictWriter would
+                    row = values[:width] + [''] * (width - len(values))
+                    batch.append(row + [pred, score, ";".join(reasons)])
+                    if len(batch) >= WRITE_BATCH:
+                        out_writer.writerows(batch)
+                        batch.clear()
+            if out_writer and batch:
+                out_writer.writerows(batch)
+    finally:
+        if out_f:
+            out_f.close()
+
+    print(f"\nSummary: scored {n} rows with {workers} workers.")
+    if output_csv:
+        print(f"Wrote output -> {output_csv}")
+    return
+
 # CLI
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Improved rule-based fraud detector (risk scoring).")
     parser.add_argument("input", help="Input transactions CSV")
     parser.add_argument("--out", help="Output CSV filename (optional)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read rows lazily + batch output writes (constant memory for huge files)")
+    parser.add_argument("--verbose", action="store_true",
+                        help="With --stream/--workers, also print one line per transaction")
+    parser.add_argument("--state-limit", type=int, default=None,
+                        help="With --stream, keep state for at most N accounts (least recently active evicted)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Score account partitions in N processes (same output as 1 worker)")
     args = parser.parse_args()
 
-    main(args.input, args.out)
+    if args.workers > 1:
+        if args.state_limit:
+            parser.error("--state-limit is not supported with --workers")
+        main_parallel(args.input, args.out, workers=args.workers, verbose=args.verbose)
+    elif args.stream:
+        main_stream(args.input, args.out, verbose=args.verbose, state_limit=args.state_limit)
+    else:
+        main(args.input, args.out)
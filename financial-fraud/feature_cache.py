@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+feature_cache.py
+
+disk cache for preprocessed feature matrices, so re-running training (or the
+model benchmark) with the same data + settings skips the csv parse and the
+ColumnTransformer fit entirely.
+
+- an entry is a directory of .npy files (loaded back memory-mapped, so a hit
+  costs a few file opens, not a read of the data) plus joblib'd python
+  objects (e.g. the fitted ColumnTransformer) and meta.json
+- the key is a sha256 over the source file fingerprint (size, mtime, digest
+  of sampled blocks) and whatever config the caller passes (columns, sample
+  size, random state, preprocessing, ...). change any of it -> new entry
+- LRU eviction: every hit touches the entry; after a put the least recently
+  used entries are deleted until the cache fits its disk budget
+- entries are written to a temp dir and renamed into place, so a crash never
+  leaves a half-written entry that looks valid
+
+usage:
+    python feature_cache.py list   [--dir .feature_cache]
+    python feature_cache.py clear  [--dir .feature_cache]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_DIR = ".feature_cache"
+DEFAULT_BUDGET_BYTES = 5 * 1024 ** 3
+
+# sampled digest: head + tail + evenly spaced blocks (a full hash of a
+# multi-GB csv would cost seconds on every hit)
+_BLOCK = 1 << 20
+_N_BLOCKS = 16
+
+
+def file_fingerprint(path: str, full: bool = False) -> Dict[str, Any]:
+    """size + mtime + blake2b of the file (sampled blocks unless full)."""
+    st = os.stat(path)
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        if full or st.st_size <= _BLOCK * (_N_BLOCKS + 2):
+            for block in iter(lambda: f.read(_BLOCK), b""):
+                h.update(block)
+        else:
+            step = (st.st_size - _BLOCK) // (_N_BLOCKS + 1)
+            for i in range(_N_BLOCKS + 2):
+                f.seek(min(i * step, st.st_size - _BLOCK))
+                h.update(f.read(_BLOCK))
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": h.hexdigest(), "full": full}
+
+
+def _dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+class FeatureCache:
+    def __init__(self, root: str = DEFAULT_DIR, budget_bytes: int = DEFAULT_BUDGET_BYTES):
+        self.root = root
+        self.budget_bytes = budget_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def key(self, source_path: str, **config: Any) -> str:
+        payload = {"source": file_fingerprint(source_path), "config": config}
+        raw = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()[:32]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """arrays (memory-mapped) + objects of an entry, or None on a miss."""
+        path = self._path(key)
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        out: Dict[str, Any] = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in meta["arrays"]
+        }
+        if meta["objects"]:
+            import joblib
+
+            for name in meta["objects"]:
+                out[name] = joblib.load(os.path.join(path, f"{name}.joblib"))
+        # LRU clock: last use = meta.json mtime
+        os.utime(meta_path)
+        return out
+
+    def put(self, key: str, arrays: Dict[str, np.ndarray], objects: Optional[Dict[str, Any]] = None,
+            info: Optional[Dict[str, Any]] = None) -> None:
+        objects = objects or {}
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=self.root)
+        try:
+            for name, arr in arrays.items():
+                np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(arr))
+            if objects:
+                import joblib
+
+                for name, obj in objects.items():
+                    joblib.dump(obj, os.path.join(tmp, f"{name}.joblib"))
+            meta = {
+                "arrays": list(arrays), "objects": list(objects),
+                "created": time.time(), "info": info or {},
+            }
+            with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=2, default=str)
+            dest = self._path(key)
+            if os.path.exists(dest):
+                shutil.rmtree(dest)
+            os.replace(tmp, dest)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        self.evict(keep=key)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """valid entries, least recently used first."""
+        out = []
+        for name in os.listdir(self.root):
+            meta_path = os.path.join(self.root, name, "meta.json")
+            if name.startswith(".") or not os.path.exists(meta_path):
+                continue
+            out.append({
+                "key": name,
+                "bytes": _dir_size(os.path.join(self.root, name)),
+                "last_used": os.path.getmtime(meta_path),
+            })
+        return sorted(out, key=lambda e: e["last_used"])
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """delete least recently used entries until the total fits the budget."""
+        entries = self.entries()
+        total = sum(e["bytes"] for e in entries)
+        removed = []
+        for e in entries:
+            if total <= self.budget_bytes:
+                break
+            if e["key"] == keep:
+                continue
+            shutil.rmtree(self._path(e["key"]), ignore_errors=True)
+            total -= e["bytes"]
+            removed.append(e["key"])
+        return removed
+
+    def clear(self) -> None:
+        for name in os.listdir(self.root):
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Inspect or clear the feature-matrix cache.")
+    p.add_argument("command", choices=["list", "clear"])
+    p.add_argument("--dir", default=DEFAULT_DIR, help="Cache directory.")
+    args = p.parse_args()
+
+    cache = FeatureCache(args.dir)
+    if args.command == "clear":
+        cache.clear()
+        print(f"Cleared {args.dir}")
+        return
+    for e in cache.entries():
+        used = time.strftime("%Y-%m-%d %H:%M", time.localtime(e["last_used"]))
+        print(f"{e['key']}  {e['bytes'] / 1e6:9.1f} MB  last used {used}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+flat_forest.py
+
+flattens the model from train_fraud_model.py (Pipeline: ColumnTransformer
+with OneHotEncoder(type) + passthrough numbers -> RandomForestClassifier)
+into a few contiguous numpy arrays, and scores with plain numpy.
+
+why: the joblib pickle is big and slow to load, and sklearn's predict_proba
+has milliseconds of fixed overhead per call (validation, ColumnTransformer,
+thread pool), which is most of the cost for one row.
+
+export layout (a directory, every array its own .npy so it can be mmap'd):
+- feature.npy    int16    split column per node (design-matrix column)
+- threshold.npy  float64  go left if x <= threshold (same test as sklearn)
+- left.npy / right.npy  int32  child node ids (global, -1 = leaf)
+- value.npy      float64  P(fraud) at each node (used at leaves)
+- roots.npy      int32    root node id of every tree
+- meta.json      input columns, type categories, design column order
+
+the one-hot encoding is part of the engine: the design matrix is built from
+the raw columns with the encoder's categories (unknown type -> all zeros,
+like handle_unknown="ignore"), so no sklearn is needed to score.
+
+scoring walks every (row, tree) pair down its tree one level per step,
+all pairs at once, dropping pairs that reached a leaf. X is cast to float32
+first, like sklearn does, so thresholds compare exactly the same. the
+per-pair state is ~16 bytes * rows * trees, so rows go through in blocks of
+BATCH_ROWS (10k rows x 300 trees ~ 50 MB) however big X is.
+
+usage:
+    python flat_forest.py export --model fraud_model.joblib --out fraud_model.flat
+    python flat_forest.py score --flat fraud_model.flat --in kaggle.csv --out scored.csv
+"""
+
+import argparse
+import json
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+_ARRAYS = ["feature", "threshold", "left", "right", "value", "roots"]
+
+# rows scored per block in predict_design (bounds the per-(row, tree) state)
+BATCH_ROWS = 10_000
+
+
+def _design_spec(preprocess: Any) -> Dict[str, Any]:
+    """design-matrix column layout of a fitted ColumnTransformer (one-hot + passthrough only)."""
+    from sklearn.preprocessing import FunctionTransformer, OneHotEncoder
+
+    if getattr(preprocess, "remainder", "drop") != "drop":
+        raise ValueError("only remainder='drop' ColumnTransformers are supported")
+
+    design: List[Dict[str, Any]] = []
+    for name, trans, cols in preprocess.transformers_:
+        if trans == "drop" or name == "remainder":
+            continue
+        # fitted "passthrough" shows up as an identity FunctionTransformer
+        if trans == "passthrough" or (isinstance(trans, FunctionTransformer) and trans.func is None):
+            design += [{"column": c} for c in cols]
+        elif isinstance(trans, OneHotEncoder):
+            if trans.drop is not None:
+                raise ValueError("OneHotEncoder(drop=...) is not supported")
+            for c, cats in zip(cols, trans.categories_):
+                design += [{"column": c, "equals": v.item() if hasattr(v, "item") else v} for v in cats]
+        else:
+            raise ValueError(f"unsupported transformer {name!r}: {type(trans).__name__}")
+    return {"design": design, "columns": list(dict.fromkeys(d["column"] for d in design))}
+
+
+def flatten(pipe: Any) -> Dict[str, Any]:
+    """fitted Pipeline(preprocess, RandomForestClassifier) -> dict of arrays + 'meta'."""
+    if len(getattr(pipe, "steps", [])) != 2 or not hasattr(pipe.steps[1][1], "estimators_"):
+        raise ValueError("expected Pipeline([preprocess, RandomForestClassifier])")
+    preprocess, forest = pipe.steps[0][1], pipe.steps[1][1]
+    meta = _design_spec(preprocess)
+    fraud_class = len(forest.classes_) - 1
+
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    for est in forest.estimators_:
+        t = est.tree_
+        v = t.value[:, 0, :]
+        is_leaf = t.children_left < 0
+        roots.append(offset)
+        feature.append(np.where(is_leaf, 0, t.feature))
+        threshold.append(t.threshold)
+        left.append(np.where(is_leaf, -1, t.children_left + offset))
+        right.append(np.where(is_leaf, -1, t.children_right + offset))
+        # per-tree predict_proba normalizes the leaf counts/fractions
+        value.append(v[:, fraud_class] / v.sum(axis=1))
+        offset += t.node_count
+
+    meta.update({
+        "n_trees": len(forest.estimators_),
+        "n_nodes": offset,
+        "classes": [c.item() if hasattr(c, "item") else c for c in forest.classes_],
+    })
+    return {
+        "feature": np.concatenate(feature).astype(np.int16),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "left": np.concatenate(left).astype(np.int32),
+        "right": np.concatenate(right).astype(np.int32),
+        "value": np.concatenate(value).astype(np.float64),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "meta": meta,
+    }
+
+
+def export(pipe: Any, out_dir: str) -> None:
+    flat = flatten(pipe)
+    os.makedirs(out_dir, exist_ok=True)
+    for name in _ARRAYS:
+        np.save(os.path.join(out_dir, f"{name}.npy"), flat[name])
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(flat["meta"], f, indent=2)
+
+
+class FlatForest:
+    """numpy-only scorer over the exported arrays (memory-mapped by default)."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        self.meta = meta
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.columns = meta["columns"]
+        self._design = meta["design"]
+        self._n_design = len(self._design)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "FlatForest":
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode) for name in _ARRAYS}
+        return cls(arrays, meta)
+
+    @classmethod
+    def from_pipeline(cls, pipe: Any) -> "FlatForest":
+        flat = flatten(pipe)
+        return cls(flat, flat.pop("meta"))
+
+    def design_matrix(self, df: pd.DataFrame) -> np.ndarray:
+        """raw columns -> float32 design matrix (one-hot folded in)."""
+        X = np.empty((len(df), self._n_design), dtype=np.float32)
+        cache: Dict[str, np.ndarray] = {}
+        for j, d in enumerate(self._design):
+            col = cache.get(d["column"])
+            if col is None:
+                col = cache[d["column"]] = df[d["column"]].to_numpy()
+            if "equals" in d:
+                X[:, j] = col == d["equals"]
+            else:
+                X[:, j] = col
+        return X
+
+    def predict_design(self, X: np.ndarray, batch_rows: int = BATCH_ROWS) -> np.ndarray:
+        """P(fraud) per row of a float32 design matrix, batch_rows rows at a time."""
+        if len(X) <= batch_rows:
+            return self._predict_block(X)
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), batch_rows):
+            out[start:start + batch_rows] = self._predict_block(X[start:start + batch_rows])
+        return out
+
+    def _predict_block(self, X: np.ndarray) -> np.ndarray:
+        n, d = X.shape
+        n_trees = len(self.roots)
+        flat_x = np.ascontiguousarray(X, dtype=np.float32).ravel()
+        # one slot per (row, tree): current node, and the row's offset into flat_x
+        node = np.tile(np.asarray(self.roots, dtype=np.int64), n)
+        base = np.repeat(np.arange(n, dtype=np.int64) * d, n_trees)
+        active = np.flatnonzero(self.left[node] >= 0)
+        while active.size:
+            nd = node[active]
+            go_left = flat_x[base[active] + self.feature[nd]] <= self.threshold[nd]
+            nxt = np.where(go_left, self.left[nd], self.right[nd])
+            node[active] = nxt
+            active = active[self.left[nxt] >= 0]
+        return self.value[node].reshape(n, n_trees).mean(axis=1)
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        """P(fraud) per row of a DataFrame with the raw training columns."""
+        return self.predict_design(self.design_matrix(df))
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Flatten the trained RF pipeline to numpy arrays / score with them.")
+    sub = p.add_subparsers(dest="command", required=True)
+    e = sub.add_parser("export", help="Flatten a joblib pipeline into a directory of .npy arrays.")
+    e.add_argument("--model", default="fraud_model.joblib", help="Pipeline saved by train_fraud_model.py.")
+    e.add_argument("--out", default="fraud_model.flat", help="Output directory.")
+    s = sub.add_parser("score", help="Score a Kaggle-style CSV with an exported model.")
+    s.add_argument("--flat", default="fraud_model.flat", help="Directory written by export.")
+    s.add_argument("--in", dest="inp", required=True, help="Input CSV (Kaggle schema).")
+    s.add_argument("--out", default="kaggle_scored.csv", help="Output scored CSV filename.")
+    s.add_argument("--threshold", type=float, default=0.5, help="Probability threshold for pred_isFraud=1.")
+    args = p.parse_args()
+
+    if args.command == "export":
+        import joblib
+
+        export(joblib.load(args.model), args.out)
+        size = sum(os.path.getsize(os.path.join(args.out, f)) for f in os.listdir(args.out))
+        print(f"Exported {args.model} -> {args.out} ({size / 1e6:.1f} MB)")
+        return
+
+    forest = FlatForest.load(args.flat)
+    df = pd.read_csv(args.inp)
+    missing = [c for c in forest.columns if c not in df.columns]
+    if missing:
+        raise SystemExit(f"ERROR: missing required columns: {missing}")
+    df["fraud_proba"] = forest.predict_proba(df)
+    df["pred_isFraud"] = (df["fraud_proba"] >= args.threshold).astype(int)
+    df.to_csv(args.out, index=False)
+    print(f"Scored {len(df)} rows -> {args.out}")
+    print(f"threshold={args.threshold}")
+
+
+if __name__ == "__main__":
+    main()
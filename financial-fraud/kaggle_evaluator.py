@@ -13,19 +13,27 @@ optional:
 - fraud_proba (float)
 
 prints some basic metrics + per-type breakdown so you can see what's getting missed.
+
+with fraud_proba it also sweeps every threshold: fraud_proba is sorted once
+(descending) and cumulative sums of isFraud give tp/fp at every distinct
+threshold, overall and per type (each type's rows keep the sorted order), so
+the whole precision/recall/f1 curve costs one O(n log n) sort instead of one
+sklearn call per threshold. roc_auc / pr_auc come from the same curve. then
+it reports the best threshold per objective:
+- max f1
+- max recall with precision >= --min-precision
+- min cost (--cost-fn per missed fraud, --cost-fp per false alarm)
+--curve out.csv writes the full overall curve.
+
+only the needed columns are read, with compact dtypes, and the fixed
+threshold numbers (pred_isFraud) for all types come from one bincount.
 """
 
 import argparse
-import pandas as pd
+from typing import Dict, Optional
 
-from sklearn.metrics import (
-    confusion_matrix,
-    precision_score,
-    recall_score,
-    f1_score,
-    roc_auc_score,
-    average_precision_score,
-)
+import numpy as np
+import pandas as pd
 
 
 def _require_cols(df: pd.DataFrame, cols):
@@ -40,28 +48,107 @@ def _safe_rate(numer: int, denom: int) -> float:
     return (numer / denom) if denom else 0.0
 
 
+def _confusion_by_group(group: np.ndarray, n_groups: int, y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    """(n_groups, 2, 2) confusion matrices [[TN FP],[FN TP]] in one bincount."""
+    key = group.astype(np.int64) * 4 + y_true.astype(np.int64) * 2 + y_pred
+    return np.bincount(key, minlength=n_groups * 4).reshape(n_groups, 2, 2)
+
+
+def _scores(tn: int, fp: int, fn: int, tp: int):
+    precision = _safe_rate(tp, tp + fp)
+    recall = _safe_rate(tp, tp + fn)
+    f1 = _safe_rate(2 * tp, 2 * tp + fp + fn)
+    return precision, recall, f1
+
+
+def sweep(y_sorted: np.ndarray, p_sorted: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    confusion counts at every distinct threshold, from rows sorted by
+    fraud_proba descending. entry i = "predict fraud if proba >= threshold[i]".
+    """
+    n = len(y_sorted)
+    if n == 0:
+        return {k: np.empty(0) for k in ("threshold", "tp", "fp", "fn", "tn", "precision", "recall", "f1")}
+    # last row of each run of equal probabilities
+    last = np.r_[np.flatnonzero(np.diff(p_sorted)), n - 1]
+    tp = np.cumsum(y_sorted, dtype=np.int64)[last]
+    fp = last + 1 - tp
+    pos = int(tp[-1])
+    neg = n - pos
+    fn = pos - tp
+    tn = neg - fp
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = tp / pos if pos else np.zeros(len(tp))
+        f1 = np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), 0.0)
+    return {
+        "threshold": p_sorted[last], "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "precision": precision, "recall": recall, "f1": f1,
+    }
+
+
+def auc_scores(curve: Dict[str, np.ndarray]):
+    """(roc_auc, pr_auc) from a sweep; same definitions as sklearn's roc_auc_score / average_precision_score."""
+    tp, fp = curve["tp"], curve["fp"]
+    pos, neg = tp[-1], fp[-1]
+    tpr = np.r_[0.0, tp / pos]
+    fpr = np.r_[0.0, fp / neg]
+    roc = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+    pr = float(np.sum(np.diff(np.r_[0.0, curve["recall"]]) * curve["precision"]))
+    return roc, pr
+
+
+def best_thresholds(curve: Dict[str, np.ndarray], min_precision: float, cost_fn: float, cost_fp: float):
+    """objective -> index into the curve (None if no threshold qualifies)."""
+    out: Dict[str, Optional[int]] = {"max_f1": int(np.argmax(curve["f1"]))}
+    ok = np.flatnonzero(curve["precision"] >= min_precision)
+    # among qualifying thresholds: highest recall, then highest threshold
+    out[f"max_recall@p>={min_precision:g}"] = int(ok[np.argmax(curve["recall"][ok])]) if ok.size else None
+    out["min_cost"] = int(np.argmin(cost_fn * curve["fn"] + cost_fp * curve["fp"]))
+    return out
+
+
+def _counts_at(curve: Dict[str, np.ndarray], n_pos: int, n_neg: int, threshold: float):
+    """(tn, fp, fn, tp) at an arbitrary threshold, looked up in a sweep."""
+    # thresholds are descending: entries with threshold >= t are predicted fraud
+    k = int(np.searchsorted(-curve["threshold"], -threshold, side="right"))
+    tp = int(curve["tp"][k - 1]) if k else 0
+    fp = int(curve["fp"][k - 1]) if k else 0
+    return n_neg - fp, fp, n_pos - tp, tp
+
+
 def main() -> None:
     # basic cli wrapper
     p = argparse.ArgumentParser(description="Evaluate Kaggle-style fraud predictions.")
     p.add_argument("--in", dest="inp", required=True, help="Input scored CSV (must include isFraud + pred_isFraud).")
+    p.add_argument("--min-precision", type=float, default=0.9,
+                   help="Precision floor for the max-recall objective.")
+    p.add_argument("--cost-fn", type=float, default=10.0, help="Cost of a missed fraud (min-cost objective).")
+    p.add_argument("--cost-fp", type=float, default=1.0, help="Cost of a false alarm (min-cost objective).")
+    p.add_argument("--curve", default=None, help="Write the full threshold curve to this CSV.")
     args = p.parse_args()
 
-    # load scored file
-    df = pd.read_csv(args.inp)
-
+    # load only the columns we use, compact dtypes (a 6M-row file is mostly
+    # name/balance columns we never look at)
+    header = pd.read_csv(args.inp, nrows=0).columns
     # if these aren't here, nothing else matters
-    _require_cols(df, ["isFraud", "pred_isFraud", "type"])
-
-    y_true = df["isFraud"].astype(int).to_numpy()
-    y_pred = df["pred_isFraud"].astype(int).to_numpy()
-
-    # overall confusion matrix and the usual metrics
-    cm = confusion_matrix(y_true, y_pred, labels=[0, 1])
-    tn, fp, fn, tp = cm.ravel()
-
-    precision = precision_score(y_true, y_pred, zero_division=0)
-    recall = recall_score(y_true, y_pred, zero_division=0)
-    f1 = f1_score(y_true, y_pred, zero_division=0)
+    _require_cols(pd.DataFrame(columns=header), ["isFraud", "pred_isFraud", "type"])
+    dtypes = {"isFraud": "int8", "pred_isFraud": "int8", "type": "category"}
+    if "fraud_proba" in header:
+        dtypes["fraud_proba"] = "float64"
+    df = pd.read_csv(args.inp, usecols=list(dtypes), dtype=dtypes)
+
+    y_true = df["isFraud"].to_numpy()
+    y_pred = df["pred_isFraud"].to_numpy()
+    types = df["type"].cat.categories.tolist()
+    type_code = df["type"].cat.codes.to_numpy()
+
+    # every type's confusion matrix in one pass; overall = their sum
+    # (rows with a missing type only count towards the overall numbers)
+    cms = _confusion_by_group(np.where(type_code < 0, len(types), type_code), len(types) + 1, y_true, y_pred)
+    cm = cms.sum(axis=0)
+    tn, fp, fn, tp = (int(v) for v in cm.ravel())
+    precision, recall, f1 = _scores(tn, fp, fn, tp)
 
     print("\n=== Overall ===")
     print(f"rows: {len(df)}")
@@ -71,14 +158,18 @@ def main() -> None:
     print(f"recall:    {recall:.4f}")
     print(f"f1:        {f1:.4f}")
 
-    # if we have probabilities, we can do auc stuff too
+    curve = None
     if "fraud_proba" in df.columns:
-        proba = df["fraud_proba"].astype(float).to_numpy()
+        proba = df["fraud_proba"].to_numpy()
+        # one sort for everything below
+        order = np.argsort(-proba, kind="stable")
+        y_sorted = y_true[order]
+        p_sorted = proba[order]
+        curve = sweep(y_sorted, p_sorted)
 
         # roc_auc needs both classes present or it crashes
-        if len(set(y_true.tolist())) > 1:
-            roc = roc_auc_score(y_true, proba)
-            pr_auc = average_precision_score(y_true, proba)
+        if 0 < int(y_true.sum()) < len(y_true):
+            roc, pr_auc = auc_scores(curve)
             print(f"roc_auc:   {roc:.4f}")
             print(f"pr_auc:    {pr_auc:.4f}")
         else:
@@ -86,25 +177,60 @@ def main() -> None:
 
     # breakdown by tx type so you can see where it's weak
     print("\n=== By transaction type ===")
-    for t in sorted(df["type"].unique().tolist()):
-        sub = df[df["type"] == t]
-        yt = sub["isFraud"].astype(int).to_numpy()
-        yp = sub["pred_isFraud"].astype(int).to_numpy()
-
-        # keep it simple: always compute w/ labels=[0,1]
-        cm_t = confusion_matrix(yt, yp, labels=[0, 1])
-        tn_t, fp_t, fn_t, tp_t = cm_t.ravel()
-
-        prec_t = precision_score(yt, yp, zero_division=0)
-        rec_t = recall_score(yt, yp, zero_division=0)
-        f1_t = f1_score(yt, yp, zero_division=0)
-
-        base_rate = _safe_rate(int(yt.sum()), len(yt))
-
-        print(f"\n-- {t} -- rows={len(sub)} fraud_base_rate={base_rate:.4f}")
-        print(f"  cm [[TN FP],[FN TP]] = {cm_t.tolist()}")
+    for i, t in enumerate(types):
+        tn_t, fp_t, fn_t, tp_t = (int(v) for v in cms[i].ravel())
+        rows_t = tn_t + fp_t + fn_t + tp_t
+        if rows_t == 0:
+            continue
+        prec_t, rec_t, f1_t = _scores(tn_t, fp_t, fn_t, tp_t)
+        base_rate = _safe_rate(fn_t + tp_t, rows_t)
+
+        print(f"\n-- {t} -- rows={rows_t} fraud_base_rate={base_rate:.4f}")
+        print(f"  cm [[TN FP],[FN TP]] = {cms[i].tolist()}")
         print(f"  precision={prec_t:.4f} recall={rec_t:.4f} f1={f1_t:.4f}")
 
+    if curve is None or len(curve["threshold"]) == 0:
+        return
+
+    # per-type curves: each type's rows, still in the global sorted order
+    t_sorted = type_code[order]
+    type_curves = {t: sweep(y_sorted[t_sorted == i], p_sorted[t_sorted == i]) for i, t in enumerate(types)}
+
+    n_pos = int(curve["tp"][-1])
+    n_neg = len(y_true) - n_pos
+    print(f"\n=== Threshold sweep ({len(curve['threshold'])} distinct thresholds) ===")
+    for name, idx in best_thresholds(curve, args.min_precision, args.cost_fn, args.cost_fp).items():
+        if idx is None:
+            print(f"\n-- {name} -- no threshold reaches that precision")
+            continue
+        thr = float(curve["threshold"][idx])
+        cost = args.cost_fn * int(curve["fn"][idx]) + args.cost_fp * int(curve["fp"][idx])
+        print(f"\n-- {name} -- threshold={thr:.6g}")
+        print(f"  cm [[TN FP],[FN TP]] = {[[int(curve['tn'][idx]), int(curve['fp'][idx])], [int(curve['fn'][idx]), int(curve['tp'][idx])]]}")
+        print(f"  precision={curve['precision'][idx]:.4f} recall={curve['recall'][idx]:.4f} "
+              f"f1={curve['f1'][idx]:.4f} cost={cost:g}")
+        for t, tc in type_curves.items():
+            if len(tc["threshold"]) == 0:
+                continue
+            pos_t = int(tc["tp"][-1])
+            neg_t = int(tc["tp"][-1] + tc["fp"][-1]) - pos_t
+            tn_t, fp_t, fn_t, tp_t = _counts_at(tc, pos_t, neg_t, thr)
+            prec_t, rec_t, f1_t = _scores(tn_t, fp_t, fn_t, tp_t)
+            print(f"    {t:<9} cm={[[tn_t, fp_t], [fn_t, tp_t]]} precision={prec_t:.4f} recall={rec_t:.4f} f1={f1_t:.4f}")
+
+    # best f1 threshold for each type on its own
+    print("\n-- max_f1 per type --")
+    for t, tc in type_curves.items():
+        if len(tc["threshold"]) == 0:
+            continue
+        i = int(np.argmax(tc["f1"]))
+        print(f"  {t:<9} threshold={float(tc['threshold'][i]):.6g} precision={tc['precision'][i]:.4f} "
+              f"recall={tc['recall'][i]:.4f} f1={tc['f1'][i]:.4f}")
+
+    if args.curve:
+        pd.DataFrame(curve).to_csv(args.curve, index=False)
+        print(f"\ncurve ({len(curve['threshold'])} rows) -> {args.curve}")
+
 
 if __name__ == "__main__":
     main()
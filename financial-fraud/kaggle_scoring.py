@@ -8,13 +8,27 @@ adds:
 - fraud_proba (if we can get probabilities)
 - pred_isFraud (0/1 based on threshold)
 
-this expects your model file to be something like an sklearn Pipeline saved with joblib.
+this expects your model file to be something like an sklearn Pipeline saved with joblib
+(or a directory exported by flat_forest.py).
+
+big files:
+- --chunksize N reads, scores and appends the output N rows at a time, so
+  memory is one chunk no matter how big the input is
+- --jobs N (with --chunksize) scores chunks in N worker processes. each
+  worker loads the model once; the main process reads chunks, keeps at most
+  2*N in flight and writes results in input order. with a flat_forest.py
+  export as --model the workers memory-map the same tree arrays (shared page
+  cache, not N copies; sklearn copies its trees into each process on load),
+  and score each chunk in flat_forest.BATCH_ROWS blocks, so worker memory
+  stays bounded whatever --chunksize is
 """
 
 import argparse
-import csv
-from typing import Any, Dict, List, Optional
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterator, Optional
 
+import numpy as np
 import pandas as pd
 
 try:
@@ -31,10 +45,15 @@ REQUIRED_COLS = [
 
 
 def _load_model(path: str) -> Any:
+    # flat_forest.py export dir: numpy-only model, arrays memory-mapped
+    if os.path.isdir(path):
+        from flat_forest import FlatForest
+        return FlatForest.load(path)
     # keep the error message obvious if someone forgot joblib
     if joblib is None:
         raise SystemExit("ERROR: joblib is not installed. Run: pip install joblib")
-    return joblib.load(path)
+    # mmap_mode: big plain numpy arrays in the pickle are mapped, not copied
+    return joblib.load(path, mmap_mode="r")
 
 
 def _ensure_columns(df: pd.DataFrame) -> None:
@@ -44,32 +63,115 @@ def _ensure_columns(df: pd.DataFrame) -> None:
         raise SystemExit(f"ERROR: missing required columns: {missing}")
 
 
-def _get_proba(model: Any, X: pd.DataFrame) -> Optional[List[float]]:
+def _get_proba(model: Any, X: pd.DataFrame) -> Optional[np.ndarray]:
     """
     try to get "probability of fraud" for each row.
     if the model doesn't support it, returns None and we'll fall back to predict().
     """
     # best case: model has predict_proba
     if hasattr(model, "predict_proba"):
-        proba = model.predict_proba(X)
+        proba = np.asarray(model.predict_proba(X))
+
+        # flat_forest returns P(fraud) directly
+        if proba.ndim == 1:
+            return proba
 
         # standard binary case: proba[:,1] is class 1
         if proba.shape[1] >= 2:
-            return proba[:, 1].tolist()
+            return proba[:, 1]
 
         # odd case: sometimes only one column comes back
-        return proba[:, 0].tolist()
+        return proba[:, 0]
 
     # fallback: decision_function -> squash into (0,1)
     if hasattr(model, "decision_function"):
-        import math
-        scores = model.decision_function(X)
-        return [1.0 / (1.0 + math.exp(-float(s))) for s in scores]
+        scores = np.asarray(model.decision_function(X), dtype=np.float64)
+        return 1.0 / (1.0 + np.exp(-scores))
 
     # nothing available
     return None
 
 
+def score_frame(model: Any, df: pd.DataFrame, threshold: float) -> pd.DataFrame:
+    """
+    add fraud_proba + pred_isFraud to df (in place) and return it.
+    the raw frame goes straight to the model: the pipeline picks its own
+    columns, so no copy of the whole frame is needed.
+    """
+    proba = _get_proba(model, df)
+
+    if proba is None:
+        # last resort if model can't do proba:
+        # just use predict() and treat it as 0/1
+        if not hasattr(model, "predict"):
+            raise SystemExit("ERROR: model has no predict_proba, decision_function, or predict.")
+        preds = np.asarray(model.predict(df))
+        df["fraud_proba"] = preds.astype(np.float64)
+        df["pred_isFraud"] = preds.astype(np.int8)
+    else:
+        df["fraud_proba"] = proba
+        df["pred_isFraud"] = (proba >= threshold).astype(np.int8)
+    return df
+
+
+# -------- chunked / multi-process mode --------
+
+# per-worker model, loaded once by the pool initializer
+_WORKER_MODEL: Any = None
+
+
+def _init_worker(model_path: str) -> None:
+    global _WORKER_MODEL
+    _WORKER_MODEL = _load_model(model_path)
+    # the pool parallelizes over chunks; a per-predict thread pool (n_jobs=-1)
+    # in every worker would just oversubscribe the cores
+    est = _WORKER_MODEL.steps[-1][1] if hasattr(_WORKER_MODEL, "steps") else _WORKER_MODEL
+    if hasattr(est, "n_jobs"):
+        est.n_jobs = 1
+
+
+def _score_chunk(df: pd.DataFrame, threshold: float) -> pd.DataFrame:
+    return score_frame(_WORKER_MODEL, df, threshold)
+
+
+def _chunks(path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    first = True
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        if first:
+            _ensure_columns(chunk)
+            first = False
+        yield chunk
+
+
+def _scored_chunks(args) -> Iterator[pd.DataFrame]:
+    """scored chunks in input order, in-process or from a worker pool."""
+    if args.jobs <= 1:
+        model = _load_model(args.model)
+        for chunk in _chunks(args.inp, args.chunksize):
+            yield score_frame(model, chunk, args.threshold)
+        return
+
+    with ProcessPoolExecutor(args.jobs, initializer=_init_worker, initargs=(args.model,)) as pool:
+        pending = []
+        for chunk in _chunks(args.inp, args.chunksize):
+            pending.append(pool.submit(_score_chunk, chunk, args.threshold))
+            # bounded read-ahead: memory stays ~2*jobs chunks
+            if len(pending) >= 2 * args.jobs:
+                yield pending.pop(0).result()
+        for fut in pending:
+            yield fut.result()
+
+
+def score_chunked(args) -> int:
+    """stream input -> scored output chunk by chunk; returns rows scored."""
+    rows = 0
+    with open(args.out, "w", newline="", encoding="utf-8") as f:
+        for i, scored in enumerate(_scored_chunks(args)):
+            scored.to_csv(f, index=False, header=(i == 0))
+            rows += len(scored)
+    return rows
+
+
 def main() -> None:
     # cli args
     p = argparse.ArgumentParser(description="Score Kaggle-style transactions with a saved ML model.")
@@ -77,8 +179,21 @@ def main() -> None:
     p.add_argument("--model", required=True, help="Path to joblib/pickle model (ideally sklearn Pipeline).")
     p.add_argument("--out", default="kaggle_scored.csv", help="Output scored CSV filename.")
     p.add_argument("--threshold", type=float, default=0.5, help="Probability threshold for pred_isFraud=1.")
+    p.add_argument("--chunksize", type=int, default=0,
+                   help="Score N rows at a time and append to the output (bounded memory).")
+    p.add_argument("--jobs", type=int, default=1,
+                   help="Worker processes for --chunksize mode (model loaded once per worker).")
     args = p.parse_args()
 
+    if args.jobs > 1 and args.chunksize <= 0:
+        raise SystemExit("ERROR: --jobs needs --chunksize.")
+
+    if args.chunksize > 0:
+        rows = score_chunked(args)
+        print(f"Scored {rows} rows -> {args.out} (chunksize={args.chunksize}, jobs={args.jobs})")
+        print(f"threshold={args.threshold}")
+        return
+
     # load file + make sure it has the columns we expect
     df = pd.read_csv(args.inp)
     _ensure_columns(df)
@@ -88,21 +203,7 @@ def main() -> None:
 
     # IMPORTANT: we send the raw columns through.
     # the pipeline needs to deal with encoding type, ids, numeric casting, etc.
-    X = df.copy()
-
-    proba = _get_proba(model, X)
-
-    if proba is None:
-        # last resort if model can't do proba:
-        # just use predict() and treat it as 0/1
-        if not hasattr(model, "predict"):
-            raise SystemExit("ERROR: model has no predict_proba, decision_function, or predict.")
-        preds = model.predict(X)
-        df["fraud_proba"] = [float(p) for p in preds]
-        df["pred_isFraud"] = [int(p) for p in preds]
-    else:
-        df["fraud_proba"] = proba
-        df["pred_isFraud"] = [1 if p >= args.threshold else 0 for p in proba]
+    score_frame(model, df, args.threshold)
 
     # write scored file
     df.to_csv(args.out, index=False)
@@ -1,5 +1,10 @@
 # random forest classifier using sklearn
 
+import argparse
+import sys
+import time
+
+import numpy as np
 import pandas as pd
 import joblib
 
@@ -9,6 +14,9 @@ from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.metrics import confusion_matrix, precision_score, recall_score, f1_score
 from sklearn.ensemble import RandomForestClassifier
+import sklearn
+
+from feature_cache import DEFAULT_DIR as DEFAULT_CACHE_DIR, FeatureCache
 
 
 # NOTE: this is the local kaggle/payments csv path
@@ -21,26 +29,165 @@ MODEL_OUT = "fraud_model.joblib"
 # keep training from taking forever on a laptop
 N_SAMPLES = 600_000
 RANDOM_STATE = 42
+TEST_SIZE = 0.2
 
+# rows read per chunk while sampling (the full file is ~6.3M rows)
+CHUNK_SIZE = 250_000
+
+# load only what we need so it doesn't eat memory for no reason
+USECOLS = [
+    "step", "type", "amount",
+    "oldbalanceOrg", "newbalanceOrig",
+    "oldbalanceDest", "newbalanceDest",
+    "isFraud"
+]
+
+# compact dtypes: the defaults (int64/float64/object) are ~3x bigger.
+# the model casts to float32 anyway, so float32 money loses nothing.
+TX_TYPES = ["CASH_IN", "CASH_OUT", "DEBIT", "PAYMENT", "TRANSFER"]
+DTYPES = {
+    "step": "int16",
+    "type": pd.CategoricalDtype(TX_TYPES),
+    "amount": "float32",
+    "oldbalanceOrg": "float32",
+    "newbalanceOrig": "float32",
+    "oldbalanceDest": "float32",
+    "newbalanceDest": "float32",
+    "isFraud": "int8",
+}
+
+
+def load_sample(path, n_samples=N_SAMPLES, random_state=RANDOM_STATE, chunksize=CHUNK_SIZE, fraud_rate=None):
+    """
+    stream the csv in chunks and keep a stratified random sample of n_samples rows.
+
+    every row gets a random key; per class (isFraud 0/1) we only keep the
+    n_samples rows with the smallest keys seen so far (a bottom-k reservoir,
+    i.e. a uniform sample without replacement). at the end each class gets
+    its quota: the file's own fraud rate, or fraud_rate if given (e.g. 0.1
+    to oversample fraud). so memory is ~2 * n_samples rows + one chunk, no
+    matter how big the file is.
+
+    if the file has <= n_samples rows, all of them come back (like before).
+    """
+    rng = np.random.default_rng(random_state)
+    kept = {0: [], 1: []}        # class -> list of (frame, keys) pieces
+    counts = {0: 0, 1: 0}        # rows seen per class
+
+    def shrink(label, k):
+        frames = [f for f, _ in kept[label]]
+        keys = np.concatenate([ks for _, ks in kept[label]])
+        df = pd.concat(frames, ignore_index=True)
+        if len(df) > k:
+            idx = np.argpartition(keys, k - 1)[:k]
+            df, keys = df.iloc[idx].reset_index(drop=True), keys[idx]
+        kept[label] = [(df, keys)]
+        return df, keys
+
+    reader = pd.read_csv(path, usecols=USECOLS, dtype=DTYPES, chunksize=chunksize)
+    for chunk in reader:
+        keys = rng.random(len(chunk))
+        fraud = chunk["isFraud"].to_numpy() == 1
+        for label, mask in ((1, fraud), (0, ~fraud)):
+            if not mask.any():
+                continue
+            counts[label] += int(mask.sum())
+            kept[label].append((chunk[mask], keys[mask]))
+            # amortized: only cut back once the pieces hold 2x the cap
+            if sum(len(f) for f, _ in kept[label]) > 2 * n_samples:
+                shrink(label, n_samples)
+
+    total = counts[0] + counts[1]
+    if total <= n_samples:
+        quota = dict(counts)
+    else:
+        rate = counts[1] / total if fraud_rate is None else fraud_rate
+        quota = {1: min(counts[1], int(round(n_samples * rate)))}
+        quota[0] = min(counts[0], n_samples - quota[1])
+
+    parts, part_keys = [], []
+    for label in (0, 1):
+        if quota[label] == 0 or not kept[label]:
+            continue
+        df, keys = shrink(label, quota[label])
+        parts.append(df)
+        part_keys.append(keys)
+
+    # key order = random order (what df.sample gave)
+    df = pd.concat(parts, ignore_index=True)
+    order = np.argsort(np.concatenate(part_keys), kind="stable")
+    return df.iloc[order].reset_index(drop=True)
+
+
+def peak_rss_mb():
+    # resource is unix-only; None on windows
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is KB on linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Train the random forest fraud model on the Kaggle payments csv.")
+    p.add_argument("--csv", default=CSV_FILE, help="Kaggle payments csv.")
+    p.add_argument("--out", default=MODEL_OUT, help="Where to save the trained pipeline.")
+    p.add_argument("--samples", type=int, default=N_SAMPLES, help="Rows to sample from the csv.")
+    p.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="Rows read per chunk while sampling.")
+    p.add_argument("--fraud-rate", type=float, default=None,
+                   help="Fraud share of the sample (default: same as the file).")
+    p.add_argument("--load-only", action="store_true", help="Just load the sample and report memory.")
+    p.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Feature-matrix cache directory.")
+    p.add_argument("--cache-budget-gb", type=float, default=5.0, help="Disk budget of the cache (LRU eviction).")
+    p.add_argument("--no-cache", action="store_true", help="Always re-read the csv and refit preprocessing.")
+    return p.parse_args(argv)
+
+
+def build_preprocess():
+    # preprocessing: one-hot encode type, pass numbers through as-is
+    # (only categorical column here is tx type)
+    cat_cols = ["type"]
+    num_cols = [c for c in USECOLS if c not in cat_cols and c != "isFraud"]
+    return ColumnTransformer([
+        ("cat", OneHotEncoder(handle_unknown="ignore"), cat_cols),
+        ("num", "passthrough", num_cols)
+    ])
 
-def main():
-    # load only what we need so it doesn't eat memory for no reason
-    print("Loading dataset...")
-    usecols = [
-        "step", "type", "amount",
-        "oldbalanceOrg", "newbalanceOrig",
-        "oldbalanceDest", "newbalanceDest",
-        "isFraud"
-    ]
 
-    df = pd.read_csv(CSV_FILE, usecols=usecols)
+def _dense32(X):
+    # ColumnTransformer may hand back a sparse matrix if one-hot dominates
+    return np.asarray(X.toarray() if hasattr(X, "toarray") else X, dtype=np.float32)
 
-    # downsample so the run time is reasonable
-    if len(df) > N_SAMPLES:
-        df = df.sample(n=N_SAMPLES, random_state=RANDOM_STATE)
 
-    print("Rows used:", len(df))
-    print("Fraud rate:", df["isFraud"].mean())
+def _dtypes_key():
+    # str(CategoricalDtype) is just "category": spell the categories out so
+    # changing TX_TYPES invalidates cached matrices
+    return {k: [str(v), [str(c) for c in getattr(v, "categories", [])]] for k, v in DTYPES.items()}
+
+
+def prepare_features(csv_path, samples=N_SAMPLES, chunksize=CHUNK_SIZE, fraud_rate=None, cache=None):
+    """
+    sample -> train/test split -> fitted ColumnTransformer -> float32 matrices.
+
+    returns a dict with X_train, X_test, y_train, y_test (numpy arrays),
+    preprocess (fitted) and cached (bool). with a FeatureCache, a repeat run
+    with the same csv + settings loads all of it back (memory-mapped) instead.
+    """
+    key = None
+    if cache is not None:
+        key = cache.key(
+            csv_path, usecols=USECOLS, dtypes=_dtypes_key(), samples=samples, fraud_rate=fraud_rate,
+            random_state=RANDOM_STATE, test_size=TEST_SIZE, preprocess=repr(build_preprocess()),
+            sklearn=sklearn.__version__,
+        )
+        hit = cache.get(key)
+        if hit is not None:
+            hit["cached"] = True
+            return hit
+
+    df = load_sample(csv_path, samples, RANDOM_STATE, chunksize, fraud_rate)
 
     # split features/label
     X = df.drop(columns=["isFraud"])
@@ -49,20 +196,49 @@ def main():
     # train/test split (stratify so fraud isn't missing in one side)
     X_train, X_test, y_train, y_test = train_test_split(
         X, y,
-        test_size=0.2,
+        test_size=TEST_SIZE,
         stratify=y,
         random_state=RANDOM_STATE
     )
 
-    # only categorical column here is tx type
-    cat_cols = ["type"]
-    num_cols = [c for c in X.columns if c not in cat_cols]
+    # float32: what the trees use anyway, and half the cache size
+    preprocess = build_preprocess()
+    out = {
+        "X_train": _dense32(preprocess.fit_transform(X_train)),
+        "X_test": _dense32(preprocess.transform(X_test)),
+        "y_train": y_train.to_numpy(dtype=np.int8),
+        "y_test": y_test.to_numpy(dtype=np.int8),
+    }
+    if cache is not None:
+        cache.put(key, out, {"preprocess": preprocess}, info={"csv": csv_path, "samples": samples})
+    out["preprocess"] = preprocess
+    out["cached"] = False
+    return out
 
-    # preprocessing: one-hot encode type, pass numbers through as-is
-    preprocess = ColumnTransformer([
-        ("cat", OneHotEncoder(handle_unknown="ignore"), cat_cols),
-        ("num", "passthrough", num_cols)
-    ])
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("Loading dataset...")
+    if args.load_only:
+        df = load_sample(args.csv, args.samples, RANDOM_STATE, args.chunksize, args.fraud_rate)
+        print("Rows used:", len(df))
+        print("Fraud rate:", df["isFraud"].mean())
+        rss = peak_rss_mb()
+        print(f"Sample memory: {df.memory_usage(deep=True).sum() / 1e6:.1f} MB"
+              + (f", peak RSS: {rss:.0f} MB" if rss is not None else ""))
+        return
+
+    t0 = time.perf_counter()
+    cache = None if args.no_cache else FeatureCache(args.cache_dir, int(args.cache_budget_gb * 1024 ** 3))
+    data = prepare_features(args.csv, args.samples, args.chunksize, args.fraud_rate, cache)
+    X_train, X_test, y_train, y_test = data["X_train"], data["X_test"], data["y_train"], data["y_test"]
+    preprocess = data["preprocess"]
+
+    y_all = np.concatenate([y_train, y_test])
+    print("Rows used:", len(y_all))
+    print("Fraud rate:", y_all.mean())
+    print(f"Features ready in {time.perf_counter() - t0:.3f}s ({'cache hit' if data['cached'] else 'built'})")
 
     # rf is a decent baseline and easy to train
     model = RandomForestClassifier(
@@ -72,18 +248,12 @@ def main():
         n_jobs=-1
     )
 
-    # pipeline = preprocess + model (so scoring scripts can just feed raw cols)
-    pipe = Pipeline([
-        ("preprocess", preprocess),
-        ("model", model)
-    ])
-
     print("Training model...")
-    pipe.fit(X_train, y_train)
+    model.fit(X_train, y_train)
 
     # quick eval on holdout
     print("Evaluating...")
-    y_pred = pipe.predict(X_test)
+    y_pred = model.predict(X_test)
 
     cm = confusion_matrix(y_test, y_pred)
     precision = precision_score(y_test, y_pred)
@@ -96,11 +266,17 @@ def main():
     print(f"Recall:    {recall:.4f}")
     print(f"F1:        {f1:.4f}")
 
+    # pipeline = fitted preprocess + model (so scoring scripts can just feed raw cols)
+    pipe = Pipeline([
+        ("preprocess", preprocess),
+        ("model", model)
+    ])
+
     # dump the whole pipeline so scoring stays simple later
     print("Saving model...")
-    joblib.dump(pipe, MODEL_OUT)
+    joblib.dump(pipe, args.out)
 
-    print("Saved ->", MODEL_OUT)
+    print("Saved ->", args.out)
 
 
 if __name__ == "__main__":